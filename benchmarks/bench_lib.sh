@@ -0,0 +1,67 @@
+#!/usr/bin/env bash
+# Helpers shared by the benchmarks, sourced by the benchmark scripts.
+#
+# Every external command used by the libraries is replaced on the PATH by a shim that logs its name
+# before running the real command (or the stand-in from benchmarks/stubs when it is not installed).
+
+BENCH_FOLDER=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
+ROOT_FOLDER=$( cd -- $BENCH_FOLDER/.. &> /dev/null && pwd )
+STUBS_FOLDER="$BENCH_FOLDER/stubs"
+BENCH_COMMANDS="awk bash cat cp curl cut date docker flock git grep jq ln mkdir mktemp mv ps rev rm \
+sha256sum sleep tail touch wc yq"
+BENCH_RUNS=${BENCH_RUNS:-10}
+BENCH_TMP=$(mktemp -d)
+trap 'rm -rf "$BENCH_TMP"' EXIT
+
+# Create a shim for each command, the real path is resolved before the shims are put on the PATH
+bench_shims() {
+  local shims_folder=$1
+  local bash_path command_name command_path
+  bash_path=$(command -v bash)
+  mkdir -p "$shims_folder" "$BENCH_TMP/stubs"
+  for command_name in $BENCH_COMMANDS; do
+    command_path=$(command -v "$command_name")
+    # The stand-ins are run with the real bash so that they are not counted twice
+    [[ -z $command_path && -x $STUBS_FOLDER/$command_name ]] && command_path="$bash_path $STUBS_FOLDER/$command_name"
+    [[ -z $command_path ]] && continue
+    printf '#!/bin/sh\necho %s >> "$BENCH_LOG"\nexec %s "$@"\n' "$command_name" "$command_path" \
+      > "$shims_folder/$command_name"
+    chmod +x "$shims_folder/$command_name"
+    # The stand-ins are also used to measure the time when the command is not installed
+    [[ $command_path == "$bash_path "* ]] && ln -sf "$STUBS_FOLDER/$command_name" "$BENCH_TMP/stubs/$command_name"
+  done
+}
+
+# Run a library entry point and print the number of processes spawned per command,
+# after a first run that fills the caches of the env folder
+bench_count() {
+  local root=$1
+  local lib=$2
+  local log="$BENCH_TMP/count.log"
+  BENCH_LOG=/dev/null PATH="$BENCH_TMP/shims:$PATH" bash "$root/libs/$lib.sh" "${@:3}" &> /dev/null
+  : > "$log"
+  BENCH_LOG=$log PATH="$BENCH_TMP/shims:$PATH" bash "$root/libs/$lib.sh" "${@:3}" &> /dev/null
+  sort "$log" | uniq -c | awk '{ printf "%s=%s ", $2, $1; total+=$1 } END { printf "total=%s", total }'
+}
+
+# Run a library entry point several times and print the average wall time in milliseconds
+bench_time() {
+  local root=$1
+  local lib=$2
+  local run start
+  start=$EPOCHREALTIME
+  for (( run = 0; run < BENCH_RUNS; run++ )); do
+    PATH="$BENCH_TMP/stubs:$PATH" bash "$root/libs/$lib.sh" "${@:3}" &> /dev/null
+  done
+  awk -v start="$start" -v end="$EPOCHREALTIME" -v runs="$BENCH_RUNS" \
+    'BEGIN { printf "%.1fms", (end - start) * 1000 / runs }'
+}
+
+# Start the local stand-in of the github API, and point the github library to it
+bench_github_api() {
+  local port
+  coproc BENCH_GITHUB_API { exec python3 "$ROOT_FOLDER/tests/github_api.py"; }
+  read -r port <&"${BENCH_GITHUB_API[0]}"
+  export GITHUB_API_URL="http://127.0.0.1:$port"
+  trap 'kill $BENCH_GITHUB_API_PID 2> /dev/null; rm -rf "$BENCH_TMP"' EXIT
+}
@@ -0,0 +1,72 @@
+#!/usr/bin/env bash
+# Measure the throughput of the loggers, in lines per second, on a large piped log.
+#
+# The log is a generated output of docker compose logs, with info, warning, error and debug lines.
+# The messages.sh process per line is measured on a sample of BENCH_SAMPLE lines (default 500).
+#
+# Usage:
+#   ./benchmarks/bench_log.sh           # Log of 200000 lines
+#   ./benchmarks/bench_log.sh 1000000   # Log of 1000000 lines
+
+CURRENT_FOLDER=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
+# shellcheck source=./bench_lib.sh
+source "$CURRENT_FOLDER/bench_lib.sh"
+LIBS_LOG="$ROOT_FOLDER/libs/log.sh"
+LIBS_MESSAGES="$ROOT_FOLDER/libs/messages.sh"
+BENCH_LINES=${1:-200000}
+BENCH_SAMPLE=${BENCH_SAMPLE:-500}
+
+# Generate a log
+bench_log() {
+  awk -v lines="$1" 'BEGIN {
+    split("INFO INFO INFO INFO WARNING ERROR DEBUG DEBUG", levels, " ")
+    for (i = 1; i <= lines; i++)
+      printf "web-1  | 2024-01-01T00:00:00Z %s request %d served in %d ms\n", levels[i % 8 + 1], i, i % 97
+  }'
+}
+
+# Run a logger on a log file and print the throughput in lines per second
+bench_throughput() {
+  local log_file=$1
+  local lines=$2
+  local start
+  shift 2
+  start=$EPOCHREALTIME
+  "$@" < "$log_file" > /dev/null
+  awk -v start="$start" -v end="$EPOCHREALTIME" -v lines="$lines" \
+    'BEGIN { printf "%d lines/s", lines / (end - start) }'
+}
+
+# Print each line with a messages.sh process
+bench_messages_process() {
+  local line
+  while IFS= read -r line; do bash "$LIBS_MESSAGES" show_message "$line"; done
+}
+
+# Print each line with show_message, sourced once
+bench_messages_sourced() {
+  local line
+  # shellcheck source=../libs/messages.sh
+  source "$LIBS_MESSAGES"
+  while IFS= read -r line; do show_message "$line"; done
+}
+
+bench_log "$BENCH_LINES" > "$BENCH_TMP/app.log"
+head -n "$BENCH_SAMPLE" "$BENCH_TMP/app.log" > "$BENCH_TMP/sample.log"
+echo "Throughput of the loggers on a log of $BENCH_LINES lines"
+printf '%-45s %s\n' "messages.sh process per line ($BENCH_SAMPLE lines)" \
+  "$(bench_throughput "$BENCH_TMP/sample.log" "$BENCH_SAMPLE" bench_messages_process)"
+printf '%-45s %s\n' "show_message sourced, per line" \
+  "$(bench_throughput "$BENCH_TMP/app.log" "$BENCH_LINES" bench_messages_sourced)"
+printf '%-45s %s\n' "log_stream info" \
+  "$(bench_throughput "$BENCH_TMP/app.log" "$BENCH_LINES" bash "$LIBS_LOG" log_stream info)"
+printf '%-45s %s\n' "log_stream auto, colors and timestamps" \
+  "$(LOG_COLOR=1 LOG_TIMESTAMP=1 bench_throughput "$BENCH_TMP/app.log" "$BENCH_LINES" \
+    bash "$LIBS_LOG" log_stream auto)"
+printf '%-45s %s\n' "log_stream auto, LOG_LEVEL=error" \
+  "$(LOG_LEVEL=error bench_throughput "$BENCH_TMP/app.log" "$BENCH_LINES" bash "$LIBS_LOG" log_stream auto)"
+printf '%-45s %s\n' "log_stream info, LOG_LEVEL=error (filtered)" \
+  "$(LOG_LEVEL=error bench_throughput "$BENCH_TMP/app.log" "$BENCH_LINES" bash "$LIBS_LOG" log_stream info)"
+printf '%-45s %s\n' "log_stream info, file sink" \
+  "$(LOG_FILE="$BENCH_TMP/sink/app.log" LOG_FILE_MAX_SIZE=4194304 bench_throughput "$BENCH_TMP/app.log" \
+    "$BENCH_LINES" bash "$LIBS_LOG" log_stream info)"
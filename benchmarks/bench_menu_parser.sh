@@ -0,0 +1,68 @@
+#!/usr/bin/env bash
+# Compare the time to compile generated menus with the built-in awk parser and with yq.
+#
+# Each menu has OPTIONS top level options, with 3 nested levels of 3 options.
+# The two parsers must produce the same index.
+#
+# Usage:
+#   ./benchmarks/bench_menu_parser.sh              # Menus of 200, 1000 and 5000 top level options
+#   ./benchmarks/bench_menu_parser.sh 100 10000    # Menus of 100 and 10000 top level options
+
+CURRENT_FOLDER=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
+ROOT_FOLDER=$( cd -- $CURRENT_FOLDER/.. &> /dev/null && pwd )
+LIBS_MENU="$ROOT_FOLDER/libs/menu.sh"
+BENCH_SIZES=${*:-200 1000 5000}
+BENCH_TMP=$(mktemp -d)
+trap 'rm -rf "$BENCH_TMP"' EXIT
+# The indexes are compiled in a temporary env folder, not in the env folder of the repository
+ENV_FOLDER="$BENCH_TMP/env"
+export BASHLIBS_ENV_FOLDER=$ENV_FOLDER
+mkdir -p "$ENV_FOLDER"
+
+# Generate a menu configuration file
+bench_menu() {
+  local options=$1
+  local i j k
+  echo "name: bench.sh"
+  echo "help: |"
+  echo "  A generated menu with $options options."
+  echo "opts:"
+  for (( i = 0; i < options; i++ )); do
+    echo "  option$i:"
+    echo "    help: \"Option $i\""
+    [[ $(( i % 3 )) -eq 0 ]] && echo "    optional: true"
+    echo "    opts:"
+    for (( j = 0; j < 3; j++ )); do
+      echo "      sub$j:"
+      [[ $j -eq 1 ]] && echo "        prefix: true"
+      echo "        opts:"
+      for (( k = 0; k < 3; k++ )); do
+        echo "          leaf$k:"
+      done
+    done
+  done
+}
+
+# Compile a menu with a parser and print the wall time in milliseconds
+bench_compile() {
+  local parser=$1
+  local menu_path_file=$2
+  local start
+  touch "$menu_path_file"
+  start=$EPOCHREALTIME
+  MENU_PARSER=$parser bash "$LIBS_MENU" menu_compile "$menu_path_file" > /dev/null || return 1
+  awk -v start="$start" -v end="$EPOCHREALTIME" 'BEGIN { printf "%.1fms", (end - start) * 1000 }'
+  cp "$ENV_FOLDER/.menu_index${menu_path_file//[^[:alnum:]]/_}" "$BENCH_TMP/$parser.index"
+}
+
+echo "Compile time of generated menus (awk: built-in parser, yq: yq and jq)"
+printf '%-8s %-8s %-12s %-12s %s\n' "options" "nodes" "awk" "yq" "same index"
+for size in $BENCH_SIZES; do
+  menu_path_file="$BENCH_TMP/menu_$size.yml"
+  bench_menu "$size" > "$menu_path_file"
+  awk_time=$(bench_compile awk "$menu_path_file")
+  yq_time=$(bench_compile yq "$menu_path_file") || yq_time="failed"
+  same="no" && cmp -s "$BENCH_TMP/awk.index" "$BENCH_TMP/yq.index" && same="yes"
+  printf '%-8s %-8s %-12s %-12s %s\n' "$size" "$(( size * 13 + 1 ))" "$awk_time" "$yq_time" "$same"
+  rm -f "$ENV_FOLDER/.menu_index${menu_path_file//[^[:alnum:]]/_}" "$BENCH_TMP"/*.index
+done
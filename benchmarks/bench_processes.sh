@@ -0,0 +1,62 @@
+#!/usr/bin/env bash
+# Count the processes spawned by the library entry points, and measure their cold start time.
+#
+# The commands are counted with the shims of bench_lib.sh.
+# The libraries of the git revision and of the working tree are copied in a temporary folder, each with its own
+# env folder, so that the env folder of the repository is not used.
+# The cold start time is the average wall time of BENCH_RUNS runs (default 10), without the shims.
+# The processes are counted on a second run, once the caches of the env folder are filled.
+#
+# Usage:
+#   ./benchmarks/bench_processes.sh           # Compare the working tree with HEAD
+#   ./benchmarks/bench_processes.sh v1.0.0    # Compare the working tree with a git revision
+
+CURRENT_FOLDER=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
+# shellcheck source=./bench_lib.sh
+source "$CURRENT_FOLDER/bench_lib.sh"
+BENCH_REF=${1:-HEAD}
+
+# Extract a copy of the libraries at a git revision
+bench_checkout() {
+  local ref=$1
+  local target=$2
+  mkdir -p "$target/env"
+  git -C "$ROOT_FOLDER" archive "$ref" libs config | tar -x -C "$target"
+}
+
+# Copy the libraries of the working tree
+bench_copy() {
+  local target=$1
+  mkdir -p "$target/env"
+  cp -R "$ROOT_FOLDER/libs" "$ROOT_FOLDER/config" "$target"
+}
+
+# Initialize a project in both trees
+bench_init() {
+  local lib=$1
+  local root
+  for root in "$BENCH_TMP/before" "$BENCH_TMP/after"; do
+    PATH="$BENCH_TMP/shims:$PATH" BENCH_LOG=/dev/null bash "$root/libs/$lib.sh" init "${@:2}" &> /dev/null
+  done
+}
+
+# Compare the processes spawned by an entry point in both trees
+bench_entry_point() {
+  local lib=$1
+  echo "$lib.sh ${*:2}"
+  printf '  %-7s %-9s %s\n' "before" "$(bench_time "$BENCH_TMP/before" "$@")" "$(bench_count "$BENCH_TMP/before" "$@")"
+  printf '  %-7s %-9s %s\n' "after" "$(bench_time "$BENCH_TMP/after" "$@")" "$(bench_count "$BENCH_TMP/after" "$@")"
+}
+
+# Each tree uses the env folder next to its libraries
+unset BASHLIBS_ENV_FOLDER BASHLIBS_CONFIG_FOLDER
+bench_shims "$BENCH_TMP/shims"
+bench_checkout "$BENCH_REF" "$BENCH_TMP/before"
+bench_copy "$BENCH_TMP/after"
+echo "Cold start time and processes spawned (before: $BENCH_REF, after: working tree)"
+bench_init docker_compose "test" "docker_compose" "" "profile_test1" "test.env" "dc_test1"
+bench_entry_point docker_compose _dc_exec_command 1 start
+bench_entry_point docker_compose _dc_exec_command 1 unknown
+bench_init menu "test" "menu" "menu.yml"
+bench_entry_point menu _display_help
+bench_entry_point menu _display_help test1
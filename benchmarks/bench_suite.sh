@@ -0,0 +1,121 @@
+#!/usr/bin/env bash
+# Check the processes spawned by the entry points of the libraries against a stored baseline.
+#
+# The entry points are run with the shims of bench_lib.sh, the docker stand-in and the local github API
+# (tests/github_api.py), in a temporary env folder, so no network or docker daemon is needed.
+# The run fails when an entry point spawns more processes of a command than in the baseline, or when its
+# wall time is more than BENCH_TIME_TOLERANCE percent above the baseline (only if BENCH_TIME_TOLERANCE is set).
+#
+# The entry points of the libraries are covered, except:
+#   - init, run once per library before its entry points (it writes the environment file).
+#   - confirm_message, _gh_release_choice and _gh_clone_with_prompt, which wait for an answer of the user.
+#   - gh_clone, gh_clone_mirror and _gh_clone, whose time is the time of git clone.
+#   - the loggers of log.sh, which read a stream, and are measured by benchmarks/bench_log.sh.
+#   - the functions called by the entry points (gh_api_get, dc_wait_states, menu_compile...), measured through them.
+#
+# Usage:
+#   ./benchmarks/bench_suite.sh            # Compare with benchmarks/baseline.txt
+#   ./benchmarks/bench_suite.sh --update   # Store the results in benchmarks/baseline.txt
+
+CURRENT_FOLDER=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
+# shellcheck source=./bench_lib.sh
+source "$CURRENT_FOLDER/bench_lib.sh"
+BENCH_BASELINE="$BENCH_FOLDER/baseline.txt"
+BENCH_UPDATE=0 && [[ $1 == "--update" ]] && BENCH_UPDATE=1
+declare -A BENCH_BASELINE_TIMES=() BENCH_BASELINE_COUNTS=()
+BENCH_FAILED=0
+
+# Load the stored baseline
+bench_baseline() {
+  local entry time counts
+  [[ ! -f $BENCH_BASELINE ]] && return 0
+  while IFS=$'\t' read -r entry time counts; do
+    [[ -z $entry || $entry == \#* ]] && continue
+    BENCH_BASELINE_TIMES[$entry]=$time
+    BENCH_BASELINE_COUNTS[$entry]=$counts
+  done < "$BENCH_BASELINE"
+}
+
+# Compare the processes spawned per command with the baseline, and print the regressions
+bench_regressions() {
+  local counts=$1
+  local baseline_counts=$2
+  local count command_name
+  local -A baseline=()
+  for count in $baseline_counts; do baseline[${count%=*}]=${count#*=}; done
+  for count in $counts; do
+    command_name=${count%=*}
+    [[ $command_name == "total" ]] && continue
+    [[ ${count#*=} -gt ${baseline[$command_name]:-0} ]] \
+      && printf '%s %s -> %s ' "$command_name" "${baseline[$command_name]:-0}" "${count#*=}"
+  done
+}
+
+# Run an entry point, print its results and compare them with the baseline
+bench_entry_point() {
+  local lib=$1
+  local entry="$lib.sh ${*:2}"
+  # The temporary folder is not part of the name of the entry point
+  entry=${entry//"$BENCH_TMP"/\$BENCH_TMP}
+  local time counts regressions
+  time=$(bench_time "$ROOT_FOLDER" "$@")
+  counts=$(bench_count "$ROOT_FOLDER" "$@")
+  printf '%s\t%s\t%s\n' "$entry" "${time%ms}" "$counts" >> "$BENCH_TMP/results.txt"
+  if [[ $BENCH_UPDATE -eq 0 && -n ${BENCH_BASELINE_COUNTS[$entry]} ]]; then
+    regressions=$(bench_regressions "$counts" "${BENCH_BASELINE_COUNTS[$entry]}")
+    if [[ -n $BENCH_TIME_TOLERANCE ]] && awk -v time="${time%ms}" -v baseline="${BENCH_BASELINE_TIMES[$entry]}" \
+      -v tolerance="$BENCH_TIME_TOLERANCE" 'BEGIN { exit !(time > baseline * (100 + tolerance) / 100) }'; then
+      regressions+="time ${BENCH_BASELINE_TIMES[$entry]}ms -> $time"
+    fi
+  fi
+  printf '%-50s %-9s %s\n' "$entry" "$time" "$counts"
+  [[ -n $regressions ]] && printf '  \033[0;31mregression: %s\033[0m\n' "$regressions" && BENCH_FAILED=1
+}
+
+# Initialize a project
+bench_init() {
+  local lib=$1
+  BENCH_LOG=/dev/null PATH="$BENCH_TMP/shims:$PATH" bash "$ROOT_FOLDER/libs/$lib.sh" init "${@:2}" &> /dev/null
+}
+
+bench_shims "$BENCH_TMP/shims"
+bench_github_api
+bench_baseline
+export BASHLIBS_ENV_FOLDER="$BENCH_TMP/env"
+mkdir -p "$BASHLIBS_ENV_FOLDER"
+
+echo "Cold start time and processes spawned (baseline: ${BENCH_BASELINE#"$ROOT_FOLDER"/})"
+bench_entry_point messages show_message "message"
+bench_init menu "test" "menu" "menu.yml"
+bench_entry_point menu _display_help
+bench_entry_point menu _display_help test1
+bench_entry_point menu _build_completion
+bench_init docker_compose "test" "docker_compose" "" "profile_test1" "test.env" "dc_test1"
+bench_entry_point docker_compose dc_capabilities 0 1
+bench_entry_point docker_compose _dc_exec_command 1 start
+bench_entry_point docker_compose _dc_status
+bench_entry_point docker_compose _dc_status_all
+bench_entry_point docker_compose _dc_waiting_start
+bench_entry_point docker_compose _dc_config_services
+bench_entry_point docker_compose _dc_config_images profile_test2
+bench_entry_point docker_compose _dc_config_service docker_compose-dc_test1-1
+DC_PROJECT=web bench_init docker_compose "test" "docker_compose" "" "profile_test1" "test.env" "dc_test1"
+DC_PROJECT=db bench_init docker_compose "test" "docker_compose" "" "profile_test1" "test.env" "dc_test1"
+bench_entry_point docker_compose dc_projects
+bench_entry_point docker_compose dc_run_projects "web db" 2 ps
+bench_init github "christopherlouet/bash-libs"
+bench_entry_point github _gh_api_rate
+bench_entry_point github _gh_check_api_rate 0
+bench_entry_point github _gh_release_latest
+bench_entry_point github _gh_release_verify v1.0.0
+bench_entry_point github gh_release_assets christopherlouet/bash-libs v1.0.0
+bench_entry_point github _gh_release_download v1.0.0 "$BENCH_TMP/assets" "bash-libs.tar.gz"
+echo "christopherlouet/bash-libs v1.0.0" > "$BENCH_TMP/manifest.txt"
+bench_entry_point github _gh_manifest_check "$BENCH_TMP/manifest.txt"
+
+if [[ $BENCH_UPDATE -eq 1 ]]; then
+  { echo "# Baseline of benchmarks/bench_suite.sh: entry point, wall time (ms), processes spawned"
+    cat "$BENCH_TMP/results.txt"; } > "$BENCH_BASELINE"
+  echo "Baseline stored in ${BENCH_BASELINE#"$ROOT_FOLDER"/}"
+fi
+exit $BENCH_FAILED
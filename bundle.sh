@@ -0,0 +1,143 @@
+#!/usr/bin/env bash
+# Bundle the libraries into a single versioned file, sourced once by the consumer scripts.
+#
+# The functions of docker_compose.sh, github.sh and menu.sh are renamed with the name of their library as namespace
+# (menu::_display_help), so that the libraries can be loaded together. The helper libraries (bashlibs.sh, log.sh,
+# messages.sh and utils.sh) are shared, and keep their function names.
+# The header of the bundle is built from the @brief and @description docblocks of the libraries.
+# The bundle is written with its sha256 checksum file, checked by installer.sh.
+#
+# Usage:
+#   ./bundle.sh                    # Bundle the libraries in dist/, versioned with git describe
+#   ./bundle.sh v1.0.0 /tmp/dist   # Bundle the libraries with a version, in a folder
+
+BUNDLE_FOLDER=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
+BUNDLE_LIBS_FOLDER="$BUNDLE_FOLDER/libs"
+BUNDLE_HELPERS="log messages utils"
+BUNDLE_LIBS="docker_compose github menu"
+BUNDLE_NAME=bashlibs.bundle.sh
+BUNDLE_VERSION=${1:-$(git -C "$BUNDLE_FOLDER" describe --tags --always --dirty 2> /dev/null || echo dev)}
+BUNDLE_OUTPUT=${2:-$BUNDLE_FOLDER/dist}
+# The command line of a library, removed from the bundle with the lines after it
+BUNDLE_MAIN_REGEX='^(if \[\[ "\$\{BASH_SOURCE\[0\]\}" == "\$0" \]\]|main "\$@")'
+BUNDLE_SOURCE_REGEX='^source "\$LIBS_FOLDER/bashlibs.sh"$'
+
+# List the functions of a library, defined after the loader
+bundle_functions() {
+  sed -nE -e "1,\\#$BUNDLE_SOURCE_REGEX#d" -e 's/^(function )?([[:alpha:]_][[:alnum:]_]*)\(\) *\{.*$/\2/p' "$1" \
+    | grep -vx "main"
+}
+
+# Remove the comments, the command line and the include guard of a library, keeping the code
+bundle_strip() {
+  sed -E -e "/$BUNDLE_MAIN_REGEX/,\$d" -e '/^#/d' -e '/^main\(\) \{/d' \
+    -e '/^declare -F bashlibs_require > \/dev\/null && return 0$/d' | cat -s
+}
+
+# Rename the functions of a library, in the lines of code (not in the variables declared with the same name)
+bundle_rename() {
+  local lib=$1
+  local names
+  names=$(bundle_functions "$BUNDLE_LIBS_FOLDER/$lib.sh" | paste -sd '|')
+  sed -E -e '/^[[:space:]]*#/b' -e ':rename' \
+    -e "s/(^|[^[:alnum:]_:\$.{\/-])($names)([^[:alnum:]_.=[-]|\$)/\1bashlibs_bundle::$lib::\2\3/" -e 't rename' \
+    -e "/^[[:space:]]*(local|declare) /s/ bashlibs_bundle::$lib::/ /g"
+}
+
+# Show the header of the bundle, with the docblocks of the libraries
+bundle_header() {
+  local lib line description name loaded
+  echo "#!/usr/bin/env bash"
+  echo "# @file $BUNDLE_NAME"
+  echo "# @brief The libraries of bash-libs $BUNDLE_VERSION, bundled into a single file by bundle.sh."
+  echo "# @description"
+  echo "#     The bundle is sourced once by the consumer scripts, and the functions of the libraries run in the same"
+  echo "#     process: the errors that exit the libraries (missing environment file or dependency) exit the script."
+  echo "#     The functions of docker_compose.sh, github.sh and menu.sh are namespaced with the name of their library,"
+  echo "#     the functions of the helper libraries keep their name."
+  echo "#     The configuration files are read from **BASHLIBS_CONFIG_FOLDER**, and the environment files are stored in"
+  echo "#     **BASHLIBS_ENV_FOLDER** (default the config and env folders next to the folder of the bundle)."
+  echo "#"
+  echo "#     Libraries:"
+  for lib in bashlibs $BUNDLE_HELPERS $BUNDLE_LIBS; do
+    line=$(sed -n 's/^# @brief //p' "$BUNDLE_LIBS_FOLDER/$lib.sh")
+    echo "#     * $lib.sh: $line"
+  done
+  echo "#"
+  echo "#     Functions:"
+  for lib in $BUNDLE_LIBS; do
+    description="" && loaded=0
+    while IFS= read -r line; do
+      if [[ $loaded -eq 0 ]]; then
+        [[ $line =~ $BUNDLE_SOURCE_REGEX ]] && loaded=1
+      elif [[ $line =~ ^#\ @description\ (.*)$ ]]; then
+        description=${BASH_REMATCH[1]}
+      elif [[ $line =~ ^(function\ )?([[:alpha:]_][[:alnum:]_]*)\(\)\ *\{ ]]; then
+        name=${BASH_REMATCH[2]}
+        [[ $name != "main" && $name != "check_env" ]] && echo "#     * $lib::$name: $description"
+        description=""
+      fi
+    done < "$BUNDLE_LIBS_FOLDER/$lib.sh"
+  done
+}
+
+# Show a library, with its variables set by a function and its functions namespaced
+bundle_lib() {
+  local lib=$1
+  local lib_file="$BUNDLE_LIBS_FOLDER/$lib.sh"
+  local name
+  if [[ $(grep -cE '^(LIBS_FOLDER|CONFIG_FOLDER|ENV_FOLDER|SCRIPT_NAME)=' "$lib_file") -ne 4 ]] \
+    || ! grep -qE "$BUNDLE_SOURCE_REGEX" "$lib_file"; then
+    echo "Unexpected header in $lib_file" > /dev/stderr && return 1
+  fi
+  echo "# $lib.sh"
+  echo "bashlibs_bundle::$lib() {"
+  sed -E "\\#$BUNDLE_SOURCE_REGEX#,\$d" "$lib_file" | bundle_strip \
+    | sed -E -e 's|^LIBS_FOLDER=.*|LIBS_FOLDER=$BASHLIBS_BUNDLE_FOLDER|' \
+      -e 's|^CONFIG_FOLDER=.*|CONFIG_FOLDER=${BASHLIBS_CONFIG_FOLDER:-$BASHLIBS_BUNDLE_ROOT/config}|' \
+      -e 's|^ENV_FOLDER=.*|ENV_FOLDER=${BASHLIBS_ENV_FOLDER:-$BASHLIBS_BUNDLE_ROOT/env}|' \
+      -e "s|^SCRIPT_NAME=.*|SCRIPT_NAME=$lib.sh|" -e '/^$/d'
+  echo "}"
+  sed -E "1,\\#$BUNDLE_SOURCE_REGEX#d" "$lib_file" | bundle_strip | bundle_rename "$lib"
+  for name in $(bundle_functions "$lib_file" | grep -vx "check_env"); do
+    echo "$lib::$name() { bashlibs_bundle_call $lib $name \"\$@\"; }"
+  done
+  echo
+}
+
+# Write the bundle and its checksum file
+bundle() {
+  local bundle_file="$BUNDLE_OUTPUT/$BUNDLE_NAME"
+  local lib
+  mkdir -p "$BUNDLE_OUTPUT" || return 1
+  {
+    bundle_header
+    echo
+    echo '[[ -n $BASHLIBS_BUNDLE_VERSION ]] && return 0'
+    echo
+    echo "BASHLIBS_BUNDLE_VERSION=${BUNDLE_VERSION@Q}"
+    echo 'BASHLIBS_BUNDLE_FOLDER=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )'
+    echo 'BASHLIBS_BUNDLE_ROOT=${BASHLIBS_BUNDLE_FOLDER%/*}'
+    echo
+    echo "# bashlibs.sh"
+    sed '1d' "$BUNDLE_LIBS_FOLDER/bashlibs.sh" | bundle_strip
+    for lib in $BUNDLE_HELPERS; do
+      echo "# $lib.sh"
+      echo "BASHLIBS_LOADED[$lib]=1"
+      sed '1d' "$BUNDLE_LIBS_FOLDER/$lib.sh" | bundle_strip
+    done
+    for lib in $BUNDLE_LIBS; do
+      bundle_lib "$lib" || return 1
+    done
+    echo "# Run the command line only when the bundle is executed, not when it is sourced"
+    echo 'if [[ "${BASH_SOURCE[0]}" == "$0" ]]; then "$@"; fi'
+  } > "$bundle_file.$$" || { rm -f "$bundle_file.$$" ; return 1; }
+  if ! bash -n "$bundle_file.$$"; then
+    echo "The bundle $bundle_file is not valid" > /dev/stderr && rm -f "$bundle_file.$$" && return 1
+  fi
+  chmod +x "$bundle_file.$$" && mv -f "$bundle_file.$$" "$bundle_file"
+  ( cd -- "$BUNDLE_OUTPUT" && sha256sum "$BUNDLE_NAME" > "$BUNDLE_NAME.sha256" )
+  echo "Bundle $BUNDLE_VERSION written to $bundle_file"
+}
+
+bundle
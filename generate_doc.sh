@@ -1,6 +1,6 @@
 #!/usr/bin/env bash
 
-libs="docker_compose github menu messages utils"
+libs="bashlibs docker_compose github log menu messages utils"
 
 for lib in $libs; do
   ./shdoc < libs/$lib.sh > doc/$lib.md
@@ -0,0 +1,72 @@
+#!/usr/bin/env bash
+# Install the bundle of the libraries built by bundle.sh, from a github release of bash-libs.
+#
+# The bundle is downloaded with its checksum file, and installed only if its sha256 checksum matches.
+# It is installed in the libs folder of the installation folder, next to the config and env folders,
+# and sourced once by the consumer scripts.
+#
+# Usage:
+#   curl -fsSL https://raw.githubusercontent.com/christopherlouet/bash-libs/main/installer.sh | bash
+#   curl -fsSL https://raw.githubusercontent.com/christopherlouet/bash-libs/main/installer.sh | bash -s -- v1.0.0 ~/bash-libs
+#
+# Arguments:
+#   $1  Release name (default latest).
+#   $2  Installation folder (default **BASHLIBS_INSTALL_FOLDER**, or ~/.bash-libs).
+
+INSTALLER_RELEASE=${1:-latest}
+INSTALLER_FOLDER=${2:-${BASHLIBS_INSTALL_FOLDER:-$HOME/.bash-libs}}
+INSTALLER_BUNDLE=bashlibs.bundle.sh
+GITHUB_BASE_URL=${GITHUB_BASE_URL:-https://github.com}
+GITHUB_PROJECT_NAME=${GITHUB_PROJECT_NAME:-christopherlouet/bash-libs}
+
+# Show an error message
+installer_die() {
+  echo "$1" > /dev/stderr
+}
+
+# Show the sha256 checksum of a file, with sha256sum or shasum
+installer_checksum() {
+  local checksum
+  if command -v sha256sum > /dev/null; then
+    checksum=$(sha256sum "$1") || return 1
+  elif command -v shasum > /dev/null; then
+    checksum=$(shasum -a 256 "$1") || return 1
+  else
+    installer_die "sha256sum or shasum could not be found" && return 1
+  fi
+  echo "${checksum%% *}"
+}
+
+# Download the bundle and its checksum file, check the checksum and install the bundle
+installer() {
+  local release_url="$GITHUB_BASE_URL/$GITHUB_PROJECT_NAME/releases/download/$INSTALLER_RELEASE"
+  local libs_folder="$INSTALLER_FOLDER/libs"
+  local download_folder checksum checksum_expected version
+
+  ! command -v curl > /dev/null && installer_die "curl could not be found" && return 1
+  [[ $INSTALLER_RELEASE == "latest" ]] && release_url="$GITHUB_BASE_URL/$GITHUB_PROJECT_NAME/releases/latest/download"
+  mkdir -p "$libs_folder" "$INSTALLER_FOLDER/config" "$INSTALLER_FOLDER/env" || return 1
+  download_folder=$(mktemp -d "$libs_folder/.install.XXXXXX") || return 1
+
+  # Download the two files with a single curl
+  if ! curl -fsL -o "$download_folder/$INSTALLER_BUNDLE" "$release_url/$INSTALLER_BUNDLE" \
+    -o "$download_folder/$INSTALLER_BUNDLE.sha256" "$release_url/$INSTALLER_BUNDLE.sha256"; then
+    rm -rf "$download_folder"
+    installer_die "Unable to download $INSTALLER_BUNDLE from $release_url" && return 1
+  fi
+  read -r checksum_expected _ < "$download_folder/$INSTALLER_BUNDLE.sha256"
+  checksum=$(installer_checksum "$download_folder/$INSTALLER_BUNDLE")
+  if [[ -z $checksum || $checksum != "$checksum_expected" ]]; then
+    rm -rf "$download_folder"
+    installer_die "The checksum of $INSTALLER_BUNDLE does not match $INSTALLER_BUNDLE.sha256" && return 1
+  fi
+
+  # Replace the installed bundle, once checked
+  mv -f "$download_folder/$INSTALLER_BUNDLE" "$download_folder/$INSTALLER_BUNDLE.sha256" "$libs_folder/"
+  rm -rf "$download_folder"
+  version=$(sed -n "s/^BASHLIBS_BUNDLE_VERSION=//p" "$libs_folder/$INSTALLER_BUNDLE")
+  echo "bash-libs ${version//\'/} installed in $libs_folder/$INSTALLER_BUNDLE"
+}
+
+# The script is only run once fully downloaded
+installer
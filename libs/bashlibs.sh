@@ -0,0 +1,203 @@
+#!/usr/bin/env bash
+# @file bashlibs.sh
+# @brief A loader for the libraries.
+# @description
+#     The loader is sourced by the libraries to check the arguments and load the environment file in the same process.
+#     The helper libraries are loaded lazily, on the first call of one of their functions.
+#     The configuration files are read from the config folder, or from the **BASHLIBS_CONFIG_FOLDER** folder if set.
+#     The environment files are stored in the env folder, or in the **BASHLIBS_ENV_FOLDER** folder if set,
+#     and their names are prefixed by **BASHLIBS_ENV_NAMESPACE** if set.
+#     When **BASHLIBS_TRACE** is set to a file path or to a file descriptor number, the calls of the functions
+#     and of the external commands are traced as JSON lines.
+
+# The loader is sourced once, a BASHLIBS_FOLDER variable exported by a parent process does not skip it
+declare -F bashlibs_require > /dev/null && return 0
+
+BASHLIBS_FOLDER=. && [[ ${BASH_SOURCE[0]} == */* ]] && BASHLIBS_FOLDER=${BASH_SOURCE[0]%/*}
+declare -gA BASHLIBS_LOADED=()
+BASHLIBS_LOCK_TIMEOUT=${BASHLIBS_LOCK_TIMEOUT:-10}
+BASHLIBS_TRACE_COMMANDS=${BASHLIBS_TRACE_COMMANDS:-yq jq docker curl git}
+declare -gA BASHLIBS_AUTOLOAD=()
+
+# @description Load a library once, in the current process.
+#
+# @arg $1 string Library name.
+#
+# @example
+# bashlibs_require messages
+function bashlibs_require() {
+  local lib=$1
+  [[ -n ${BASHLIBS_LOADED[$lib]} ]] && return 0
+  [[ ! -f "$BASHLIBS_FOLDER/$lib.sh" ]] && echo "Library with name '$lib' not exists" > /dev/stderr && return 1
+  BASHLIBS_LOADED[$lib]=1
+  # shellcheck source=/dev/null
+  source "$BASHLIBS_FOLDER/$lib.sh"
+}
+
+# @description Declare functions that will load their library on the first call.
+#
+# @arg $1 string Library name.
+# @arg $2 array Function names.
+#
+# @example
+# bashlibs_autoload messages show_message die
+function bashlibs_autoload() {
+  local lib=$1
+  local function_name
+  BASHLIBS_AUTOLOAD[$lib]=1
+  for function_name in "${@:2}"; do
+    declare -F "$function_name" > /dev/null && continue
+    eval "function $function_name() { bashlibs_require $lib && $function_name \"\$@\"; }"
+  done
+}
+
+bashlibs_autoload messages show_message die confirm_message
+bashlibs_autoload utils init_env
+bashlibs_autoload log log_message log_stream
+
+# @description Check if a function name exists.
+#
+# @arg $1 string Function name.
+function check_args() {
+  local function_name=$1
+  [[ -z "$function_name" ]] && { die "Please provide a function name" ; exit 1; }
+  ! declare -F "$function_name" > /dev/null && { die "Function with name '$function_name' not exists" ; exit 1; }
+  if [ "${function_name:0:1}" = "_" ]; then load_env; fi
+}
+
+# @description Load the environment variables with the .env file.
+#
+# The file is replaced atomically by init_env, so it can be loaded while another script initializes it.
+function load_env() {
+  if [ ! -f "$ENV_FILE" ]; then
+    die "Please initialize the environment file with the command '$SCRIPT_NAME init'" ; exit 1;
+  fi
+  # shellcheck source=/dev/null
+  source "$ENV_FILE"
+}
+
+# @description Call a function of a library bundled by bundle.sh, used by the namespaced functions of the bundle.
+#
+# The variables of the library are set and its environment is checked, as by the main function of the library,
+# then the environment file is loaded for the functions starting with _. The function runs in the current process.
+#
+# @arg $1 string Library name.
+# @arg $2 string Function name.
+# @arg $3 array Arguments of the function.
+#
+# @example
+# bashlibs_bundle_call menu _display_help test1
+function bashlibs_bundle_call() {
+  local bashlibs_bundle_lib=$1 bashlibs_bundle_function=$2
+  "bashlibs_bundle::$bashlibs_bundle_lib"
+  if declare -F "bashlibs_bundle::$bashlibs_bundle_lib::check_env" > /dev/null; then
+    "bashlibs_bundle::$bashlibs_bundle_lib::check_env"
+  fi
+  [[ ${bashlibs_bundle_function:0:1} == "_" ]] && load_env
+  "bashlibs_bundle::$bashlibs_bundle_lib::$bashlibs_bundle_function" "${@:3}"
+}
+
+# @description Start the tracing of the calls, if **BASHLIBS_TRACE** is set.
+#
+# Each function is replaced by a wrapper that writes a JSON line when the function is entered and when it returns,
+# with its duration and its return code. The external commands of **BASHLIBS_TRACE_COMMANDS** (default yq, jq,
+# docker, curl and git) are replaced by wrappers that write a JSON line with their arguments and their duration.
+# The lazily loaded libraries are loaded first, so that their functions are traced too.
+# The lines are appended to the **BASHLIBS_TRACE** file, or written to the file descriptor if it is a number.
+# Without **BASHLIBS_TRACE**, nothing is done.
+#
+# @example
+# BASHLIBS_TRACE=/tmp/trace.jsonl ./libs/menu.sh _display_help
+# BASHLIBS_TRACE=3 ./libs/menu.sh _display_help 3> >(jq -c 'select(.event == "exec")')
+function bashlibs_trace_start() {
+  local lib function_name command_name
+  local -a function_names=()
+  [[ -z $BASHLIBS_TRACE || -n $BASHLIBS_TRACE_FD ]] && return 0
+  if [[ $BASHLIBS_TRACE =~ ^[0-9]+$ ]]; then
+    BASHLIBS_TRACE_FD=$BASHLIBS_TRACE
+  elif ! exec {BASHLIBS_TRACE_FD}>> "$BASHLIBS_TRACE"; then
+    echo "Unable to open the trace file $BASHLIBS_TRACE" > /dev/stderr && BASHLIBS_TRACE_FD="" && return 1
+  fi
+  for lib in "${!BASHLIBS_AUTOLOAD[@]}"; do bashlibs_require "$lib"; done
+  mapfile -t function_names < <(compgen -A function)
+  # Rename the functions and declare the wrappers, in a single command substitution
+  eval "$(for function_name in "${function_names[@]}"; do
+    [[ $function_name == bashlibs_trace* || $function_name == main ]] && continue
+    printf 'bashlibs_trace::' && declare -f "$function_name"
+    printf '%s() { bashlibs_trace_call %s "$@"; }\n' "$function_name" "$function_name"
+  done)"
+  for command_name in $BASHLIBS_TRACE_COMMANDS; do
+    type -P "$command_name" > /dev/null || continue
+    eval "$command_name() { bashlibs_trace_exec $command_name \"\$@\"; }"
+  done
+}
+
+# @description Call a traced function, used by the wrappers of bashlibs_trace_start.
+#
+# @arg $1 string Function name.
+# @arg $2 array Arguments of the function.
+function bashlibs_trace_call() {
+  # The local variables are prefixed, not to hide the variables of the callers to the traced function
+  local bashlibs_trace_function=$1 bashlibs_trace_start_time=$EPOCHREALTIME bashlibs_trace_code
+  bashlibs_trace_write "enter" "\"function\":\"$bashlibs_trace_function\"" "$bashlibs_trace_start_time"
+  "bashlibs_trace::$bashlibs_trace_function" "${@:2}"
+  bashlibs_trace_code=$?
+  bashlibs_trace_write "exit" "\"function\":\"$bashlibs_trace_function\",\"code\":$bashlibs_trace_code" \
+    "$bashlibs_trace_start_time"
+  return $bashlibs_trace_code
+}
+
+# @description Run a traced external command, used by the wrappers of bashlibs_trace_start.
+#
+# @arg $1 string Command name.
+# @arg $2 array Arguments of the command.
+function bashlibs_trace_exec() {
+  local bashlibs_trace_command=$1 bashlibs_trace_start_time=$EPOCHREALTIME bashlibs_trace_code bashlibs_trace_args
+  command "$bashlibs_trace_command" "${@:2}"
+  bashlibs_trace_code=$?
+  bashlibs_trace_escape bashlibs_trace_args "${*:2}"
+  printf -v bashlibs_trace_args '"command":"%s","args":"%s","code":%s' \
+    "$bashlibs_trace_command" "$bashlibs_trace_args" "$bashlibs_trace_code"
+  bashlibs_trace_write "exec" "$bashlibs_trace_args" "$bashlibs_trace_start_time"
+  return $bashlibs_trace_code
+}
+
+# @description Write a debug message to the trace, with the name of the calling function.
+#
+# The calls are guarded by the callers, so that the message is not built when the tracing is off.
+#
+# @arg $1 string Message.
+#
+# @example
+# [[ -n $BASHLIBS_TRACE_FD ]] && bashlibs_trace "menu_compile: $menu_path_file"
+function bashlibs_trace() {
+  [[ -z $BASHLIBS_TRACE_FD ]] && return 0
+  local caller=${FUNCNAME[1]#bashlibs_trace::} message
+  bashlibs_trace_escape message "$1"
+  bashlibs_trace_write "debug" "\"function\":\"$caller\",\"message\":\"$message\""
+}
+
+# @description Write a JSON line to the trace, used by the trace functions.
+#
+# @arg $1 string Event name (enter, exit, exec or debug).
+# @arg $2 string JSON members of the event.
+# @arg $3 number Start time of the call, to add its duration in microseconds (optional).
+function bashlibs_trace_write() {
+  local event=$1 members=$2 start=$3 now=$EPOCHREALTIME duration=""
+  [[ -n $start && $event != "enter" ]] && duration=",\"duration_us\":$(( ${now/[.,]/} - ${start/[.,]/} ))"
+  printf '{"ts":%s,"pid":%s,"event":"%s",%s%s}\n' "${now/,/.}" "$BASHPID" "$event" "$members" "$duration" \
+    >&"$BASHLIBS_TRACE_FD"
+}
+
+# @description Escape a string for a JSON value, used by the trace functions.
+#
+# @arg $1 string Name of the variable to set.
+# @arg $2 string String to escape.
+function bashlibs_trace_escape() {
+  local value=${2//\\/\\\\}
+  value=${value//\"/\\\"}
+  value=${value//$'\n'/\\n}
+  value=${value//$'\t'/\\t}
+  value=${value//$'\r'/\\r}
+  printf -v "$1" '%s' "$value"
+}
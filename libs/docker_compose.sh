@@ -3,38 +3,114 @@
 # @brief A library for running docker compose commands with an environment file.
 # @description
 #     The library allows you to launch a docker compose command by retrieving the parameters in an environment file.
+#     Several projects can be described, with one environment file per project selected by the **DC_PROJECT** variable.
 
 LIBS_FOLDER=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
-CONFIG_FOLDER=$( cd -- $LIBS_FOLDER/../config &> /dev/null && pwd )
-ENV_FOLDER=$( cd -- $LIBS_FOLDER/../env &> /dev/null && pwd )
-LIBS_MESSAGES="$LIBS_FOLDER/messages.sh"
-LIBS_UTILS="$LIBS_FOLDER/utils.sh"
-SCRIPT_NAME="$(basename -- "${BASH_SOURCE[0]}")"
-ENV_FILE="$ENV_FOLDER/.${SCRIPT_NAME%.*}"
-DC_DEBUG=0
-
-main() { eval "$(bash "$LIBS_UTILS" "check_args" "$@") ; check_env ; check_args $*" ; "$@"; }
-show_message() { bash "$LIBS_MESSAGES" "${FUNCNAME[0]}" "$@"; }
-confirm_message() { bash "$LIBS_MESSAGES" "${FUNCNAME[0]}" "$@"; }
-die() { bash "$LIBS_MESSAGES" "${FUNCNAME[0]}" "$@"; }
-init_env() { bash "$LIBS_UTILS" "${FUNCNAME[0]}" "$@"; }
-
-# @description Load the environment variables with the .env file.
-function load_env() {
-  if [ ! -f "$ENV_FILE" ]; then
-    die "Please initialize the environment file with the command '$SCRIPT_NAME init project_name'" 1; exit 1;
-  fi
-  # shellcheck source=./docker_compose.env
-  source "$ENV_FILE"
-}
+CONFIG_FOLDER=${BASHLIBS_CONFIG_FOLDER:-$( cd -- $LIBS_FOLDER/../config &> /dev/null && pwd )}
+ENV_FOLDER=${BASHLIBS_ENV_FOLDER:-$( cd -- $LIBS_FOLDER/../env &> /dev/null && pwd )}
+SCRIPT_NAME="${BASH_SOURCE[0]##*/}"
+DC_ENV_PREFIX="$ENV_FOLDER/.${BASHLIBS_ENV_NAMESPACE:+$BASHLIBS_ENV_NAMESPACE.}${SCRIPT_NAME%.*}"
+ENV_FILE="$DC_ENV_PREFIX${DC_PROJECT:+.$DC_PROJECT}"
+DC_CAPS_FILE="$ENV_FOLDER/.${SCRIPT_NAME%.*}_caps"
+DC_COMPOSE_PLUGIN_FOLDERS="${DOCKER_CONFIG:-$HOME/.docker}/cli-plugins /usr/local/lib/docker/cli-plugins \
+/usr/local/libexec/docker/cli-plugins /usr/lib/docker/cli-plugins /usr/libexec/docker/cli-plugins"
+DC_WAIT_TIMEOUT=${DC_WAIT_TIMEOUT:-60}
+DC_WAIT_POLL_INTERVAL=${DC_WAIT_POLL_INTERVAL:-1}
+DC_CONCURRENCY=${DC_CONCURRENCY:-4}
+DC_CONFIG_PREFIX_FILE="$ENV_FOLDER/.${SCRIPT_NAME%.*}_config"
+
+# shellcheck source=./bashlibs.sh
+source "$LIBS_FOLDER/bashlibs.sh"
+
+main() { bashlibs_trace_start ; check_env ; check_args "$@" ; "$@"; }
 
 # @description Check if docker compose is installed,
 function check_env() {
-  if ! docker compose version 2>&1 | grep "Docker Compose version" 2> /dev/null > /dev/null ; then
+  if [[ -n $DC_PROJECT && ! $DC_PROJECT =~ ^[[:alnum:]_-]+$ ]]; then
+    die "Project name '$DC_PROJECT' is not valid" ; exit 1
+  fi
+  if ! dc_capabilities ; then
     die "docker compose could not be found" ; exit 1
   fi
 }
 
+# @description Find the docker binary and the docker compose plugin, used as keys of the capabilities cache.
+#
+# Returns the paths in the **dc_caps_docker** and **dc_caps_plugin** variables.
+dc_caps_binaries() {
+  local plugin_folder
+  dc_caps_docker=$(type -P docker)
+  dc_caps_plugin=""
+  for plugin_folder in $DC_COMPOSE_PLUGIN_FOLDERS; do
+    [[ -x $plugin_folder/docker-compose ]] && dc_caps_plugin="$plugin_folder/docker-compose" && break
+  done
+}
+
+# @description Load the docker compose capabilities (version and commands) from the cache in the env folder.
+#
+# The cache has the same modification time as the docker binary (and the docker compose plugin),
+# so docker is only probed again when one of them changes.
+# When the env folder is not writable, the capabilities are kept in memory without being cached.
+#
+# @arg $1 boolean Refresh the cache (default **false**).
+# @arg $2 boolean Show the capabilities (default **false**).
+#
+# @example
+# ./libs/docker_compose.sh dc_capabilities 1 1
+dc_capabilities() {
+  local refresh=${1:-0}
+  local show=${2:-0}
+  local dc_caps_docker dc_caps_plugin dc_caps_version dc_caps_commands
+
+  dc_caps_binaries
+  [[ -z $dc_caps_docker ]] && return 1
+
+  # Load the cache if the binaries have not changed
+  if [[ $refresh -eq 0 && -f $DC_CAPS_FILE ]] \
+    && [[ ! $dc_caps_docker -nt $DC_CAPS_FILE && ! $dc_caps_docker -ot $DC_CAPS_FILE ]] \
+    && [[ -z $dc_caps_plugin || ( ! $dc_caps_plugin -nt $DC_CAPS_FILE.plugin && ! $dc_caps_plugin -ot $DC_CAPS_FILE.plugin ) ]]; then
+    # shellcheck source=/dev/null
+    source "$DC_CAPS_FILE"
+    [[ $DC_CAPS_DOCKER != "$dc_caps_docker" || $DC_CAPS_PLUGIN != "$dc_caps_plugin" ]] && refresh=1
+  else
+    refresh=1
+  fi
+
+  # Probe docker compose and refresh the cache
+  if [[ $refresh -eq 1 ]]; then
+    [[ -n $BASHLIBS_TRACE_FD ]] && bashlibs_trace "probe $dc_caps_docker"
+    dc_caps_version=$(docker compose version --short 2> /dev/null)
+    [[ -z $dc_caps_version ]] && return 1
+    dc_caps_commands=$(docker compose --help 2> /dev/null \
+      | awk '/^Commands:/ { commands = 1 ; next } /^[^ ]/ { commands = 0 } commands && NF { printf "%s ", $1 }')
+    dc_caps_commands=${dc_caps_commands% }
+    if mkdir -p "${DC_CAPS_FILE%/*}" 2> /dev/null && {
+      echo "DC_CAPS_DOCKER=${dc_caps_docker@Q}"
+      echo "DC_CAPS_PLUGIN=${dc_caps_plugin@Q}"
+      echo "DC_CAPS_VERSION=${dc_caps_version@Q}"
+      echo "DC_CAPS_COMMANDS=${dc_caps_commands@Q}"
+    } 2> /dev/null > "$DC_CAPS_FILE.$BASHPID" \
+      && mv -f "$DC_CAPS_FILE.$BASHPID" "$DC_CAPS_FILE" && touch -r "$dc_caps_docker" "$DC_CAPS_FILE"; then
+      rm -f "$DC_CAPS_FILE.plugin"
+      [[ -n $dc_caps_plugin ]] && touch -r "$dc_caps_plugin" "$DC_CAPS_FILE.plugin"
+    else
+      # The env folder is not writable, the capabilities are kept in memory without being cached
+      rm -f "$DC_CAPS_FILE.$BASHPID" 2> /dev/null
+      [[ -n $BASHLIBS_TRACE_FD ]] && bashlibs_trace "unable to write $DC_CAPS_FILE, keep the capabilities in memory"
+    fi
+    DC_CAPS_DOCKER=$dc_caps_docker
+    DC_CAPS_PLUGIN=$dc_caps_plugin
+    DC_CAPS_VERSION=$dc_caps_version
+    DC_CAPS_COMMANDS=$dc_caps_commands
+  fi
+
+  if [[ $show -eq 1 ]]; then
+    echo "version: $DC_CAPS_VERSION"
+    echo "commands: $DC_CAPS_COMMANDS"
+  fi
+  return 0
+}
+
 # @description Initialize environment variables for a docker compose project.
 #
 # @arg $1 string Project name.
@@ -42,7 +118,7 @@ function check_env() {
 # @arg $3 string A docker compose file (Default docker-compose.yml).
 # @arg $4 string A docker compose profile (Optional).
 # @arg $5 string A docker compose environment file (Optional).
-# @arg $6 string A reference service to check the status (Optional).
+# @arg $6 string Reference services to check the status, separated by spaces (Optional).
 #
 # @example
 # ./libs/docker_compose.sh init "project_name"
@@ -50,11 +126,12 @@ init() {
   # Project name
   local DC_PROJECT_NAME=$1
   # Project folder
-  local DC_FOLDER=${2:-$CONFIG_FOLDER/$(echo "$DC_PROJECT_NAME"|rev|cut -d"/" -f1|rev)}
+  local DC_FOLDER=${2:-$CONFIG_FOLDER/${DC_PROJECT_NAME##*/}}
   # Docker-compose file
   local DC_FILE=${3:-docker-compose.yml}
   local DC_PROFILE=$4
   local DC_ENV_FILE=$5
+  # Reference services, separated by spaces
   local DC_SERVICE_REF=$6
   # Initializing environment variables
   declare -A ENV_PARAMS=(
@@ -68,6 +145,85 @@ init() {
   init_env "$ENV_FILE" "$(declare -p ENV_PARAMS)"
 }
 
+# @description List the named projects, initialized with the **DC_PROJECT** variable.
+#
+# @example
+# ./libs/docker_compose.sh dc_projects
+dc_projects() {
+  local env_file
+  for env_file in "$DC_ENV_PREFIX".*; do
+    [[ -f $env_file ]] && echo "${env_file##*.}"
+  done
+}
+
+# @description Run a docker compose command on several named projects, in parallel.
+#
+# Each output line is prefixed by the project name.
+# The projects that failed are shown with their exit code at the end.
+#
+# @arg $1 string Project names, separated by spaces (default all projects).
+# @arg $2 number Maximum number of projects run at the same time (default **DC_CONCURRENCY**, 4).
+# @arg $3 string Docker compose command.
+# @arg $4 array Docker compose options (Optional).
+#
+# @example
+# ./libs/docker_compose.sh dc_run_projects "web db" 2 restart
+dc_run_projects() {
+  local projects=${1:-$(dc_projects)}
+  local concurrency=${2:-$DC_CONCURRENCY}
+  local dc_command=$3
+  # shellcheck disable=SC2124
+  local dc_options="${@:4: $#-1}"
+  local -A dc_run_pids=()
+  local -a dc_run_failed=()
+  local project
+
+  [[ -z $projects ]] && die "Please provide a project name" && return 1
+  [[ ! $concurrency =~ ^[1-9][0-9]*$ ]] && die "Please provide a number of projects run at the same time" && return 1
+  [[ -z $dc_command ]] && die "Please provide a docker compose command" && return 1
+  for project in $projects; do
+    [[ ! -f "$DC_ENV_PREFIX.$project" ]] && die "Project with name '$project' not exists" && return 1
+  done
+
+  for project in $projects; do
+    while [[ ${#dc_run_pids[@]} -ge $concurrency ]]; do dc_run_reap; done
+    {
+      # shellcheck disable=SC2086
+      ( DC_PROJECT=$project ENV_FILE="$DC_ENV_PREFIX.$project" && load_env \
+        && _dc_exec_command 0 "$dc_command" $dc_options ) 2>&1 | dc_prefix "$project"
+      exit "${PIPESTATUS[0]}"
+    } &
+    dc_run_pids[$!]=$project
+  done
+  while [[ ${#dc_run_pids[@]} -gt 0 ]]; do dc_run_reap; done
+
+  if [[ ${#dc_run_failed[@]} -gt 0 ]]; then
+    die "Projects failed: ${dc_run_failed[*]}" && return 1
+  fi
+  return 0
+}
+
+# @description Wait for the end of a project run by dc_run_projects, and keep its exit code.
+dc_run_reap() {
+  local pid exit_code
+  wait -n -p pid "${!dc_run_pids[@]}"
+  exit_code=$?
+  [[ -z $pid ]] && dc_run_pids=() && return 0
+  [[ $exit_code -ne 0 ]] && dc_run_failed+=("${dc_run_pids[$pid]} ($exit_code)")
+  unset "dc_run_pids[$pid]"
+}
+
+# @description Prefix each line of the standard input, used by dc_run_projects.
+#
+# @arg $1 string Prefix.
+dc_prefix() {
+  local prefix=$1
+  local line
+  while IFS= read -r line || [[ -n $line ]]; do
+    printf "%s | %s\n" "$prefix" "$line"
+  done
+}
+
 # @description Build a docker compose command.
 #
 # @arg $1 string Docker compose file path.
@@ -83,9 +239,8 @@ dc_build_docker_compose() {
   local dc_options="${@:3: $#-1}"
   [[ ! -f $dc_path_file ]] && die "Please provide a docker compose file" && return 1
   [[ -z "$dc_command" ]] && die "Please provide a command" && return 1
-  docker compose $dc_command 2>&1|tail -n1|grep "unknown docker command" > /dev/null
-  # shellcheck disable=SC2181
-  [[ $? -eq 0 ]] && die "Unknown docker command: $dc_command" && return 1
+  [[ -z $DC_CAPS_COMMANDS ]] && ! dc_capabilities && die "docker compose could not be found" && return 1
+  [[ ! " $DC_CAPS_COMMANDS " == *" $dc_command "* ]] && die "Unknown docker command: $dc_command" && return 1
   if [ -z "$dc_options" ]; then
     echo "docker compose -f $dc_path_file $dc_command"
   else
@@ -126,21 +281,16 @@ dc_exec_command() {
   local dc_options="${@:4: $#-1}"
   local dc_build_docker_compose
 
-  # Debug dc_exec_command
-  if [ $DC_DEBUG -eq 1 ]; then
-    echo "dc_path_file: $dc_path_file"
-    echo "show: $show"
-    echo "dc_command: $dc_command"
-    echo "dc_options: $dc_options"
-  fi
+  [[ -n $BASHLIBS_TRACE_FD ]] && bashlibs_trace "dc_path_file: $dc_path_file, show: $show, dc_command: $dc_command, \
+dc_options: $dc_options"
 
   [[ ! -f $dc_path_file ]] && die "Please provide a docker compose file" && return 1
   [[ -z $dc_command ]] && die "Please provide a docker compose command" && return 1
   dc_build_docker_compose=$(dc_build_docker_compose "$dc_path_file" $dc_command $dc_options)
   [[ $? -eq 1 ]] && return 1
-  [[ $show -eq 1 ]] && echo $dc_build_docker_compose
-  [[ $show -eq 0 ]] && eval $dc_build_docker_compose
-  return 0
+  [[ $show -eq 1 ]] && echo $dc_build_docker_compose && return 0
+  # The exit code of docker compose is returned, to be collected by dc_run_projects
+  eval $dc_build_docker_compose
 }
 
 # @description Execute or show a docker compose command with **environment file**.
@@ -185,27 +335,428 @@ dc_status() {
 # @example
 # ./libs/docker_compose.sh _dc_status
 _dc_status() {
-  dc_status $CONFIG_FOLDER/$DC_FOLDER/$DC_FILE $DC_SERVICE_REF
+  dc_status $CONFIG_FOLDER/$DC_FOLDER/$DC_FILE ${DC_SERVICE_REF%% *}
+}
+
+# @description Show the state, the health and the exit code of all services, with a single docker call.
+#
+# @arg $1 string Docker compose file path.
+# @arg $2 string A docker compose profile to filter the services (Optional).
+# @arg $3 array Docker compose options (Optional).
+#
+# @example
+# ./libs/docker_compose.sh dc_status_all config/docker_compose/docker-compose.yml profile_test1
+dc_status_all() {
+  local dc_path_file=$1
+  local profile=$2
+  # shellcheck disable=SC2124
+  local dc_options="${@:3: $#-1}"
+  local result service state health exit_code
+  [[ ! -f $dc_path_file ]] && die "Please provide a docker compose file" && return 1
+  [[ -n $profile ]] && dc_options="$dc_options --profile $profile"
+  # shellcheck disable=SC2086
+  result=$(docker compose -f "$dc_path_file" $dc_options ps --all \
+    --format '{{.Service}} {{.State}} {{if .Health}}{{.Health}}{{else}}-{{end}} {{.ExitCode}}' 2>&1)
+  [[ $? -ne 0 ]] && show_message "$result" 1 && return 1
+  printf "%-20s %-12s %-10s %s\n" "SERVICE" "STATE" "HEALTH" "EXIT CODE"
+  while read -r service state health exit_code; do
+    [[ -z $service ]] && continue
+    printf "%-20s %-12s %-10s %s\n" "$service" "$state" "$health" "$exit_code"
+  done <<< "$result"
+}
+
+# @description Show the state, the health and the exit code of all services with **environment file**.
+#
+# @arg $1 string A docker compose profile to filter the services (default **DC_PROFILE**).
+#
+# @example
+# ./libs/docker_compose.sh _dc_status_all profile_test2
+_dc_status_all() {
+  local DC_PROFILE=${1:-$DC_PROFILE}
+  _dc_build_options 0
+  # shellcheck disable=SC2086
+  dc_status_all $CONFIG_FOLDER/$DC_FOLDER/$DC_FILE "" $dc_build_options
+}
+
+# @description Wait until the services are running, or healthy when they have a healthcheck.
+#
+# The states are read once, then, if some services are not ready, the function waits on the docker compose events,
+# instead of polling the status of the services. If the events stream is closed before the deadline (events not
+# supported, daemon error), the states are polled every **DC_WAIT_POLL_INTERVAL** seconds (default 1) until it.
+# The time to ready of each service is shown.
+#
+# @arg $1 string Docker compose file path.
+# @arg $2 number Timeout in seconds (default **DC_WAIT_TIMEOUT**, 60).
+# @arg $3 string Service names, separated by spaces.
+# @arg $4 array Docker compose options (Optional).
+#
+# @example
+# ./libs/docker_compose.sh dc_wait config/docker_compose/docker-compose.yml 30 "dc_test1 dc_test2" --profile profile_test1
+dc_wait() {
+  local dc_path_file=$1
+  local timeout=${2:-$DC_WAIT_TIMEOUT}
+  local services=$3
+  # shellcheck disable=SC2124
+  local dc_options="${@:4: $#-1}"
+  local -A dc_wait_pending=()
+  local service start deadline now wait_time event events_fd events_pid read_code events_closed=0 poll
+
+  [[ ! -f $dc_path_file ]] && die "Please provide a docker compose file" && return 1
+  [[ -z $services ]] && die "Please provide a docker compose service name" && return 1
+  [[ ! $timeout =~ ^[0-9]+$ ]] && die "Please provide a timeout in seconds" && return 1
+  for service in $services; do dc_wait_pending[$service]=1; done
+  start=${EPOCHREALTIME/[.,]/}
+  deadline=$(( start + timeout * 1000000 ))
+
+  # shellcheck disable=SC2086
+  dc_wait_states $services
+  [[ ${#dc_wait_pending[@]} -eq 0 ]] && return 0
+  # Subscribe to the events, then read the states again, so that no event is lost between them
+  # shellcheck disable=SC2086
+  exec {events_fd}< <(exec docker compose -f "$dc_path_file" $dc_options events --json ${!dc_wait_pending[*]} 2> /dev/null)
+  events_pid=$!
+  dc_wait_states "${!dc_wait_pending[@]}"
+
+  while [[ ${#dc_wait_pending[@]} -gt 0 ]]; do
+    now=${EPOCHREALTIME/[.,]/}
+    [[ $now -ge $deadline ]] && break
+    if [[ $events_closed -eq 1 ]]; then
+      # Poll the states until the deadline
+      poll=$(( DC_WAIT_POLL_INTERVAL * 1000000 ))
+      [[ $(( deadline - now )) -lt $poll ]] && poll=$(( deadline - now ))
+      printf -v wait_time '%d.%06d' $(( poll / 1000000 )) $(( poll % 1000000 ))
+      sleep "$wait_time"
+      dc_wait_states "${!dc_wait_pending[@]}"
+      continue
+    fi
+    printf -v wait_time '%d.%06d' $(( (deadline - now) / 1000000 )) $(( (deadline - now) % 1000000 ))
+    read -r -t "$wait_time" -u "$events_fd" event
+    read_code=$?
+    # The read timed out (code greater than 128), the deadline is checked again
+    [[ $read_code -gt 128 ]] && continue
+    if [[ $read_code -ne 0 ]]; then
+      [[ -n $BASHLIBS_TRACE_FD ]] && bashlibs_trace "events stream closed, poll the states"
+      events_closed=1
+      continue
+    fi
+    [[ -n $BASHLIBS_TRACE_FD ]] && bashlibs_trace "event $event"
+    [[ $event =~ \"service\":\"([^\"]+)\" ]] || continue
+    service=${BASH_REMATCH[1]}
+    [[ -z ${dc_wait_pending[$service]} ]] && continue
+    case $event in
+      *'"action":"start"'*) dc_wait_states "$service" ;;
+      *'"action":"health_status: healthy"'*) dc_wait_ready "$service" healthy ;;
+    esac
+  done
+
+  kill "$events_pid" 2> /dev/null
+  exec {events_fd}<&-
+  if [[ ${#dc_wait_pending[@]} -gt 0 ]]; then
+    die "Timeout waiting for services: ${!dc_wait_pending[*]}" && return 1
+  fi
+  return 0
 }
 
-# @description Show a prompt during container startup with **environment file**.
+# @description Read the states of services, and mark the services ready, used by dc_wait.
+#
+# @arg $@ array Service names.
+dc_wait_states() {
+  local service state health
+  # shellcheck disable=SC2086
+  while read -r service state health; do
+    [[ -z ${dc_wait_pending[$service]} ]] && continue
+    if [[ -z $health && $state == "running" ]]; then
+      dc_wait_ready "$service" running
+    elif [[ $health == "healthy" ]]; then
+      dc_wait_ready "$service" healthy
+    fi
+  done < <(docker compose -f "$dc_path_file" $dc_options ps --all --format '{{.Service}} {{.State}} {{.Health}}' "$@" 2> /dev/null)
+}
+
+# @description Show the time to ready of a service, used by dc_wait.
+#
+# @arg $1 string Service name.
+# @arg $2 string Service state.
+dc_wait_ready() {
+  local service=$1
+  local state=$2
+  local elapsed=$(( (${EPOCHREALTIME/[.,]/} - start) / 1000 ))
+  unset "dc_wait_pending[$service]"
+  printf "%s is %s (%d.%03ds)\n" "$service" "$state" $(( elapsed / 1000 )) $(( elapsed % 1000 ))
+}
+
+# @description Wait until the reference services are ready with **environment file**.
 #
 # @example
 # ./libs/docker_compose.sh _dc_waiting_start
 _dc_waiting_start() {
-  i=0
-  spin='-\|/'
-  start=$(date +%s)
-  status="up"
-  while [ "$status" = "up" ]; do
-    i=$(( (i+1) %4 ))
-    printf "\r\033[0;32mWaiting application start... %s" ${spin:$i:1}
-    sleep 0.2
-    status=$(_dc_status)
+  local start=$SECONDS
+  _dc_build_options 0
+  printf "\033[0;32mWaiting application start...\033[0m\n"
+  dc_wait $CONFIG_FOLDER/$DC_FOLDER/$DC_FILE "$DC_WAIT_TIMEOUT" "$DC_SERVICE_REF" $dc_build_options || return 1
+  printf "\033[0;32mdone (%ss)\033[0m\n" $(( SECONDS - start ))
+}
+
+# @description List the files of a docker compose model: the docker compose file, and the files it includes
+# (**include**) or extends (**extends.file**), recursively.
+#
+# @arg $1 string Docker compose file path.
+#
+# Returns the files in the **dc_config_paths** array, or 1 when a file can not be listed from the disk
+# (remote include, path with a variable or in a flow sequence).
+dc_config_files() {
+  local -a queue=("$1")
+  local -A seen=()
+  local file folder line value in_include extends_indent
+  dc_config_paths=()
+  while [[ ${#queue[@]} -gt 0 ]]; do
+    file=${queue[0]} && queue=("${queue[@]:1}")
+    [[ -n ${seen[$file]} || ! -f $file ]] && continue
+    seen[$file]=1 && dc_config_paths+=("$file")
+    folder=. && [[ $file == */* ]] && folder=${file%/*}
+    in_include=0 && extends_indent=""
+    while IFS= read -r line || [[ -n $line ]]; do
+      [[ $line =~ ^[^[:space:]#] ]] && in_include=0
+      [[ -n $extends_indent && $line =~ ^([[:space:]]*)[^[:space:]#] && ${#BASH_REMATCH[1]} -le $extends_indent ]] \
+        && extends_indent=""
+      if [[ $line =~ ^include:[[:space:]]*(#.*)?$ ]]; then
+        in_include=1 && continue
+      elif [[ $line =~ ^include: ]]; then
+        return 1
+      elif [[ $in_include -eq 1 && $line =~ ^[[:space:]]*-[[:space:]]+[^[:space:]#]*:[^[:space:]] ]]; then
+        return 1
+      elif [[ $line =~ ^([[:space:]]+)extends:[[:space:]]*(#.*)?$ ]]; then
+        extends_indent=${#BASH_REMATCH[1]} && continue
+      fi
+      value=""
+      # A path of the include block (short syntax, or path attribute), or the file of an extends attribute
+      if [[ $in_include -eq 1 && $line =~ ^[[:space:]]*(-[[:space:]]+)?(path:[[:space:]]*)?([^[:space:]#:][^#:]*)$ ]]; then
+        value=${BASH_REMATCH[3]}
+      elif [[ $in_include -eq 1 && $line =~ ^[[:space:]]*(-[[:space:]]+)?path:[[:space:]]*([^[:space:]#].*)$ ]]; then
+        value=${BASH_REMATCH[2]}
+      elif [[ -n $extends_indent && $line =~ ^[[:space:]]+file:[[:space:]]*([^[:space:]#].*)$ ]]; then
+        value=${BASH_REMATCH[1]}
+      fi
+      [[ -z $value ]] && continue
+      value=${value%%[[:space:]]#*} && value=${value%"${value##*[![:space:]]}"}
+      [[ $value == \"*\" || $value == \'*\' ]] && value=${value:1:-1}
+      [[ $value == *'://'* || $value == *'$'* || $value == [\[{]* ]] && return 1
+      [[ $value != /* ]] && value="$folder/$value"
+      queue+=("$value")
+    done < "$file"
   done
-  cur=$(date +%s)
-  runtime=$(( cur-start ))
-  printf " done (%ss)\033[0m\n" $runtime
+}
+
+# @description Convert the model resolved by docker compose config (YAML) to bash statements, without yq or jq.
+#
+# Only the project name, and the image and container name of the services are read, from the normalized output of
+# docker compose config (two spaces indentation).
+#
+# @stdin The docker compose model.
+dc_config_parse() {
+  local line section="" service="" key value services=""
+  while IFS= read -r line; do
+    if [[ $line =~ ^([^[:space:]#:]+):[[:space:]]*(.*)$ ]]; then
+      section=${BASH_REMATCH[1]} && value=${BASH_REMATCH[2]} && service=""
+      [[ $value == \"*\" || $value == \'*\' ]] && value=${value:1:-1}
+      [[ $section == "name" ]] && echo "DC_CONFIG_NAME=${value@Q}"
+    elif [[ $section == "services" && $line =~ ^\ \ ([^[:space:]#:][^:]*):[[:space:]]*$ ]]; then
+      service=${BASH_REMATCH[1]}
+      [[ $service == \"*\" || $service == \'*\' ]] && service=${service:1:-1}
+      services+="$service "
+    elif [[ -n $service && $line =~ ^\ \ \ \ (image|container_name):[[:space:]]*(.*)$ ]]; then
+      key=${BASH_REMATCH[1]} && value=${BASH_REMATCH[2]}
+      [[ $value == \"*\" || $value == \'*\' ]] && value=${value:1:-1}
+      [[ $key == "image" ]] && echo "DC_CONFIG_IMAGES[${service@Q}]=${value@Q}"
+      [[ $key == "container_name" ]] && echo "DC_CONFIG_CONTAINERS[${service@Q}]=${value@Q}"
+    fi
+  done
+  services=${services% }
+  echo "DC_CONFIG_SERVICES=${services@Q}"
+}
+
+# @description Load the model of a docker compose file resolved by docker compose config, from a cache in the env folder.
+#
+# The model (project name, services, images and container names) is resolved once, and cached with a key made of the
+# hashes of the docker compose file and of the files it includes or extends, of the environment file (**--env-file**
+# option, or .env file of the project folder), and of the profile and the options. The cache is only rebuilt when one
+# of them changes. When an included file can not be hashed (remote include, path with a variable), the model is
+# resolved at each call without cache. When the env folder is not writable, the model is loaded in memory without cache.
+#
+# @arg $1 string Docker compose file path.
+# @arg $2 boolean Refresh the cache (default **false**).
+# @arg $3 string A docker compose profile (Optional).
+# @arg $4 array Docker compose options (Optional).
+#
+# Returns the model in the **DC_CONFIG_NAME**, **DC_CONFIG_SERVICES**, **DC_CONFIG_IMAGES** (by service)
+# and **DC_CONFIG_CONTAINERS** (by service) variables.
+#
+# @example
+# ./libs/docker_compose.sh dc_config config/docker_compose/docker-compose.yml 1 profile_test1
+dc_config() {
+  local dc_path_file=$1
+  local refresh=${2:-0}
+  local profile=$3
+  # shellcheck disable=SC2124
+  local dc_options="${@:4: $#-1}"
+  local dc_project_folder=. env_file="" option option_previous="" dc_config_file="" dc_config_key dc_config_model hash
+  local -a dc_config_hashes=() dc_config_paths=()
+
+  [[ ! -f $dc_path_file ]] && die "Please provide a docker compose file" && return 1
+  [[ -n $profile ]] && dc_options="$dc_options --profile $profile"
+  # The environment file of the options, or the .env file of the project folder
+  for option in $dc_options; do
+    [[ $option_previous == "--env-file" ]] && env_file=$option
+    [[ $option == --env-file=* ]] && env_file=${option#*=}
+    option_previous=$option
+  done
+  [[ $dc_path_file == */* ]] && dc_project_folder=${dc_path_file%/*}
+  [[ -z $env_file && -f $dc_project_folder/.env ]] && env_file="$dc_project_folder/.env"
+  [[ -n $env_file && ! -f $env_file ]] && die "Environment file $env_file not exists" && return 1
+
+  # The cache file is named after the hash of the command, and keyed with the hashes of the files
+  if dc_config_files "$dc_path_file"; then
+    mapfile -t dc_config_hashes < <(printf '%s\n' "$dc_path_file $dc_options" \
+      | sha256sum - "${dc_config_paths[@]}" ${env_file:+"$env_file"})
+    dc_config_file="${DC_CONFIG_PREFIX_FILE}_${dc_config_hashes[0]:0:16}"
+  fi
+  dc_config_key=""
+  for hash in "${dc_config_hashes[@]:1}"; do dc_config_key+="${hash%% *} "; done
+  if [[ $refresh -eq 0 && -n $dc_config_file && -f $dc_config_file ]]; then
+    # shellcheck source=/dev/null
+    source "$dc_config_file"
+    [[ $DC_CONFIG_KEY == "$dc_config_key" ]] && return 0
+  fi
+
+  # Resolve the model and refresh the cache
+  [[ -n $BASHLIBS_TRACE_FD ]] && bashlibs_trace "resolve $dc_path_file $dc_options"
+  # shellcheck disable=SC2086
+  dc_config_model=$(docker compose -f "$dc_path_file" $dc_options config 2>&1)
+  [[ $? -ne 0 ]] && show_message "$dc_config_model" 1 && return 1
+  dc_config_model=$(
+    echo "# Model of $dc_path_file generated by $SCRIPT_NAME"
+    echo "DC_CONFIG_KEY=${dc_config_key@Q}"
+    echo "declare -gA DC_CONFIG_IMAGES=() DC_CONFIG_CONTAINERS=()"
+    dc_config_parse <<< "$dc_config_model"
+  )
+  if [[ -z $dc_config_file ]]; then
+    [[ -n $BASHLIBS_TRACE_FD ]] && bashlibs_trace "no cache for $dc_path_file, an included file can not be hashed"
+    eval "$dc_config_model" && return 0
+  fi
+  if ! { mkdir -p "${dc_config_file%/*}" 2> /dev/null \
+    && echo "$dc_config_model" 2> /dev/null > "$dc_config_file.$BASHPID" \
+    && mv -f "$dc_config_file.$BASHPID" "$dc_config_file"; }; then
+    # The env folder is not writable, the model is loaded without being cached
+    rm -f "$dc_config_file.$BASHPID" 2> /dev/null
+    [[ -n $BASHLIBS_TRACE_FD ]] && bashlibs_trace "unable to write $dc_config_file, load the model in memory"
+    eval "$dc_config_model" ; return
+  fi
+  # shellcheck source=/dev/null
+  source "$dc_config_file"
+}
+
+# @description List the services of a docker compose file enabled by a profile, from the cache of dc_config.
+#
+# @arg $1 string Docker compose file path.
+# @arg $2 string A docker compose profile (Optional).
+# @arg $3 array Docker compose options (Optional).
+#
+# @example
+# ./libs/docker_compose.sh dc_config_services config/docker_compose/docker-compose.yml profile_test1
+dc_config_services() {
+  local service
+  dc_config "$1" 0 "${@:2}" || return 1
+  for service in $DC_CONFIG_SERVICES; do echo "$service"; done
+}
+
+# @description List the images to pull for the services enabled by a profile, from the cache of dc_config.
+#
+# @arg $1 string Docker compose file path.
+# @arg $2 string A docker compose profile (Optional).
+# @arg $3 array Docker compose options (Optional).
+#
+# @example
+# ./libs/docker_compose.sh dc_config_images config/docker_compose/docker-compose.yml profile_test1
+dc_config_images() {
+  local service image
+  local -A images=()
+  dc_config "$1" 0 "${@:2}" || return 1
+  for service in $DC_CONFIG_SERVICES; do
+    image=${DC_CONFIG_IMAGES[$service]}
+    [[ -z $image || -n ${images[$image]} ]] && continue
+    images[$image]=1
+    echo "$image"
+  done
+}
+
+# @description Show the service of a container, from the cache of dc_config.
+#
+# The container is found by its container_name, or by the default name of docker compose (project-service-index).
+#
+# @arg $1 string Docker compose file path.
+# @arg $2 string Container name.
+# @arg $3 string A docker compose profile (Optional).
+# @arg $4 array Docker compose options (Optional).
+#
+# @example
+# ./libs/docker_compose.sh dc_config_service config/docker_compose/docker-compose.yml docker_compose-dc_test1-1 profile_test1
+dc_config_service() {
+  local dc_path_file=$1
+  local container=${2#/}
+  local service separator
+  [[ -z $container ]] && die "Please provide a container name" && return 1
+  dc_config "$dc_path_file" 0 "${@:3}" || return 1
+  for service in $DC_CONFIG_SERVICES; do
+    [[ ${DC_CONFIG_CONTAINERS[$service]} == "$container" ]] && echo "$service" && return 0
+  done
+  # Default names of docker compose v2 (project-service-1) and v1 (project_service_1)
+  for separator in - _; do
+    service=${container#"$DC_CONFIG_NAME$separator"}
+    [[ $service == "$container" || ! ${service##*"$separator"} =~ ^[0-9]+$ ]] && continue
+    service=${service%"$separator"*}
+    [[ -n ${DC_CONFIG_IMAGES[$service]+1} ]] && echo "$service" && return 0
+  done
+  die "Container with name $container is not a service of $dc_path_file" && return 1
+}
+
+# @description List the services enabled by a profile with **environment file**.
+#
+# @arg $1 string A docker compose profile (default **DC_PROFILE**).
+#
+# @example
+# ./libs/docker_compose.sh _dc_config_services profile_test2
+_dc_config_services() {
+  local profile=${1:-$DC_PROFILE}
+  local DC_PROFILE=""
+  _dc_build_options 0
+  # shellcheck disable=SC2086
+  dc_config_services $CONFIG_FOLDER/$DC_FOLDER/$DC_FILE "$profile" $dc_build_options
+}
+
+# @description List the images to pull for the services enabled by a profile with **environment file**.
+#
+# @arg $1 string A docker compose profile (default **DC_PROFILE**).
+#
+# @example
+# ./libs/docker_compose.sh _dc_config_images
+_dc_config_images() {
+  local profile=${1:-$DC_PROFILE}
+  local DC_PROFILE=""
+  _dc_build_options 0
+  # shellcheck disable=SC2086
+  dc_config_images $CONFIG_FOLDER/$DC_FOLDER/$DC_FILE "$profile" $dc_build_options
+}
+
+# @description Show the service of a container with **environment file**.
+#
+# @arg $1 string Container name.
+#
+# @example
+# ./libs/docker_compose.sh _dc_config_service docker_compose-dc_test1-1
+_dc_config_service() {
+  _dc_build_options 0
+  # shellcheck disable=SC2086
+  dc_config_service $CONFIG_FOLDER/$DC_FOLDER/$DC_FILE "$1" "" $dc_build_options
 }
 
 main "$@"
@@ -3,33 +3,29 @@
 # @brief A library for manage a github project with an environment file.
 # @description
 #     The library allows you to clone a github project by retrieving the parameters in an environment file.
+#     The github endpoints can be changed with the **GITHUB_API_URL** and **GITHUB_BASE_URL** variables.
 
 LIBS_FOLDER=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
-CONFIG_FOLDER=$( cd -- $LIBS_FOLDER/../config &> /dev/null && pwd )
-ENV_FOLDER=$( cd -- $LIBS_FOLDER/../env &> /dev/null && pwd )
-LIBS_MESSAGES="$LIBS_FOLDER/messages.sh"
-LIBS_UTILS="$LIBS_FOLDER/utils.sh"
-SCRIPT_NAME="$(basename -- "${BASH_SOURCE[0]}")"
-ENV_FILE="$ENV_FOLDER/.${SCRIPT_NAME%.*}"
-GITHUB_BASE_URL="https://github.com"
-GITHUB_API_URL="https://api.github.com"
+CONFIG_FOLDER=${BASHLIBS_CONFIG_FOLDER:-$( cd -- $LIBS_FOLDER/../config &> /dev/null && pwd )}
+ENV_FOLDER=${BASHLIBS_ENV_FOLDER:-$( cd -- $LIBS_FOLDER/../env &> /dev/null && pwd )}
+SCRIPT_NAME="${BASH_SOURCE[0]##*/}"
+ENV_FILE="$ENV_FOLDER/.${BASHLIBS_ENV_NAMESPACE:+$BASHLIBS_ENV_NAMESPACE.}${SCRIPT_NAME%.*}"
+GITHUB_BASE_URL=${GITHUB_BASE_URL:-https://github.com}
+GITHUB_API_URL=${GITHUB_API_URL:-https://api.github.com}
 GITHUB_API_REPOS_URL="$GITHUB_API_URL/repos"
 GITHUB_API_RATE_URL="$GITHUB_API_URL/rate_limit"
+GITHUB_CACHE_FOLDER="$ENV_FOLDER/.${SCRIPT_NAME%.*}_cache"
+GITHUB_CACHE_TTL=${GITHUB_CACHE_TTL:-0}
+GITHUB_RATE_MAX_WAIT=${GITHUB_RATE_MAX_WAIT:-300}
+GITHUB_PARALLEL_MAX=${GITHUB_PARALLEL_MAX:-50}
+GITHUB_ASSETS_CACHE=${GITHUB_ASSETS_CACHE:-$ENV_FOLDER/.${SCRIPT_NAME%.*}_assets}
+GITHUB_DOWNLOAD_PARTS=${GITHUB_DOWNLOAD_PARTS:-4}
+GITHUB_DOWNLOAD_PART_SIZE=${GITHUB_DOWNLOAD_PART_SIZE:-8388608}
 
-main() { eval "$(bash "$LIBS_UTILS" "check_args" "$@") ; check_args $*" ; "$@"; }
-show_message() { bash "$LIBS_MESSAGES" "${FUNCNAME[0]}" "$@"; }
-confirm_message() { bash "$LIBS_MESSAGES" "${FUNCNAME[0]}" "$@"; }
-die() { bash "$LIBS_MESSAGES" "${FUNCNAME[0]}" "$@"; }
-init_env() { bash "$LIBS_UTILS" "${FUNCNAME[0]}" "$@"; }
+# shellcheck source=./bashlibs.sh
+source "$LIBS_FOLDER/bashlibs.sh"
 
-# @description Load the environment variables with the .env file.
-function load_env() {
-  if [ ! -f "$ENV_FILE" ]; then
-    die "Please initialize the environment file with the command '$SCRIPT_NAME init project_path'" ; exit 1;
-  fi
-  # shellcheck source=./github.env
-  source "$ENV_FILE"
-}
+main() { bashlibs_trace_start ; check_args "$@" ; "$@"; }
 
 # @description Initialize environment variables for a github project.
 #
@@ -44,7 +40,7 @@ init() {
   # Project name
   GITHUB_PROJECT_NAME=$1
   # Project folder
-  GITHUB_PROJECT_FOLDER=$CONFIG_FOLDER/${2:-$(echo "$GITHUB_PROJECT_NAME"|rev|cut -d"/" -f1|rev)}
+  GITHUB_PROJECT_FOLDER=$CONFIG_FOLDER/${2:-${GITHUB_PROJECT_NAME##*/}}
   # Api token
   GITHUB_API_TOKEN=$3
   [[ -z "$GITHUB_PROJECT_NAME" ]] && die "Please provide the project path" && return 1
@@ -63,36 +59,191 @@ init() {
   init_env "$ENV_FILE" "$(declare -p ENV_PARAMS)"
 }
 
+# @description Send a GET request to the github API, with a cache of the responses in the env folder.
+#
+# The responses are cached by url and token, with their ETag and Last-Modified headers.
+# A cached response is revalidated with a conditional request, and a 304 response is served from the cache.
+# A cached response younger than **GITHUB_CACHE_TTL** seconds (default 0) is served without a request.
+# Behind a proxy, the headers of the CONNECT response are not mixed with the headers of the response.
+# The rate limit headers of the response are saved in the rate file of the token.
+# When the rate limit is exceeded, the request is sent again after the reset, if it is within
+# **GITHUB_RATE_MAX_WAIT** seconds (default 300).
+#
+# @arg $1 string An API url.
+# @arg $2 string An API token (optional).
+#
+# Returns the body in the **response** variable and the HTTP status in the **GH_API_STATUS** variable.
+gh_api_get() {
+  local url=$1
+  local github_api_token=$2
+  local cache_file output headers header etag last_modified retry_after wait_time attempt
+  # The headers of a proxy CONNECT response are not written, the headers of the response come first
+  local -a curl_options=(-s --compressed -D - --suppress-connect-headers -w '\n%{http_code}'
+    -H 'Accept: application/vnd.github+json' -H "X-GitHub-Api-Version: 2022-11-28")
+  local -A rate_headers=()
+  local GH_CACHE_ETAG="" GH_CACHE_LAST_MODIFIED="" GH_CACHE_TIME=0
+
+  [[ -z "$url" ]] && die "Please provide an API url" && return 1
+  [[ -n "$github_api_token" ]] && curl_options+=(-H "Authorization: Bearer $github_api_token")
+  cache_file=$(printf '%s\n%s' "$url" "$github_api_token" | sha256sum)
+  cache_file="$GITHUB_CACHE_FOLDER/${cache_file%% *}"
+
+  # Serve the cached response, or revalidate it
+  if [[ -f $cache_file.meta && -f $cache_file.body ]]; then
+    # shellcheck source=/dev/null
+    source "$cache_file.meta"
+    if [[ $(( EPOCHSECONDS - GH_CACHE_TIME )) -lt $GITHUB_CACHE_TTL ]]; then
+      GH_API_STATUS=200 && response=$(< "$cache_file.body") && return 0
+    fi
+    [[ -n $GH_CACHE_ETAG ]] && curl_options+=(-H "If-None-Match: $GH_CACHE_ETAG")
+    [[ -n $GH_CACHE_LAST_MODIFIED ]] && curl_options+=(-H "If-Modified-Since: $GH_CACHE_LAST_MODIFIED")
+  fi
+
+  for attempt in 1 2; do
+    output=$(curl "${curl_options[@]}" "$url")
+    GH_API_STATUS=${output##*$'\n'}
+    output=${output%$'\n'*}
+    headers=${output%%$'\r\n\r\n'*}
+    response=${output#*$'\r\n\r\n'}
+    [[ $headers == "$output" ]] && response="" && headers=""
+    retry_after=""
+    while IFS= read -r header; do
+      header=${header%$'\r'}
+      case ${header,,} in
+        etag:*) etag=${header#*: } ;;
+        last-modified:*) last_modified=${header#*: } ;;
+        retry-after:*) retry_after=${header#*: } ;;
+        x-ratelimit-limit:*) rate_headers[LIMIT]=${header#*: } ;;
+        x-ratelimit-used:*) rate_headers[USED]=${header#*: } ;;
+        x-ratelimit-remaining:*) rate_headers[REMAINING]=${header#*: } ;;
+        x-ratelimit-reset:*) rate_headers[RESET]=${header#*: } ;;
+      esac
+    done <<< "$headers"
+    [[ -n ${rate_headers[REMAINING]} ]] && gh_rate_save "$github_api_token" rate_headers
+    # Wait for the reset of the rate limit, and send the request again
+    [[ $attempt -eq 2 || ( $GH_API_STATUS != "403" && $GH_API_STATUS != "429" ) ]] && break
+    if [[ -n $retry_after ]]; then
+      wait_time=$retry_after
+    elif [[ ${rate_headers[REMAINING]} == "0" ]]; then
+      wait_time=$(( ${rate_headers[RESET]:-0} - EPOCHSECONDS + 1 ))
+    else
+      break
+    fi
+    [[ $wait_time -gt $GITHUB_RATE_MAX_WAIT ]] && break
+    [[ $wait_time -gt 0 ]] && sleep "$wait_time"
+  done
+
+  case $GH_API_STATUS in
+    304)
+      GH_API_STATUS=200
+      response=$(< "$cache_file.body")
+      etag=$GH_CACHE_ETAG && last_modified=$GH_CACHE_LAST_MODIFIED
+      ;;
+    200)
+      [[ -z $etag && -z $last_modified && $GITHUB_CACHE_TTL -eq 0 ]] && return 0
+      [[ ! -d $GITHUB_CACHE_FOLDER ]] && mkdir -p "$GITHUB_CACHE_FOLDER"
+      printf '%s' "$response" > "$cache_file.body.$BASHPID" && mv -f "$cache_file.body.$BASHPID" "$cache_file.body"
+      ;;
+    *) return 0 ;;
+  esac
+  {
+    echo "GH_CACHE_ETAG=${etag@Q}"
+    echo "GH_CACHE_LAST_MODIFIED=${last_modified@Q}"
+    echo "GH_CACHE_TIME=$EPOCHSECONDS"
+  } > "$cache_file.meta.$BASHPID" && mv -f "$cache_file.meta.$BASHPID" "$cache_file.meta"
+  return 0
+}
+
+# @description Get the rate file of an API token, in the cache folder.
+#
+# @arg $1 string An API token (optional).
+#
+# Returns the path in the **gh_rate_file** variable.
+gh_rate_file() {
+  local github_api_token=$1
+  local token_key="anonymous"
+  if [[ -n $github_api_token ]]; then
+    token_key=$(printf '%s' "$github_api_token" | sha256sum)
+    token_key=${token_key%% *}
+  fi
+  gh_rate_file="$GITHUB_CACHE_FOLDER/rate_$token_key"
+}
+
+# @description Save the rate limit of an API token, shared by the next calls.
+#
+# @arg $1 string An API token (optional).
+# @arg $2 string Name of an associative array with the LIMIT, USED, REMAINING and RESET keys.
+gh_rate_save() {
+  local github_api_token=$1
+  local -n rate_values=$2
+  local gh_rate_file
+  gh_rate_file "$github_api_token"
+  [[ ! -d $GITHUB_CACHE_FOLDER ]] && mkdir -p "$GITHUB_CACHE_FOLDER"
+  {
+    echo "GH_RATE_LIMIT=${rate_values[LIMIT]//[^0-9]/}"
+    echo "GH_RATE_USED=${rate_values[USED]//[^0-9]/}"
+    echo "GH_RATE_REMAINING=${rate_values[REMAINING]//[^0-9]/}"
+    echo "GH_RATE_RESET=${rate_values[RESET]//[^0-9]/}"
+  } > "$gh_rate_file.$BASHPID" && mv -f "$gh_rate_file.$BASHPID" "$gh_rate_file"
+}
+
+# @description Remove the cached responses of the github API.
+#
+# @arg $1 string An API url, to remove only its cached response (optional).
+# @arg $2 string An API token (optional).
+#
+# @example
+# ./libs/github.sh gh_cache_clear
+# ./libs/github.sh gh_cache_clear "https://api.github.com/repos/project/repository/tags"
+gh_cache_clear() {
+  local url=$1
+  local github_api_token=$2
+  local cache_file
+  if [ -z "$url" ]; then
+    rm -rf "$GITHUB_CACHE_FOLDER"
+  else
+    cache_file=$(printf '%s\n%s' "$url" "$github_api_token" | sha256sum)
+    rm -f "$GITHUB_CACHE_FOLDER/${cache_file%% *}".{body,meta}
+  fi
+}
+
 # @description Get current data rate.
 #
+# The rate limit saved from the headers of the last response is used,
+# the API is requested only when no rate limit is saved.
+#
 # @arg $1 string An API token (optional).
 # @arg $2 boolean Display a message (default **true**).
+# @arg $3 boolean Request the API even if a rate limit is saved (default **false**).
 gh_api_rate() {
   local github_api_token=$1
   local api_rate_show=${2:-1}
+  local api_rate_refresh=${3:-0}
+  local gh_rate_file message data
+  local GH_RATE_LIMIT="" GH_RATE_USED="" GH_RATE_REMAINING="" GH_RATE_RESET=""
   [[ $api_rate_show -eq 1 ]] && declare -A data_api_rate
-  if [ -n "$github_api_token" ]; then
-    response=$(curl -s -H 'Accept: application/vnd.github+json' \
-      -H "X-GitHub-Api-Version: 2022-11-28" \
-      -H "Authorization: Bearer $github_api_token" \
-      --compressed "$GITHUB_API_RATE_URL")
+  gh_rate_file "$github_api_token"
+  if [[ $api_rate_refresh -eq 0 && -f $gh_rate_file ]]; then
+    # shellcheck source=/dev/null
+    source "$gh_rate_file"
   else
-    response=$(curl -s -H 'Accept: application/vnd.github+json' \
-          -H "X-GitHub-Api-Version: 2022-11-28" \
-          --compressed "$GITHUB_API_RATE_URL")
+    gh_api_get "$GITHUB_API_RATE_URL" "$github_api_token"
+    IFS=$'\t' read -r GH_RATE_LIMIT GH_RATE_USED GH_RATE_REMAINING GH_RATE_RESET message < <(echo "$response" \
+      | jq -r '[.rate.limit, .rate.used, .rate.remaining, .rate.reset, .message] | map(. // "-") | @tsv')
+    if [[ -n $message && $message != "-" ]] || [[ -z $GH_RATE_LIMIT || $GH_RATE_LIMIT == "-" ]]; then
+      [[ $api_rate_show -eq 1 ]] && show_message "${message:-Unable to get the rate limit}" 1
+      return 1
+    fi
   fi
-  message=$(echo $response | jq '.message')
-  if [ "$message" = "null" ]; then
-      rate=$(echo "$response"|jq '.rate')
-  else
-    [[ $api_rate_show -eq 1 ]] && show_message "${message//\"/}" 1
-    return 1
+  # The rate limit is reset after the reset time
+  if [[ ${GH_RATE_RESET:-0} -le $EPOCHSECONDS ]]; then
+    GH_RATE_USED=0 && GH_RATE_REMAINING=$GH_RATE_LIMIT
   fi
   data_api_rate=(
-    [LIMIT]=$(echo "$rate"|jq '.limit')
-    [USED]=$(echo "$rate"|jq '.used')
-    [REMAINING]=$(echo "$rate"|jq '.remaining')
-    [RESET]=$(echo "$rate"|jq '.reset')
+    [LIMIT]=$GH_RATE_LIMIT
+    [USED]=$GH_RATE_USED
+    [REMAINING]=$GH_RATE_REMAINING
+    [RESET]=$GH_RATE_RESET
   )
   if [ $api_rate_show -eq 1 ]; then
     for data in "${!data_api_rate[@]}"; do
@@ -112,6 +263,8 @@ _gh_api_rate() {
 
 # @description Check API rate limit.
 #
+# When the rate limit is exceeded, wait for its reset if it is within **GITHUB_RATE_MAX_WAIT** seconds (default 300).
+#
 # @arg $1 string An API token (optional).
 # @arg $2 boolean Display a message (default **true**).
 #
@@ -119,21 +272,25 @@ _gh_api_rate() {
 gh_check_api_rate() {
   local github_api_token=$1
   local check_api_rate_show=${2:-1}
+  local wait_time
   declare -A data_api_rate
   gh_api_rate "$github_api_token" 0
   if [ $? -eq 1 ]; then
     [[ $check_api_rate_show -eq 1 ]] && die "Erreur api_rate"
     return 1
   fi
-  rate_limit=${data_api_rate[LIMIT]}
-  rate_used=${data_api_rate[USED]}
-  if [ "$rate_used" -lt "$rate_limit" ]; then
+  if [ "${data_api_rate[REMAINING]}" -gt 0 ]; then
     [[ $check_api_rate_show -eq 1 ]] && show_message "ok"
     return 0
-  else
-    [[ $check_api_rate_show -eq 1 ]] && die "API rate limit exceeded"
-    return 1
   fi
+  wait_time=$(( data_api_rate[RESET] - EPOCHSECONDS + 1 ))
+  if [ "$wait_time" -le "$GITHUB_RATE_MAX_WAIT" ]; then
+    [[ $check_api_rate_show -eq 1 ]] && show_message "API rate limit exceeded, waiting ${wait_time}s for the reset"
+    sleep "$wait_time"
+    return 0
+  fi
+  [[ $check_api_rate_show -eq 1 ]] && die "API rate limit exceeded"
+  return 1
 }
 
 # @description Check API rate limit with the environment file.
@@ -156,16 +313,7 @@ gh_release_latest() {
   [[ -z "$github_project_name" ]] && die "Please provide a github project name" && return 1
 
   gh_check_api_rate "$github_api_token" 0
-  if [ -n "$github_api_token" ]; then
-    response=$(curl -s -H 'Accept: application/vnd.github+json' \
-      -H "X-GitHub-Api-Version: 2022-11-28" \
-      -H "Authorization: Bearer $github_api_token" \
-      --compressed "$GITHUB_PROJECT_API_URL/releases/latest")
-  else
-    response=$(curl -s -H 'Accept: application/vnd.github+json' \
-          -H "X-GitHub-Api-Version: 2022-11-28" \
-          --compressed "$GITHUB_PROJECT_API_URL/releases/latest")
-  fi
+  gh_api_get "$GITHUB_API_REPOS_URL/$github_project_name/releases/latest" "$github_api_token"
 
   release_latest=$(echo $response|jq -r '.tag_name')
   [[ $release_latest_show -eq 1 ]] && show_message "$release_latest"
@@ -182,8 +330,159 @@ _gh_release_latest() {
   gh_release_latest "$GITHUB_PROJECT_NAME" "$GITHUB_API_TOKEN" ${1:-1}
 }
 
+# @description Write an option of a curl config file, with its value quoted.
+#
+# @arg $1 string The option name.
+# @arg $2 string The option value.
+gh_curl_config() {
+  local value=${2//\\/\\\\}
+  echo "$1 = \"${value//\"/\\\"}\""
+}
+
+# @description Check the latest release of several github projects, listed in a manifest file.
+#
+# Each line of the manifest has a project name and an optional pinned release name.
+# The latest releases are requested in parallel, with the connections reused by curl.
+# The responses share the cache of gh_api_get: a cached response is revalidated with a conditional request
+# (or served without a request if it is younger than **GITHUB_CACHE_TTL** seconds), and the rate limit headers
+# of the responses are saved in the rate file of the token.
+#
+# @arg $1 string A manifest file, with lines like "project/repository v1.0.0".
+# @arg $2 string An API token (optional).
+#
+# @example
+# ./libs/github.sh gh_manifest_check config/github/manifest.txt
+#
+# Returns 1 if a pinned release is not the latest release, or if a latest release is not found.
+gh_manifest_check() {
+  local manifest=$1
+  local github_api_token=$2
+  local manifest_folder project_name release_pinned release_latest status line index body cache_key header
+  local etag last_modified cache_update requests=0 drift=0
+  local -a projects=() releases=() cache_keys=() cache_etags=() cache_last_modified=() cache_fresh=()
+  local -a request_headers=('Accept: application/vnd.github+json' 'X-GitHub-Api-Version: 2022-11-28')
+  local -A rate_headers=() response_rate=() moved=()
+  local GH_CACHE_ETAG GH_CACHE_LAST_MODIFIED GH_CACHE_TIME
+
+  [[ ! -f "$manifest" ]] && die "Please provide a manifest file" && return 1
+  [[ -n "$github_api_token" ]] && request_headers+=("Authorization: Bearer $github_api_token")
+  while read -r project_name release_pinned _; do
+    [[ -z $project_name || $project_name == \#* ]] && continue
+    projects+=("$project_name")
+    releases+=("$release_pinned")
+  done < "$manifest"
+  [[ ${#projects[@]} -eq 0 ]] && die "The manifest file is empty" && return 1
+
+  # The cache keys of gh_api_get (url and token), hashed with a single sha256sum
+  [[ ! -d $GITHUB_CACHE_FOLDER ]] && mkdir -p "$GITHUB_CACHE_FOLDER"
+  manifest_folder=$(mktemp -d "$GITHUB_CACHE_FOLDER/.manifest.XXXXXX")
+  for index in "${!projects[@]}"; do
+    printf '%s\n%s' "$GITHUB_API_REPOS_URL/${projects[$index]}/releases/latest" "$github_api_token" \
+      > "$manifest_folder/key_$index"
+  done
+  while read -r cache_key line; do
+    cache_keys[${line##*/key_}]=$cache_key
+  done < <(sha256sum "$manifest_folder"/key_*)
+
+  # Request all the latest releases with a single curl, with a conditional request for the cached responses
+  for index in "${!projects[@]}"; do
+    cache_key="$GITHUB_CACHE_FOLDER/${cache_keys[$index]}"
+    GH_CACHE_ETAG="" GH_CACHE_LAST_MODIFIED="" GH_CACHE_TIME=0
+    if [[ -f $cache_key.meta && -f $cache_key.body ]]; then
+      # shellcheck source=/dev/null
+      source "$cache_key.meta"
+      [[ $(( EPOCHSECONDS - GH_CACHE_TIME )) -lt $GITHUB_CACHE_TTL ]] && cache_fresh[$index]=1 && continue
+    fi
+    cache_etags[$index]=$GH_CACHE_ETAG
+    cache_last_modified[$index]=$GH_CACHE_LAST_MODIFIED
+    [[ $(( requests++ )) -gt 0 ]] && echo "next"
+    gh_curl_config url "$GITHUB_API_REPOS_URL/${projects[$index]}/releases/latest"
+    gh_curl_config output "$manifest_folder/${cache_keys[$index]}.body"
+    gh_curl_config dump-header "$manifest_folder/$index.headers"
+    for header in "${request_headers[@]}"; do gh_curl_config header "$header"; done
+    [[ -n $GH_CACHE_ETAG ]] && gh_curl_config header "If-None-Match: $GH_CACHE_ETAG"
+    [[ -n $GH_CACHE_LAST_MODIFIED ]] && gh_curl_config header "If-Modified-Since: $GH_CACHE_LAST_MODIFIED"
+    printf '%s\n' silent compressed suppress-connect-headers
+  done > "$manifest_folder/curl.config"
+  [[ $requests -gt 0 ]] && curl -s --no-progress-meter --parallel --parallel-max "$GITHUB_PARALLEL_MAX" \
+    -K "$manifest_folder/curl.config"
+
+  printf "%-40s %-15s %-15s %s\n" "PROJECT" "PINNED" "LATEST" "STATUS"
+  for index in "${!projects[@]}"; do
+    cache_key=${cache_keys[$index]}
+    body="" status="" etag="" last_modified="" cache_update=0
+    response_rate=()
+    if [[ -n ${cache_fresh[$index]} ]]; then
+      body=$(< "$GITHUB_CACHE_FOLDER/$cache_key.body")
+    elif [[ -f $manifest_folder/$index.headers ]]; then
+      while IFS= read -r line; do
+        line=${line%$'\r'}
+        case ${line,,} in
+          http/*) status=${line#* } && status=${status%% *} && etag="" && last_modified="" ;;
+          etag:*) etag=${line#*: } ;;
+          last-modified:*) last_modified=${line#*: } ;;
+          x-ratelimit-limit:*) response_rate[LIMIT]=${line#*: } ;;
+          x-ratelimit-used:*) response_rate[USED]=${line#*: } ;;
+          x-ratelimit-remaining:*) response_rate[REMAINING]=${line#*: } ;;
+          x-ratelimit-reset:*) response_rate[RESET]=${line#*: } ;;
+        esac
+      done < "$manifest_folder/$index.headers"
+      # The rate limit of the last response is the one with the least remaining requests
+      if [[ -n ${response_rate[REMAINING]} ]] \
+        && [[ -z ${rate_headers[REMAINING]} || ${response_rate[REMAINING]} -lt ${rate_headers[REMAINING]} ]]; then
+        for line in LIMIT USED REMAINING RESET; do rate_headers[$line]=${response_rate[$line]}; done
+      fi
+    fi
+    case $status in
+      304)
+        body=$(< "$GITHUB_CACHE_FOLDER/$cache_key.body")
+        etag=${cache_etags[$index]} && last_modified=${cache_last_modified[$index]} && cache_update=1
+        ;;
+      200)
+        body=$(< "$manifest_folder/$cache_key.body")
+        if [[ -n $etag || -n $last_modified || $GITHUB_CACHE_TTL -gt 0 ]]; then
+          moved[$manifest_folder/$cache_key.body]=1 && cache_update=1
+        fi
+        ;;
+    esac
+    # The cached responses are moved to the cache folder with a single mv
+    if [[ $cache_update -eq 1 ]]; then
+      {
+        echo "GH_CACHE_ETAG=${etag@Q}"
+        echo "GH_CACHE_LAST_MODIFIED=${last_modified@Q}"
+        echo "GH_CACHE_TIME=$EPOCHSECONDS"
+      } > "$manifest_folder/$cache_key.meta"
+      moved[$manifest_folder/$cache_key.meta]=1
+    fi
+
+    release_latest="-" && [[ $body =~ \"tag_name\":\ *\"([^\"]+)\" ]] && release_latest=${BASH_REMATCH[1]}
+    release_pinned=${releases[$index]:--}
+    if [[ $release_latest == "-" ]]; then
+      status="not found" && drift=1
+    elif [[ $release_pinned == "-" || $release_pinned == "$release_latest" ]]; then
+      status="ok"
+    else
+      status="drift" && drift=1
+    fi
+    printf "%-40s %-15s %-15s %s\n" "${projects[$index]}" "$release_pinned" "$release_latest" "$status"
+  done
+  [[ ${#moved[@]} -gt 0 ]] && mv -f "${!moved[@]}" "$GITHUB_CACHE_FOLDER/"
+  [[ -n ${rate_headers[REMAINING]} ]] && gh_rate_save "$github_api_token" rate_headers
+  rm -rf "$manifest_folder"
+  return $drift
+}
+
+# @description Check the latest release of several github projects with the environment file.
+#
+# @arg $1 string A manifest file, with lines like "project/repository v1.0.0".
+_gh_manifest_check() {
+  gh_manifest_check "$1" "$GITHUB_API_TOKEN"
+}
+
 # @description Check if the release name exists.
 #
+# The tag is looked up directly by its reference, whatever the number of tags of the project.
+#
 # @arg $1 string The github project name.
 # @arg $2 string The release name.
 # @arg $3 string An API token (optional).
@@ -193,24 +492,16 @@ gh_release_verify() {
   local release_name=$2
   local github_api_token=$3
   local release_verify_show=${4:-1}
+  local release_ref
 
   [[ -z "$github_project_name" ]] && die "Please provide a github project name" && return 1
   [[ -z "$release_name" ]] && die "Please provide a release name" && return 1
 
   gh_check_api_rate "$github_api_token" 0
-  if [ -n "$github_api_token" ]; then
-    response=$(curl -s -H 'Accept: application/vnd.github+json' \
-      -H "X-GitHub-Api-Version: 2022-11-28" \
-      -H "Authorization: Bearer $github_api_token" \
-      --compressed "$GITHUB_PROJECT_API_URL/tags")
-  else
-    response=$(curl -s -H 'Accept: application/vnd.github+json' \
-          -H "X-GitHub-Api-Version: 2022-11-28" \
-          --compressed "$GITHUB_PROJECT_API_URL/tags")
-  fi
+  release_ref=${release_name//%/%25}
+  gh_api_get "$GITHUB_API_REPOS_URL/$github_project_name/git/ref/tags/${release_ref//#/%23}" "$github_api_token"
 
-  release_verify=$(echo $response|jq -r ".[]|select( .name == \"$release_name\" ).name")
-  if [ -z $release_verify ]; then
+  if [ "$GH_API_STATUS" != "200" ]; then
     [[ $release_verify_show -eq 1 ]] && show_message "$release_name not exist" 1
     return 1
   else
@@ -227,6 +518,153 @@ _gh_release_verify() {
   gh_release_verify "$GITHUB_PROJECT_NAME" "$1" "$GITHUB_API_TOKEN" ${2:-1}
 }
 
+# @description List the assets of a release.
+#
+# @arg $1 string The github project name.
+# @arg $2 string The release name (default the latest release).
+# @arg $3 string An API token (optional).
+# @arg $4 boolean Display a message (default **true**).
+#
+# @example
+# ./libs/github.sh gh_release_assets "project/repository" "v1.0.0"
+#
+# Returns the assets in the **release_assets** array, with the id, name, size, url and digest separated by tabs.
+gh_release_assets() {
+  local github_project_name=$1
+  local release_name=$2
+  local github_api_token=$3
+  local release_assets_show=${4:-1}
+  local url="$GITHUB_API_REPOS_URL/$github_project_name/releases/latest"
+  local asset asset_id asset_name asset_size
+
+  [[ -z "$github_project_name" ]] && die "Please provide a github project name" && return 1
+  [[ -n "$release_name" ]] && url="$GITHUB_API_REPOS_URL/$github_project_name/releases/tags/$release_name"
+  gh_api_get "$url" "$github_api_token"
+  [[ $GH_API_STATUS != "200" ]] && die "Release ${release_name:-latest} not found" && return 1
+
+  mapfile -t release_assets < <(echo "$response" \
+    | jq -r '.assets[] | [.id, .name, .size, .url, (.digest // "-")] | @tsv')
+  if [[ $release_assets_show -eq 1 ]]; then
+    for asset in "${release_assets[@]}"; do
+      IFS=$'\t' read -r asset_id asset_name asset_size _ <<< "$asset"
+      printf "%-12s %-50s %s\n" "$asset_id" "$asset_name" "$asset_size"
+    done
+  fi
+  return 0
+}
+
+# @description Download the assets of a release, with a cache of the assets in the env folder.
+#
+# @arg $1 string The github project name.
+# @arg $2 string The release name (default the latest release).
+# @arg $3 string The directory where the assets are downloaded.
+# @arg $4 string A pattern of the asset names (default all assets).
+# @arg $5 string An API token (optional).
+# @arg $6 boolean Display a message (default **true**).
+#
+# @example
+# ./libs/github.sh gh_release_download "project/repository" "v1.0.0" "/tmp/assets" "*.tar.gz"
+gh_release_download() {
+  local github_project_name=$1
+  local release_name=$2
+  local directory_target=$3
+  local pattern=${4:-*}
+  local github_api_token=$5
+  local release_download_show=${6:-1}
+  local -a release_assets=()
+  local asset asset_id asset_name asset_size asset_url asset_digest asset_hash
+
+  [[ -z "$directory_target" ]] && die "Please provide a directory target" && return 1
+  gh_release_assets "$github_project_name" "$release_name" "$github_api_token" 0 || return 1
+  [[ ! -d "$directory_target" ]] && mkdir -p "$directory_target"
+
+  for asset in "${release_assets[@]}"; do
+    IFS=$'\t' read -r asset_id asset_name asset_size asset_url asset_digest <<< "$asset"
+    # shellcheck disable=SC2053
+    [[ $asset_name != $pattern ]] && continue
+    [[ $release_download_show -eq 1 ]] && show_message "Download the asset $asset_name"
+    gh_asset_fetch "$asset_id" "$asset_size" "$asset_url" "${asset_digest#sha256:}" "$github_api_token" || return 1
+    ln -f "$GITHUB_ASSETS_CACHE/sha256/$asset_hash" "$directory_target/$asset_name" 2> /dev/null \
+      || cp -f "$GITHUB_ASSETS_CACHE/sha256/$asset_hash" "$directory_target/$asset_name"
+  done
+  return 0
+}
+
+# @description Download the assets of a release with the environment file.
+#
+# @arg $1 string The release name (default the latest release).
+# @arg $2 string The directory where the assets are downloaded.
+# @arg $3 string A pattern of the asset names (default all assets).
+# @arg $4 boolean Display a message (default **true**).
+_gh_release_download() {
+  gh_release_download "$GITHUB_PROJECT_NAME" "$1" "$2" "$3" "$GITHUB_API_TOKEN" ${4:-1}
+}
+
+# @description Fetch an asset in the cache, by byte ranges downloaded in parallel.
+#
+# The cached asset is stored by its sha256 checksum, and found by the asset id.
+# The byte ranges of an interrupted download are resumed by the next call.
+#
+# @arg $1 number The asset id.
+# @arg $2 number The asset size.
+# @arg $3 string The asset API url.
+# @arg $4 string The asset sha256 checksum (optional).
+# @arg $5 string An API token (optional).
+#
+# Returns the checksum in the **asset_hash** variable.
+gh_asset_fetch() {
+  local asset_id=$1
+  local asset_size=$2
+  local asset_url=$3
+  local asset_digest=$4
+  local github_api_token=$5
+  local partial_folder="$GITHUB_ASSETS_CACHE/partial/$asset_id"
+  local parts part part_size range_start range_end part_done download_failed=0
+  local -a curl_options=(-s -f -L -H "Accept: application/octet-stream") pids=()
+
+  # Serve the asset from the cache
+  if [[ -f $GITHUB_ASSETS_CACHE/asset_$asset_id ]]; then
+    asset_hash=$(< "$GITHUB_ASSETS_CACHE/asset_$asset_id")
+    [[ -f $GITHUB_ASSETS_CACHE/sha256/$asset_hash ]] && return 0
+  fi
+  [[ -n "$github_api_token" ]] && curl_options+=(-H "Authorization: Bearer $github_api_token")
+  mkdir -p "$partial_folder" "$GITHUB_ASSETS_CACHE/sha256"
+
+  # Split the asset in byte ranges, each range is appended to its part file
+  parts=$(( (asset_size + GITHUB_DOWNLOAD_PART_SIZE - 1) / GITHUB_DOWNLOAD_PART_SIZE ))
+  [[ $parts -gt $GITHUB_DOWNLOAD_PARTS ]] && parts=$GITHUB_DOWNLOAD_PARTS
+  [[ $parts -lt 1 ]] && parts=1
+  part_size=$(( (asset_size + parts - 1) / parts ))
+  for (( part = 0; part < parts; part++ )); do
+    range_start=$(( part * part_size ))
+    range_end=$(( range_start + part_size - 1 ))
+    [[ $range_end -ge $asset_size ]] && range_end=$(( asset_size - 1 ))
+    part_done=0 && [[ -f $partial_folder/$part ]] && part_done=$(wc -c < "$partial_folder/$part")
+    range_start=$(( range_start + part_done ))
+    [[ $range_start -gt $range_end ]] && touch "$partial_folder/$part" && continue
+    curl "${curl_options[@]}" -r "$range_start-$range_end" "$asset_url" >> "$partial_folder/$part" &
+    pids+=($!)
+  done
+  for part in "${pids[@]}"; do
+    wait "$part" || download_failed=1
+  done
+  [[ $download_failed -eq 1 ]] && die "Download of the asset $asset_id failed, run the command again to resume" && return 1
+
+  # Check the asset and move it to the cache
+  for (( part = 0; part < parts; part++ )); do cat "$partial_folder/$part"; done > "$partial_folder/asset"
+  asset_hash=$(sha256sum < "$partial_folder/asset")
+  asset_hash=${asset_hash%% *}
+  if [[ $(wc -c < "$partial_folder/asset") -ne $asset_size ]] \
+    || [[ -n $asset_digest && $asset_digest != "-" && $asset_digest != "$asset_hash" ]]; then
+    rm -rf "$partial_folder"
+    die "Checksum of the asset $asset_id is not valid" && return 1
+  fi
+  mv -f "$partial_folder/asset" "$GITHUB_ASSETS_CACHE/sha256/$asset_hash"
+  echo "$asset_hash" > "$GITHUB_ASSETS_CACHE/asset_$asset_id.$BASHPID"
+  mv -f "$GITHUB_ASSETS_CACHE/asset_$asset_id.$BASHPID" "$GITHUB_ASSETS_CACHE/asset_$asset_id"
+  rm -rf "$partial_folder"
+}
+
 # @description Prompt the user for the name of the release to retrieve.
 #
 # @arg $1 string fake answer for unit test.
@@ -252,6 +690,11 @@ _gh_release_choice() {
 
 # @description Clone a github project.
 #
+# An existing checkout of the same repository is updated, by fetching only the tag or branch.
+# The clone can use a shared mirror of the repository in the **GITHUB_CLONE_MIRROR** folder (optional, the objects
+# are copied from the mirror, the checkout does not depend on it), a partial clone filter in **GITHUB_CLONE_FILTER** (ex: blob:none) and the sparse checkout
+# of the paths in **GITHUB_CLONE_SPARSE** (separated by spaces).
+#
 # @arg $1 string The repository to clone from.
 # @arg $2 string The name of a new directory to clone into.
 # @arg $3 string A tag or branch name (optional).
@@ -261,22 +704,60 @@ gh_clone() {
   local directory_target=$2
   local tag=$3
   local clone_show=${4:-1}
+  local -a clone_options=(--depth 1)
 
   [[ -z "$repository" ]] && die "Please provide a repository name" && return 1
   [[ -z "$directory_target" ]] && die "Please provide a directory target" && return 1
 
+  # Update an existing checkout of the same repository
+  if [ -d "$directory_target/.git" ] \
+    && [ "$(git -C "$directory_target" config --get remote.origin.url)" = "$repository" ]; then
+    [[ $clone_show -eq 1 ]] && show_message "Update the github repository $repository (${tag:-HEAD})"
+    gh_clone_mirror "$repository" > /dev/null
+    git -C "$directory_target" fetch -q --depth 1 --no-tags origin "${tag:-HEAD}" >&- 2>&- \
+      && git -C "$directory_target" checkout -q -f --detach FETCH_HEAD >&- 2>&- \
+      && git -C "$directory_target" clean -q -ffdx >&- 2>&- \
+      && return 0
+  fi
+
   if [ -d "$directory_target" ]; then
     [[ $clone_show -eq 1 ]] && show_message "Remove the $directory_target directory"
     rm -rf "$directory_target"
   fi
 
+  # The objects are copied from the mirror, so the checkout does not depend on the objects pruned by its next fetch
+  [[ -n $GITHUB_CLONE_MIRROR ]] && clone_options+=(--reference-if-able "$(gh_clone_mirror "$repository")" --dissociate)
+  [[ -n $GITHUB_CLONE_FILTER ]] && clone_options+=(--filter="$GITHUB_CLONE_FILTER")
+  [[ -n $GITHUB_CLONE_SPARSE ]] && clone_options+=(--sparse)
+  [[ -n $tag ]] && clone_options+=(--branch "$tag")
   if [ -z $tag ]; then
     [[ $clone_show -eq 1 ]] && show_message "Clone the github repository $repository"
-    git clone --depth 1 "$repository" "$directory_target" >&- 2>&-
   else
     [[ $clone_show -eq 1 ]] && show_message "Clone the github repository $repository ($tag)"
-    git clone --depth 1 --branch "$tag" "$repository" "$directory_target" >&- 2>&-
   fi
+  git clone "${clone_options[@]}" "$repository" "$directory_target" >&- 2>&- || return 1
+  # shellcheck disable=SC2086
+  [[ -n $GITHUB_CLONE_SPARSE ]] && git -C "$directory_target" sparse-checkout set $GITHUB_CLONE_SPARSE >&- 2>&-
+  return 0
+}
+
+# @description Create or update the mirror of a repository, in the **GITHUB_CLONE_MIRROR** folder.
+#
+# @arg $1 string The repository to mirror.
+#
+# Returns the mirror path, nothing if **GITHUB_CLONE_MIRROR** is not set.
+gh_clone_mirror() {
+  local repository=$1
+  local mirror
+  [[ -z $GITHUB_CLONE_MIRROR ]] && return 0
+  mirror="$GITHUB_CLONE_MIRROR/${repository//[^[:alnum:]._-]/_}"
+  if [ -d "$mirror" ]; then
+    git -C "$mirror" fetch -q --prune >&- 2>&-
+  else
+    mkdir -p "$GITHUB_CLONE_MIRROR"
+    git clone -q --mirror "$repository" "$mirror" >&- 2>&-
+  fi
+  echo "$mirror"
 }
 
 # @description Clone a github project with the environment file.
@@ -316,7 +797,7 @@ _gh_clone_with_prompt() {
     [[ "$clone_latest" != "y" ]] && return 0
   fi
   # Clone the project
-  _clone "$tag"
+  _gh_clone "$tag"
 }
 
 main "$@"
@@ -0,0 +1,168 @@
+#!/usr/bin/env bash
+# @file log.sh
+# @brief A library for log writing.
+# @description
+#     The library allows you to print messages with a level, and to colorize the lines of a command output
+#     in a single process, with a buffered file sink rotated on size.
+#     It can be executed (`docker compose logs | bash log.sh log_stream auto`) or sourced once to call the functions
+#     in the same process. It is used by messages.sh to print the messages.
+#
+#     The messages are filtered with **LOG_LEVEL** (debug, info, warn or error, default info), prefixed with the time
+#     if **LOG_TIMESTAMP** is 1, and colorized if **LOG_COLOR** is 1 (default, as show_message always did), or with
+#     auto only if the output is a terminal. They are also appended to **LOG_FILE** if set, rotated when it is larger than **LOG_FILE_MAX_SIZE**
+#     bytes (default 10 MiB), keeping **LOG_FILE_BACKUPS** files (default 3).
+
+declare -gA LOG_LEVELS=([debug]=0 [info]=1 [warn]=2 [error]=3)
+declare -gA LOG_COLORS=([debug]='' [info]='\033[0;32m' [warn]='\033[0;33m' [error]='\033[0;31m')
+LOG_LEVEL=${LOG_LEVEL:-info}
+LOG_TIMESTAMP=${LOG_TIMESTAMP:-0}
+LOG_COLOR=${LOG_COLOR:-1}
+LOG_FILE_MAX_SIZE=${LOG_FILE_MAX_SIZE:-10485760}
+LOG_FILE_BACKUPS=${LOG_FILE_BACKUPS:-3}
+LOG_BUFFER_LINES=${LOG_BUFFER_LINES:-1000}
+LOG_FILE_FD=""
+LOG_FILE_SIZE=0
+LOG_BUFFER=""
+LOG_BUFFER_COUNT=0
+
+# @description Print a message to a file descriptor, if its level is not filtered by **LOG_LEVEL**.
+#
+# @arg $1 number File descriptor (1: standard output, 2: standard error).
+# @arg $2 string Level (debug, info, warn or error).
+# @arg $3 string Message.
+#
+# @example
+# log_print 2 error "Unable to read the file"
+log_print() {
+  local fd=$1
+  local level=$2
+  local log_time="" log_color=""
+  [[ -z $level || -z ${LOG_LEVELS[$level]} ]] && log_print 2 error "Invalid log level $level" && return 1
+  [[ ${LOG_LEVELS[$level]} -lt ${LOG_LEVELS[$LOG_LEVEL]:-1} ]] && return 0
+  [[ $LOG_TIMESTAMP -eq 1 ]] && printf -v log_time '%(%Y-%m-%d %H:%M:%S)T ' -1
+  log_colored "$fd" && log_color=${LOG_COLORS[$level]}
+  if [[ -n $log_color ]]; then
+    printf "%s$log_color%s\033[0m\n" "$log_time" "$3" >&"$fd"
+  else
+    printf '%s%s\n' "$log_time" "$3" >&"$fd"
+  fi
+  if [[ -n $LOG_FILE ]]; then
+    log_file_buffer "$log_time[$level] $3"
+    log_file_flush
+  fi
+  return 0
+}
+
+# @description Print a message to standard output, if its level is not filtered by **LOG_LEVEL**.
+#
+# @arg $1 string Level (debug, info, warn or error).
+# @arg $2 string Message.
+#
+# @example
+# ./libs/log.sh log_message warn "The file is empty"
+log_message() {
+  log_print 1 "$1" "$2"
+}
+
+# @description Print the lines read on standard input, in a single process.
+#
+# With the auto level, the level of each line is guessed from the words error, warn and debug, and the filtered lines
+# are skipped before being formatted. With another level filtered by **LOG_LEVEL**, the input is read without
+# being printed. The lines written to **LOG_FILE** are buffered, by **LOG_BUFFER_LINES** lines.
+#
+# @arg $1 string Level of the lines (debug, info, warn, error or auto, default **info**).
+# @arg $2 string Prefix of the lines (optional).
+#
+# @example
+# docker compose logs --no-color | ./libs/log.sh log_stream auto "[compose] "
+log_stream() {
+  local level=${1:-info}
+  local prefix=$2
+  local line line_level log_time="" log_min=${LOG_LEVELS[$LOG_LEVEL]:-1} log_color=0
+  [[ $level != "auto" && -z ${LOG_LEVELS[$level]} ]] && log_print 2 error "Invalid log level $level" && return 1
+
+  # The whole input is filtered, read it by blocks so that the command writing it is not interrupted
+  if [[ $level != "auto" && ${LOG_LEVELS[$level]} -lt $log_min ]]; then
+    while read -r -N 65536 _; do :; done
+    return 0
+  fi
+
+  log_colored 1 && log_color=1
+  line_level=$level
+  while IFS= read -r line || [[ -n $line ]]; do
+    if [[ $level == "auto" ]]; then
+      case $line in
+        *[Ee][Rr][Rr][Oo][Rr]*|*[Ff][Aa][Tt][Aa][Ll]*) line_level=error ;;
+        *[Ww][Aa][Rr][Nn]*) line_level=warn ;;
+        *[Dd][Ee][Bb][Uu][Gg]*) line_level=debug ;;
+        *) line_level=info ;;
+      esac
+      [[ ${LOG_LEVELS[$line_level]} -lt $log_min ]] && continue
+    fi
+    [[ $LOG_TIMESTAMP -eq 1 ]] && printf -v log_time '%(%Y-%m-%d %H:%M:%S)T ' -1
+    if [[ $log_color -eq 1 && -n ${LOG_COLORS[$line_level]} ]]; then
+      printf "%s%s${LOG_COLORS[$line_level]}%s\033[0m\n" "$log_time" "$prefix" "$line"
+    else
+      printf '%s%s%s\n' "$log_time" "$prefix" "$line"
+    fi
+    [[ -n $LOG_FILE ]] && log_file_buffer "$log_time[$line_level] $prefix$line"
+  done
+  [[ -n $LOG_FILE ]] && log_file_flush
+  return 0
+}
+
+# @description Check if the messages printed to a file descriptor are colorized, with **LOG_COLOR**.
+#
+# The messages are colorized with 1 (default), only if the file descriptor is a terminal with auto, and never with 0.
+#
+# @arg $1 number File descriptor.
+log_colored() {
+  [[ $LOG_COLOR == "1" || ( $LOG_COLOR == "auto" && -t $1 ) ]]
+}
+
+# @description Add a line to the buffer of the file sink, and write the buffer when it has **LOG_BUFFER_LINES** lines.
+#
+# @arg $1 string Line.
+log_file_buffer() {
+  LOG_BUFFER+="$1"$'\n'
+  (( ++LOG_BUFFER_COUNT >= LOG_BUFFER_LINES )) && log_file_flush
+  return 0
+}
+
+# @description Write the buffer to **LOG_FILE**, and rotate the file first when it would be larger than
+# **LOG_FILE_MAX_SIZE** bytes.
+#
+# The file is opened once per process, and its size is counted from the lines written.
+log_file_flush() {
+  local LC_ALL=C
+  [[ -z $LOG_BUFFER ]] && return 0
+  if [[ -z $LOG_FILE_FD ]]; then
+    [[ ${LOG_FILE%/*} != "$LOG_FILE" && ! -d ${LOG_FILE%/*} ]] && mkdir -p "${LOG_FILE%/*}"
+    exec {LOG_FILE_FD}>> "$LOG_FILE" || { LOG_FILE="" && return 1; }
+    LOG_FILE_SIZE=0 && [[ -s $LOG_FILE ]] && LOG_FILE_SIZE=$(wc -c < "$LOG_FILE")
+  fi
+  if [[ $LOG_FILE_SIZE -gt 0 && $(( LOG_FILE_SIZE + ${#LOG_BUFFER} )) -gt $LOG_FILE_MAX_SIZE ]]; then
+    log_file_rotate
+    exec {LOG_FILE_FD}>> "$LOG_FILE" || { LOG_FILE="" && return 1; }
+  fi
+  printf '%s' "$LOG_BUFFER" >&"$LOG_FILE_FD"
+  LOG_FILE_SIZE=$(( LOG_FILE_SIZE + ${#LOG_BUFFER} ))
+  LOG_BUFFER=""
+  LOG_BUFFER_COUNT=0
+  return 0
+}
+
+# @description Rotate **LOG_FILE** (file.1 is the most recent backup), keeping **LOG_FILE_BACKUPS** files.
+log_file_rotate() {
+  local backup
+  exec {LOG_FILE_FD}>&-
+  rm -f "$LOG_FILE.$LOG_FILE_BACKUPS"
+  for (( backup = LOG_FILE_BACKUPS - 1; backup > 0; backup-- )); do
+    [[ -f $LOG_FILE.$backup ]] && mv -f "$LOG_FILE.$backup" "$LOG_FILE.$(( backup + 1 ))"
+  done
+  if [[ $LOG_FILE_BACKUPS -gt 0 ]]; then mv -f "$LOG_FILE" "$LOG_FILE.1"; else rm -f "$LOG_FILE"; fi
+  LOG_FILE_SIZE=0
+}
+
+# Run the command line only when the script is executed, not when it is sourced
+if [[ "${BASH_SOURCE[0]}" == "$0" ]]; then "$@"; fi
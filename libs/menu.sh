@@ -3,48 +3,176 @@
 # @brief A library for manage a help menu with an environment file.
 # @description
 #     The library allows you to display a help menu by retrieving the parameters from a yaml configuration file.
+#     It can also be sourced by a script to parse its arguments and call a handler function per menu entry.
 
 LIBS_FOLDER=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
-CONFIG_FOLDER=$( cd -- $LIBS_FOLDER/../config &> /dev/null && pwd )
-ENV_FOLDER=$( cd -- $LIBS_FOLDER/../env &> /dev/null && pwd )
-LIBS_MESSAGES="$LIBS_FOLDER/messages.sh"
-LIBS_UTILS="$LIBS_FOLDER/utils.sh"
-SCRIPT_NAME="$(basename -- "${BASH_SOURCE[0]}")"
-ENV_FILE="$ENV_FOLDER/.${SCRIPT_NAME%.*}"
-MENU_DEBUG=0
-
-main() { eval "$(bash "$LIBS_UTILS" "check_args" "$@") ; check_env ; check_args $*" ; "$@"; }
-show_message() { bash "$LIBS_MESSAGES" "${FUNCNAME[0]}" "$@"; }
-confirm_message() { bash "$LIBS_MESSAGES" "${FUNCNAME[0]}" "$@"; }
-die() { bash "$LIBS_MESSAGES" "${FUNCNAME[0]}" "$@"; }
-init_env() { bash "$LIBS_UTILS" "${FUNCNAME[0]}" "$@"; }
-yaml_parse() { bash "$LIBS_UTILS" "${FUNCNAME[0]}" "$@"; }
-
-# @description Load the environment variables with the .env file.
-function load_env() {
-  if [ ! -f "$ENV_FILE" ]; then
-    die "Please initialize the environment file with the command '$SCRIPT_NAME init project_name'" ; exit 1;
-  fi
-  # shellcheck source=./docker_compose.env
-  source "$ENV_FILE"
+CONFIG_FOLDER=${BASHLIBS_CONFIG_FOLDER:-$( cd -- $LIBS_FOLDER/../config &> /dev/null && pwd )}
+ENV_FOLDER=${BASHLIBS_ENV_FOLDER:-$( cd -- $LIBS_FOLDER/../env &> /dev/null && pwd )}
+SCRIPT_NAME="${BASH_SOURCE[0]##*/}"
+ENV_FILE="$ENV_FOLDER/.${BASHLIBS_ENV_NAMESPACE:+$BASHLIBS_ENV_NAMESPACE.}${SCRIPT_NAME%.*}"
+MENU_INDEX_PREFIX_FILE="$ENV_FOLDER/.${SCRIPT_NAME%.*}_index"
+# Parser of the configuration files (awk: built-in parser with a fallback to yq, yq: yq and jq only)
+MENU_PARSER=${MENU_PARSER:-awk}
+# Convert the menu tree (JSON) to bash statements declaring the index
+MENU_INDEX_JQ='
+def index_node($path):
+  (if type == "object" then . else {} end) as $node
+  | "MENU_INDEX_OPTIONAL[\($path|@sh)]=\($node.optional == true)",
+    "MENU_INDEX_PREFIX[\($path|@sh)]=\($node.prefix == true)",
+    (if $node.help != null then "MENU_INDEX_HELP[\($path|@sh)]=\($node.help|tostring|@sh)" else empty end),
+    (if $node|has("opts") then "MENU_INDEX_OPTS[\($path|@sh)]=1" else empty end),
+    (if ($node.opts|type) == "object" then
+      "MENU_INDEX_CHILDREN[\($path|@sh)]=\($node.opts|keys_unsorted|join(" ")|@sh)",
+      ($node.opts|to_entries[]|.key as $key|.value|index_node(($path|rtrimstr(".")) + "." + $key))
+    else empty end);
+(if has("name") then "MENU_INDEX_NAME=\(.name|tostring|@sh)" else empty end),
+index_node(".")'
+# Parse the YAML subset used by the menu files (block maps, plain/quoted/block scalars) into the same bash statements.
+# The exit code is 2 on an unsupported construct (sequences, flow collections, anchors, tags, multiple documents...).
+MENU_INDEX_AWK='
+function unsupported() { failed = 2; exit 2 }
+function sh(s) { gsub(q, q "\\" q q, s); return q s q }
+function add_node(path) { nodes[++nodes_count] = path; optional[path] = "false"; prefix[path] = "false" }
+function push(level_indent, level_kind, level_path) {
+  depth++; indent[depth] = level_indent; kind[depth] = level_kind; npath[depth] = level_path
 }
-
-# @description Check if yq is installed, and install it if necessary.
+# Read a scalar value, sets value (unquoted text) and value_type (null, true, false, string, block)
+function read_value(v,   c, i, out) {
+  value = ""
+  if (v ~ /^[&*!{\[%@`]/ || v ~ /^- / || v == "-") unsupported()
+  c = substr(v, 1, 1)
+  if (c == "\"" || c == q) {
+    out = ""
+    for (i = 2; i <= length(v); i++) {
+      c = substr(v, i, 1)
+      if (substr(v, 1, 1) == q) {
+        if (c == q && substr(v, i + 1, 1) == q) { out = out q; i++; continue }
+        if (c == q) break
+      } else {
+        if (c == "\\") {
+          i++; c = substr(v, i, 1)
+          if (c == "n") c = "\n"; else if (c == "t") c = "\t"; else if (c != "\\" && c != "\"" && c != "/") unsupported()
+          out = out c; continue
+        }
+        if (c == "\"") break
+      }
+      out = out c
+    }
+    if (i > length(v)) unsupported()
+    v = substr(v, i + 1)
+    sub(/^[ ]+(#.*)?$/, "", v)
+    if (v != "") unsupported()
+    value = out; value_type = "string"; return
+  }
+  sub(/[ ]+#.*$/, "", v); sub(/[ ]+$/, "", v)
+  if (v ~ /^[|>][-+]?$/) {
+    value_type = "block"; block_style = substr(v, 1, 1); block_chomp = substr(v, 2, 1); return
+  }
+  if (v ~ /^[|>]/) unsupported()
+  if (v == "" || v == "~" || v ~ /^(null|Null|NULL)$/) { value_type = "null"; return }
+  if (v ~ /^(true|True|TRUE)$/) { value = "true"; value_type = "true"; return }
+  if (v ~ /^(false|False|FALSE)$/) { value = "false"; value_type = "false"; return }
+  value = v; value_type = "string"
+}
+function end_block(   text, i, last) {
+  last = block_count
+  while (last > 0 && block_lines[last] == "") last--
+  text = ""
+  for (i = 1; i <= last; i++) {
+    if (block_style == "|" || i == 1) text = text (i > 1 ? "\n" : "") block_lines[i]
+    else if (block_lines[i] == "") text = text "\n"
+    else if (block_lines[i - 1] == "") text = text block_lines[i]
+    else text = text " " block_lines[i]
+  }
+  if (block_chomp == "+") { for (i = last; i <= block_count; i++) text = text "\n" }
+  else if (block_chomp != "-" && last > 0) text = text "\n"
+  if (block_target == "name") { name = text; has_name = 1 }
+  else if (block_target != "") help[block_target] = text
+  in_block = 0; block_count = 0; split("", block_lines)
+}
+BEGIN { add_node("."); depth = 0; indent[0] = -1; kind[0] = "node"; npath[0] = "." }
+{
+  sub(/\r$/, "")
+  line = $0
+  if (in_block) {
+    match(line, /^ */)
+    if (line ~ /^ *$/) { block_lines[++block_count] = ""; next }
+    if (RLENGTH > block_parent) {
+      if (!block_indent) block_indent = RLENGTH
+      if (RLENGTH < block_indent) unsupported()
+      if (block_style == ">" && RLENGTH > block_indent) unsupported()
+      block_lines[++block_count] = substr(line, block_indent + 1)
+      next
+    }
+    end_block()
+  }
+  if (line ~ /^ *(#.*)?$/) next
+  if (line ~ /^ *\t/) unsupported()
+  if (line ~ /^---[ ]*$/) { if (started) unsupported(); next }
+  if (line ~ /^\.\.\.[ ]*$/) next
+  started = 1
+  match(line, /^ */); line_indent = RLENGTH
+  rest = substr(line, line_indent + 1)
+  while (line_indent <= indent[depth]) depth--
+  if (kind[depth] == "other") next
+  if (!match(rest, /^[A-Za-z0-9_][A-Za-z0-9_.-]*:/)) unsupported()
+  key = substr(rest, 1, RLENGTH - 1)
+  rest = substr(rest, RLENGTH + 1)
+  if (rest != "" && rest !~ /^ /) unsupported()
+  sub(/^ +/, "", rest)
+  if (rest ~ /^#/) rest = ""
+  read_value(rest)
+  target = ""
+  path = npath[depth]
+  if (kind[depth] == "opts") {
+    child = (path == "." ? "" : path) "." key
+    add_node(child)
+    children[path] = children[path] (path in children_defined ? " " : "") key
+    children_defined[path] = 1
+    if (value_type == "null" && rest == "") push(line_indent, "node", child)
+  } else if (key == "opts") {
+    has_opts[path] = 1
+    if (value_type == "null" && rest == "") push(line_indent, "opts", path)
+  } else if (key == "optional" || key == "prefix") {
+    if (key == "optional") optional[path] = (value_type == "true" ? "true" : "false")
+    else prefix[path] = (value_type == "true" ? "true" : "false")
+    if (rest == "") push(line_indent, "other", path)
+  } else if (key == "help") {
+    if (value_type == "block") target = path
+    else if (value_type != "null") help[path] = value
+    else if (rest == "") push(line_indent, "other", path)
+  } else if (key == "name" && path == ".") {
+    if (value_type == "block") target = "name"
+    else { name = (value_type == "null" ? "null" : value); has_name = 1 }
+    if (rest == "") push(line_indent, "other", path)
+  } else if (value_type == "null" && rest == "") push(line_indent, "other", path)
+  if (value_type == "block") {
+    in_block = 1; block_target = target; block_parent = line_indent; block_indent = 0
+  }
+}
+END {
+  if (failed) exit failed
+  if (in_block) end_block()
+  if (has_name) print "MENU_INDEX_NAME=" sh(name)
+  for (i = 1; i <= nodes_count; i++) {
+    path = nodes[i]
+    print "MENU_INDEX_OPTIONAL[" sh(path) "]=" optional[path]
+    print "MENU_INDEX_PREFIX[" sh(path) "]=" prefix[path]
+    if (path in help) print "MENU_INDEX_HELP[" sh(path) "]=" sh(help[path])
+    if (path in has_opts) print "MENU_INDEX_OPTS[" sh(path) "]=1"
+    if (path in children_defined) print "MENU_INDEX_CHILDREN[" sh(path) "]=" sh(children[path])
+  }
+}'
+
+# shellcheck source=./bashlibs.sh
+source "$LIBS_FOLDER/bashlibs.sh"
+
+main() { bashlibs_trace_start ; check_env ; check_args "$@" ; "$@"; }
+
+# @description Check if awk is installed, yq and jq are only required for the configuration files not supported by awk.
 function check_env() {
-  if ! command -v yq 2> /dev/null > /dev/null ; then
-      jq_install=$(confirm_message "yq not available, do you want to install the latest version? [Y/n] " "y")
-      jq_download="https://github.com/mikefarah/yq/releases/latest/download/yq_linux_amd64"
-      if [ "$jq_install" == "y" ]; then
-        if ! command -v wget 2> /dev/null > /dev/null ; then
-          wget_install=$(confirm_message "wget not available, do you want to install the latest version? [Y/n] " "y")
-          if [ "$wget_install" == "y" ]; then
-            sudo apt install wget
-          else die "Unable to continue" ; exit 1 ; fi
-        fi
-        sudo wget $jq_download -O /usr/bin/yq -q --show-progress > /dev/null && sudo chmod +x /usr/bin/yq
-      else
-        die "Unable to continue" && exit 1
-      fi
+  if ! command -v awk 2> /dev/null > /dev/null ; then
+    die "awk could not be found" ; exit 1
   fi
 }
 
@@ -60,7 +188,7 @@ init() {
   # Project name
   MENU_PROJECT_NAME=${1:-menu}
   # Project folder
-  MENU_FOLDER=${2:-$(echo "$MENU_PROJECT_NAME"|rev|cut -d"/" -f1|rev)}
+  MENU_FOLDER=${2:-${MENU_PROJECT_NAME##*/}}
   # Menu config file
   MENU_FILE=${3:-menu.yml}
   # Initializing environment variables
@@ -72,6 +200,97 @@ init() {
   init_env "$ENV_FILE" "$(declare -p ENV_PARAMS)"
 }
 
+# @description Compile the configuration file into an index, and load it.
+#
+# The index is a flat list of the menu nodes (path, name, optional, prefix, help, children) stored in the env folder.
+# It is generated with a single pass of the built-in awk parser, and regenerated only when the modification time
+# of the file changes. The files using YAML constructs not supported by the parser are converted with yq and jq.
+# When the env folder is not writable, the index is loaded in memory without being cached.
+# The index is loaded once per process, and the following calls for the same file return without any check.
+#
+# @arg $1 string Configuration file path.
+#
+# @example
+# ./libs/menu.sh menu_compile config/menu/menu.yml
+menu_compile() {
+  local menu_path_file=$1
+  local menu_index_file="$MENU_INDEX_PREFIX_FILE${menu_path_file//[^[:alnum:]]/_}"
+  local menu_index menu_parser_code
+
+  [[ ! -f $menu_path_file ]] && die "Please provide a menu configuration file" && return 1
+  # The index is loaded once per process, from the env folder or in memory
+  [[ "$MENU_INDEX_FILE" == "$menu_path_file" ]] && return 0
+
+  # The index has the same modification time as the configuration file
+  if [[ ! -f $menu_index_file || $menu_path_file -nt $menu_index_file || $menu_path_file -ot $menu_index_file ]]; then
+    [[ -n $BASHLIBS_TRACE_FD ]] && bashlibs_trace "compile $menu_path_file"
+    local -
+    set -o pipefail
+    menu_parser_code=2
+    if [ "$MENU_PARSER" = "awk" ]; then
+      menu_index=$(awk -v q="'" "$MENU_INDEX_AWK" "$menu_path_file")
+      menu_parser_code=$?
+      [[ -n $BASHLIBS_TRACE_FD && $menu_parser_code -eq 2 ]] && bashlibs_trace "unsupported by awk, use yq"
+    fi
+    if [ $menu_parser_code -eq 2 ]; then
+      if ! command -v yq 2> /dev/null > /dev/null || ! command -v jq 2> /dev/null > /dev/null ; then
+        die "yq and jq are required to read $menu_path_file" && return 1
+      fi
+      menu_index=$(menu_yaml_json "$menu_path_file" | jq -r "$MENU_INDEX_JQ")
+      menu_parser_code=$?
+    fi
+    [[ $menu_parser_code -ne 0 ]] && die "Unable to compile $menu_path_file" && return 1
+    menu_index="# Index of $menu_path_file generated by $SCRIPT_NAME
+unset MENU_INDEX_NAME
+declare -gA MENU_INDEX_OPTIONAL=() MENU_INDEX_PREFIX=() MENU_INDEX_HELP=() MENU_INDEX_OPTS=() MENU_INDEX_CHILDREN=()
+$menu_index
+MENU_INDEX_FILE=${menu_path_file@Q}"
+    if ! { mkdir -p "${menu_index_file%/*}" 2> /dev/null \
+      && printf '%s\n' "$menu_index" 2> /dev/null > "$menu_index_file.$BASHPID" \
+      && mv -f "$menu_index_file.$BASHPID" "$menu_index_file" && touch -r "$menu_path_file" "$menu_index_file"; }; then
+      # The env folder is not writable, the index is loaded without being cached
+      rm -f "$menu_index_file.$BASHPID" 2> /dev/null
+      [[ -n $BASHLIBS_TRACE_FD ]] && bashlibs_trace "unable to write $menu_index_file, load the index in memory"
+      eval "$menu_index"
+      return 0
+    fi
+  fi
+
+  # shellcheck source=/dev/null
+  source "$menu_index_file"
+}
+
+# @description Convert a YAML file to JSON with yq, the Go version (mikefarah) or the Python wrapper of jq.
+#
+# The version of yq is detected once per process, in the **MENU_YQ** variable (go or python).
+#
+# @arg $1 string Configuration file path.
+menu_yaml_json() {
+  if [[ -z $MENU_YQ ]]; then
+    MENU_YQ=python && [[ $(yq --version 2>&1) == *mikefarah* ]] && MENU_YQ=go
+  fi
+  if [[ $MENU_YQ == "go" ]]; then
+    yq -o=json '.' "$1"
+  else
+    yq '.' "$1"
+  fi
+}
+
+# @description Convert a regular expression of options (.opts .opt1 .opts .opt2) to an index path (.opt1.opt2).
+#
+# @arg $1 string A regular expression.
+#
+# Returns the path in the **menu_path** variable.
+menu_regex_path() {
+  local menu_regex_entry
+  menu_path=""
+  for menu_regex_entry in $1; do
+    [[ $menu_regex_entry == ".opts" ]] && continue
+    menu_path+=".${menu_regex_entry#.}"
+  done
+  menu_path=${menu_path:-.}
+}
+
 # @description Check if the entry exists in the configuration file.
 #
 # @arg $1 string Configuration file path.
@@ -80,23 +299,17 @@ check_menu_entries() {
   local menu_path_file="$1"
   # shellcheck disable=SC2124
   local menu_opts=${@:2: $#-1}
-  local opts_regex=""
+  local menu_path="."
 
   [[ ! -f $menu_path_file ]] && die "Please provide a menu configuration file" && return 1
+  menu_compile "$menu_path_file" || return 1
 
-  menu_name=$(yq 'keys | .[] | select(. == "name")' $menu_path_file)
-  [[ -z $menu_name ]] && die "Entry .name does not exist in $menu_path_file" && return 1
-
-  if [[ -n $menu_opts ]]; then
-    for menu_opt in $menu_opts; do
-      opts_regex+=".opts"
-      yq "$opts_regex | keys" $menu_path_file &> /dev/null
-      [[ $? -eq 1 ]] && die "Option $menu_opts does not exist" && return 1
-      opts_regex+=" .$menu_opt "
-      yq "$opts_regex | keys" $menu_path_file &> /dev/null
-      [[ $? -eq 1 ]] && die "Option $menu_opts does not exist" && return 1
-    done
-  fi
+  [[ ! -v MENU_INDEX_NAME ]] && die "Entry .name does not exist in $menu_path_file" && return 1
+
+  for menu_opt in $menu_opts; do
+    [[ ! " ${MENU_INDEX_CHILDREN[$menu_path]} " == *" $menu_opt "* ]] && die "Option $menu_opts does not exist" && return 1
+    menu_path="${menu_path%.}.$menu_opt"
+  done
 
   return 0
 }
@@ -112,16 +325,16 @@ build_mandatory_opts() {
   # shellcheck disable=SC2124
   local opts=${@:3: $#-1}
   local mandatory_opts=""
-  local prefix=""
+  local menu_path
 
   [[ ! -f $menu_path_file ]] && die "Please provide a menu configuration file" && return 1
+  menu_compile "$menu_path_file" || return 1
+  menu_regex_path "$opts_regex"
 
   # Build the mandatory options
   for opt in $opts; do
-    optional=$(yq "$opts_regex .opts .$opt .optional" $menu_path_file)
-    if ! [ "$optional" = "true" ]; then
-      prefix=$(yq "$opts_regex .opts .$opt .prefix" $menu_path_file)
-      if [ "$prefix" = "true" ]; then
+    if ! [ "${MENU_INDEX_OPTIONAL[${menu_path%.}.$opt]}" = "true" ]; then
+      if [ "${MENU_INDEX_PREFIX[${menu_path%.}.$opt]}" = "true" ]; then
         mandatory_opts+="--$opt "
       else
         mandatory_opts+="$opt "
@@ -138,7 +351,7 @@ build_mandatory_opts() {
     cmd_options="${cmd_options::-1}] "
   fi
 
-  [[ $MENU_DEBUG -eq 1 ]] && echo "mandatory_opts: $mandatory_opts"
+  [[ -n $BASHLIBS_TRACE_FD ]] && bashlibs_trace "mandatory_opts: $mandatory_opts"
   [[ $show -eq 1 ]] && echo "$cmd_options"
 
   return 0
@@ -155,15 +368,20 @@ build_optional_opts() {
   # shellcheck disable=SC2124
   local opts=${@:3: $#-1}
   local optional_opts=""
-  local optional=""
+  local menu_path
 
   [[ ! -f $menu_path_file ]] && die "Please provide a menu configuration file" && return 1
+  menu_compile "$menu_path_file" || return 1
+  menu_regex_path "$opts_regex"
 
   # Build the options
   for opt in $opts; do
-    optional=$(yq "$opts_regex .opts .$opt .optional" $menu_path_file)
-    if [ "$optional" = "true" ]; then
-      optional_opts+="$opt "
+    if [ "${MENU_INDEX_OPTIONAL[${menu_path%.}.$opt]}" = "true" ]; then
+      if [ "${MENU_INDEX_PREFIX[${menu_path%.}.$opt]}" = "true" ]; then
+        optional_opts+="--$opt "
+      else
+        optional_opts+="$opt "
+      fi
     fi
   done
 
@@ -176,7 +394,7 @@ build_optional_opts() {
     cmd_options="${cmd_options::-1}} "
   fi
 
-  [[ $MENU_DEBUG -eq 1 ]] && echo "optional_opts: $optional_opts"
+  [[ -n $BASHLIBS_TRACE_FD ]] && bashlibs_trace "optional_opts: $optional_opts"
   [[ $show -eq 1 ]] && echo "$cmd_options"
 
   return 0
@@ -192,51 +410,130 @@ build_cmd_opts() {
   local show=${2:-0}
   # shellcheck disable=SC2124
   local opts_regex=${@:3: $#-1}
-  local parameters=""
   local opts=""
-  local debug_parameters=""
-  local debug_opts=""
+  local menu_path
 
   [[ ! -f $menu_path_file ]] && die "Please provide a menu configuration file" && return 1
+  menu_compile "$menu_path_file" || return 1
+  menu_regex_path "$opts_regex"
 
-  [[ $MENU_DEBUG -eq 1 ]] && echo "opts_regex: $opts_regex"
+  [[ -n $BASHLIBS_TRACE_FD ]] && bashlibs_trace "opts_regex: $opts_regex"
 
-  # Get parameters from the menu configuration file
-  if [ -z "$opts_regex" ]; then
-    parameters=$(yq "keys | .[]" $menu_path_file)
-  else
-    parameters=$(yq "$opts_regex | keys | .[]" $menu_path_file)
+  # Generate the command to display
+  if [[ -n ${MENU_INDEX_OPTS[$menu_path]} ]]; then
+    opts=${MENU_INDEX_CHILDREN[$menu_path]}
+    [[ -z $opts ]] && die "Entry $opts_regex.opts is empty in $menu_path_file" && return 1
+    [[ -n $BASHLIBS_TRACE_FD ]] && bashlibs_trace "opts: $opts"
+    build_mandatory_opts $menu_path_file 0 $opts
+    build_optional_opts $menu_path_file 0 $opts
   fi
 
-  # Debug parameters
-  if [ $MENU_DEBUG -eq 1 ]; then
-    debug_parameters="parameters: "
-    for parameter in $parameters; do debug_parameters+="$parameter "; done
-    echo $debug_parameters
-  fi
+  [[ $show -eq 1 ]] && echo "$cmd_options"
+  return 0
+}
 
-  # Generate the command to display
-  for parameter in $parameters; do
-    if [ $parameter = "opts" ]; then
-      yq "$opts_regex .opts | keys" $menu_path_file &> /dev/null
-      [[ $? -eq 1 ]] && die "Entry $opts_regex.opts is empty in $menu_path_file" && return 1
-      opts=$(yq "$opts_regex .opts | keys | .[]" $menu_path_file)
-      if [ $MENU_DEBUG -eq 1 ]; then
-        debug_opts="opts: "
-        for opt in $opts; do debug_opts+="$opt "; done
-        echo $debug_opts
-      fi
-      build_mandatory_opts $menu_path_file 0 $opts
-      build_optional_opts $menu_path_file 0 $opts
+# @description Write the completion words of a menu node and its children (used by build_completion).
+#
+# @arg $1 string Index path of the node.
+# @arg $2 string Function name prefix of the completion script.
+build_completion_words() {
+  local menu_path=$1
+  local function_prefix=$2
+  local mandatory_words=""
+  local optional_words=""
+  local opt word
+
+  for opt in ${MENU_INDEX_CHILDREN[$menu_path]}; do
+    word=$opt && [ "${MENU_INDEX_PREFIX[${menu_path%.}.$opt]}" = "true" ] && word="--$opt"
+    if [ "${MENU_INDEX_OPTIONAL[${menu_path%.}.$opt]}" = "true" ]; then
+      optional_words+="$word "
+    else
+      mandatory_words+="$word "
     fi
   done
+  mandatory_words=${mandatory_words% } && optional_words=${optional_words% }
+  [[ -n $mandatory_words ]] && echo "${function_prefix}_words[${menu_path@Q}]=${mandatory_words@Q}"
+  [[ -n $optional_words ]] && echo "${function_prefix}_optional[${menu_path@Q}]=${optional_words@Q}"
 
-  [[ $show -eq 1 ]] && echo "$cmd_options"
+  for opt in ${MENU_INDEX_CHILDREN[$menu_path]}; do
+    build_completion_words "${menu_path%.}.$opt" "$function_prefix"
+  done
+}
+
+# @description Generate a bash completion script from the configuration file.
+#
+# The whole options tree is inlined in the script, so a completion runs without any subprocess.
+# The optional options are proposed after the other ones, and the options with a prefix are completed with **--**.
+# The script is regenerated only when the modification time of the configuration file or the command changes,
+# the command is kept in the header of the script.
+#
+# @arg $1 string Configuration file path.
+# @arg $2 string Completion script path.
+# @arg $3 string Command to complete (default **name** entry of the configuration file).
+#
+# @example
+# ./libs/menu.sh build_completion config/menu/menu.yml ~/.local/share/bash-completion/completions/test.sh
+# source ~/.local/share/bash-completion/completions/test.sh
+build_completion() {
+  local menu_path_file=$1
+  local completion_file=$2
+  local menu_command=$3
+  local function_prefix completion_header completion_source=""
+
+  [[ ! -f $menu_path_file ]] && die "Please provide a menu configuration file" && return 1
+  [[ -z $completion_file ]] && die "Please provide a completion script path" && return 1
+
+  # The completion script has the same modification time as the configuration file, and completes the same command
+  if [[ -f $completion_file && ! $menu_path_file -nt $completion_file && ! $menu_path_file -ot $completion_file ]]; then
+    read -r completion_header < "$completion_file"
+    if [[ -n $menu_command && $completion_header == "# Bash completion for $menu_command, "* ]] \
+      || [[ -z $menu_command && $completion_header == *" (name entry)" ]]; then
+      return 0
+    fi
+  fi
+
+  menu_compile "$menu_path_file" || return 1
+  [[ -z $menu_command ]] && menu_command=$MENU_INDEX_NAME && completion_source=" (name entry)"
+  [[ -z $menu_command ]] && die "Please provide a command to complete" && return 1
+  function_prefix="_${menu_command//[^[:alnum:]_]/_}_menu"
+  [[ -n $BASHLIBS_TRACE_FD ]] && bashlibs_trace "menu_command: $menu_command"
+
+  {
+    echo "# Bash completion for $menu_command, generated by $SCRIPT_NAME from $menu_path_file$completion_source"
+    echo "declare -gA ${function_prefix}_words=() ${function_prefix}_optional=()"
+    build_completion_words "." "$function_prefix"
+    cat <<EOF
+${function_prefix}_complete() {
+  local menu_path="." menu_word i
+  COMPREPLY=()
+  # Follow the options already typed
+  for (( i = 1; i < COMP_CWORD; i++ )); do
+    menu_word=\${COMP_WORDS[i]}
+    [[ " \${${function_prefix}_words[\$menu_path]} \${${function_prefix}_optional[\$menu_path]} " != *" \$menu_word "* ]] && return 0
+    menu_path="\${menu_path%.}.\${menu_word#--}"
+  done
+  for menu_word in \${${function_prefix}_words[\$menu_path]} \${${function_prefix}_optional[\$menu_path]}; do
+    [[ \$menu_word == "\${COMP_WORDS[COMP_CWORD]}"* ]] && COMPREPLY+=("\$menu_word")
+  done
   return 0
 }
+complete -o nosort -F ${function_prefix}_complete ${menu_command@Q}
+EOF
+  } > "$completion_file.$BASHPID" || { rm -f "$completion_file.$BASHPID" ; die "Unable to write $completion_file" ; return 1; }
+  mv -f "$completion_file.$BASHPID" "$completion_file" && touch -r "$menu_path_file" "$completion_file"
+}
+
+# @description Generate a bash completion script with environment file.
+#
+# @arg $1 string Completion script path (default **env/project_name.completion.bash**).
+_build_completion() {
+  build_completion $CONFIG_FOLDER/$MENU_FOLDER/$MENU_FILE "${1:-$ENV_FOLDER/${MENU_PROJECT_NAME##*/}.completion.bash}"
+}
 
 # @description Show the help menu in standard output.
 #
+# The options with a prefix are shown with **--**, as they are accepted by menu_parse.
+#
 # @arg $1 string Configuration file path.
 # @arg $2 array Options passed to script.
 #
@@ -247,20 +544,27 @@ display_help() {
   local menu_opts=${@:2: $#-1}
   local opts_regex=""
   local cmd_options=""
+  local menu_path="."
 
   [[ ! -f $menu_path_file ]] && die "Please provide a menu configuration file" && return 1
-  ! check_menu_entries $menu_path_file $menu_opts && display_help $menu_path_file && exit 1
-  menu_name=$(yq '.name' $menu_path_file)
+  # On an invalid option, show the help menu without options
+  if ! check_menu_entries $menu_path_file $menu_opts; then
+    [[ -n ${menu_opts// } ]] && display_help $menu_path_file
+    exit 1
+  fi
+  menu_name=$MENU_INDEX_NAME
 
   # Build the regular expression
   for menu_opt in $menu_opts; do
     opts_regex+=".opts .$menu_opt "
+    menu_path="${menu_path%.}.$menu_opt"
+    [[ ${MENU_INDEX_PREFIX[$menu_path]} == "true" ]] && cmd_options+="--"
     cmd_options+="$menu_opt "
   done
 
   # Build the command with options passed to script
   ! build_cmd_opts "$menu_path_file" 0 "$opts_regex" && exit 1
-  [[ $MENU_DEBUG -eq 1 ]] && echo "cmd_options: $cmd_options"
+  [[ -n $BASHLIBS_TRACE_FD ]] && bashlibs_trace "cmd_options: $cmd_options"
 
   # Show the usage command
   show_message "Usage: $menu_name $cmd_options"
@@ -271,4 +575,99 @@ _display_help() {
   display_help $CONFIG_FOLDER/$MENU_FOLDER/$MENU_FILE "$*"
 }
 
-main "$@"
+# @description Parse the arguments of a script with the options tree of the configuration file.
+#
+# Each argument is looked up in the index from the current node, so the parsing costs one lookup per level,
+# without any subprocess once the index is compiled. The options with a prefix are only accepted with **--**,
+# and one of the options not optional is required on each node that has options.
+# The arguments after a node without options are left to the handler.
+# On an invalid argument, the usage and the help of the deepest valid node are shown in standard error.
+#
+# @arg $1 string Configuration file path.
+# @arg $2 array Arguments of the script.
+#
+# Returns the index path in the **menu_path** variable, and the arguments left in the **menu_args** array.
+#
+# @example
+# ./libs/menu.sh menu_parse config/menu/menu.yml test1 --test1 || exit 1
+menu_parse() {
+  local menu_path_file=$1
+  local menu_arg menu_opt menu_child menu_prefix
+  menu_path="."
+  menu_args=()
+
+  [[ ! -f $menu_path_file ]] && die "Please provide a menu configuration file" && return 1
+  menu_compile "$menu_path_file" || return 1
+  shift
+
+  # Follow the arguments in the options tree
+  while [[ $# -gt 0 && -n ${MENU_INDEX_CHILDREN[$menu_path]} ]]; do
+    menu_arg=$1
+    menu_opt=${menu_arg#--}
+    menu_child="${menu_path%.}.$menu_opt"
+    menu_prefix="false" && [[ $menu_arg == --* ]] && menu_prefix="true"
+    if [[ -z $menu_opt || $menu_opt == *.* || ${MENU_INDEX_PREFIX[$menu_child]} != "$menu_prefix" ]]; then
+      die "Option $menu_arg does not exist"
+      menu_parse_help "$menu_path_file" "$menu_path"
+      return 1
+    fi
+    menu_path=$menu_child
+    shift
+  done
+  menu_args=("$@")
+
+  # One of the options not optional is required
+  for menu_opt in ${MENU_INDEX_CHILDREN[$menu_path]}; do
+    if [[ ${MENU_INDEX_OPTIONAL[${menu_path%.}.$menu_opt]} != "true" ]]; then
+      die "Missing option"
+      menu_parse_help "$menu_path_file" "$menu_path"
+      return 1
+    fi
+  done
+  return 0
+}
+
+# @description Show the usage and the help of a menu node in standard error, used by menu_parse.
+#
+# @arg $1 string Configuration file path.
+# @arg $2 string Index path of the node.
+menu_parse_help() {
+  local menu_path_file=$1
+  local menu_path=$2
+  {
+    # shellcheck disable=SC2086
+    display_help "$menu_path_file" ${menu_path//./ }
+    [[ -n ${MENU_INDEX_HELP[$menu_path]} ]] && echo "${MENU_INDEX_HELP[$menu_path]%$'\n'}"
+  } >&2
+}
+
+# @description Parse the arguments of a script, and call the handler function of the selected node.
+#
+# The handler is named after the path of the node: **prefix_opt1_opt2** for the arguments **opt1 --opt2**,
+# or **prefix** for the root node. The arguments left are passed to the handler.
+# The library is sourced by the script, so that the handlers are called in the same process.
+#
+# @arg $1 string Configuration file path.
+# @arg $2 string Prefix of the handlers (default **name** entry of the configuration file, without extension).
+# @arg $3 array Arguments of the script.
+#
+# @example
+# source ./libs/menu.sh
+# test_test1_test2() { echo "test1 test2 $*"; }
+# menu_dispatch config/menu/menu.yml test "$@"
+menu_dispatch() {
+  local menu_path_file=$1
+  local menu_prefix=$2
+  local menu_path menu_handler
+  local -a menu_args=()
+
+  menu_parse "$menu_path_file" "${@:3}" || return 1
+  menu_prefix=${menu_prefix:-${MENU_INDEX_NAME%.*}}
+  menu_handler="$menu_prefix${menu_path%.}"
+  menu_handler=${menu_handler//[^[:alnum:]_]/_}
+  ! declare -F "$menu_handler" > /dev/null && die "Function with name '$menu_handler' not exists" && return 1
+  "$menu_handler" "${menu_args[@]}"
+}
+
+# Run the command line only when the script is executed, not when it is sourced to dispatch the arguments
+if [[ "${BASH_SOURCE[0]}" == "$0" ]]; then main "$@"; fi
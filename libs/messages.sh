@@ -3,37 +3,43 @@
 # @brief A library for display messages.
 # @description
 #     The library allows you to display custom messages.
+#     It can be executed (`bash messages.sh show_message "msg"`) or sourced once to call the functions in the same process.
+#     The messages are printed with log.sh.
 
-declare -A MSG_COLORS=(
-  [NOCOLOR]='\033[0m'
-  [GREEN]='\033[0;32m'
-  [RED]='\033[0;31m'
-  [ORANGE]='\033[0;33m'
-)
+# The messages are printed by log.sh
+if declare -F bashlibs_require > /dev/null; then
+  bashlibs_require log
+elif ! declare -F log_print > /dev/null; then
+  # shellcheck source=./log.sh
+  source "$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )/log.sh"
+fi
 
 # @description Print a message to STDOUT. You can customize the output by specifying a level.
 #
+# The message is printed by log_message, so it is filtered by **LOG_LEVEL** and colorized with **LOG_COLOR**.
+#
 # @arg $1 string Message that will be printed.
 # @arg $2 int An optional level (0: info (default), >0: error, <0: warn).
 show_message() {
-  msg=$1
-  level=${2:-0}
+  local msg=$1
+  local level=${2:-0}
   # Check level option
   if ! [[ $level =~ ^-?[0-9]+$ ]] ; then { die "Invalid level option" && return 1; } fi
-  # level=0: info message
-  if [ "$level" -eq 0 ]; then msg_start="${MSG_COLORS[GREEN]}"; fi
-  # level>0: error message
-  if [ "$level" -gt 0 ]; then msg_start="${MSG_COLORS[RED]}"; fi
-  # level<0: warn message
-  if [ "$level" -lt 0 ]; then msg_start="${MSG_COLORS[ORANGE]}"; fi
-  echo -e "$msg_start$msg${MSG_COLORS[NOCOLOR]}"
+  printf -v msg '%b' "$msg"
+  # level=0: info message, level>0: error message, level<0: warn message
+  if [ "$level" -eq 0 ]; then log_print 1 info "$msg"
+  elif [ "$level" -gt 0 ]; then log_print 1 error "$msg"
+  else log_print 1 warn "$msg"
+  fi
 }
 
 # @description Print a message to STDERR.
 #
 # @arg $1 string Message that will be printed.
 die() {
-    echo -e "${MSG_COLORS[RED]}$*${MSG_COLORS[NOCOLOR]}" > /dev/stderr
+  local msg
+  printf -v msg '%b' "$*"
+  log_print 2 error "$msg"
 }
 
 # @description Read a confirm message and print a response ('y','') to STDOUT.
@@ -44,15 +50,16 @@ die() {
 #
 # Returns "y" if the user's response is "yes" or "y".
 confirm_message() {
-  default_answer=$2
-  test_answer=$3
+  local default_answer=$2
+  local test_answer=$3
+  local answer
   if [ -z "$test_answer" ]; then
     read -r -p "$1" answer
   else
     if [ "$test_answer" = "no_answer" ]; then answer=""; else answer=$test_answer; fi
   fi
   if [ -z "$answer" ]; then
-    echo "$default_answer" && exit
+    echo "$default_answer" && return 0
   fi
   case "$answer" in [yY][eE][sS]|[yY])
       echo "y"
@@ -63,4 +70,5 @@ confirm_message() {
   esac
 }
 
-"$@"
+# Run the command line only when the script is executed, not when it is sourced
+if [[ "${BASH_SOURCE[0]}" == "$0" ]]; then "$@"; fi
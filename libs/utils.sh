@@ -2,50 +2,44 @@
 # @file utils.sh
 # @brief A utility library.
 # @description
-#     The library allows you to check the settings and environment file.
-
-LIBS_FOLDER=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
-ENV_FOLDER=$( cd -- $LIBS_FOLDER/../env &> /dev/null && pwd )
-LIBS_MESSAGES="$LIBS_FOLDER/messages.sh"
-SCRIPT_NAME="$(basename -- "${BASH_SOURCE[0]}")"
-ENV_FILE="$ENV_FOLDER/.${SCRIPT_NAME%.*}"
-PARENT_COMMAND=$(ps -o args= $PPID|grep "libs"|cut -d " " -f2)
-CALL_UTILS=false && [[ -z $PARENT_COMMAND ]] && CALL_UTILS=true
-
-die() { bash "$LIBS_MESSAGES" "${FUNCNAME[0]}" "$@"; }
-
-# @description Check if a function name exists.
-#
-# @arg $1 string Function name.
-function check_args() {
-  if ! $CALL_UTILS; then declare -f check_args ; exit 0; fi
-  FUNCTION_NAME=$1 && [[ -z "$FUNCTION_NAME" ]] && { die "Please provide a function name" ; exit 1; }
-  [[ ! $(type -t "$FUNCTION_NAME") == function ]] && { die "Function with name '$FUNCTION_NAME' not exists" ; exit 1; }
-  if [ "${FUNCTION_NAME:0:1}" = "_" ]; then load_env; fi
-}
-
-# @description Load the environment variables with the .env file.
-function load_env() {
-  # shellcheck source=./utils.sh
-  source "$ENV_FILE"
-}
+#     The library allows you to generate the environment files.
+#     It is loaded by bashlibs.sh on the first call of one of its functions.
 
 # @description Generate an environment file from an array of parameters.
 #
+# The file is written to a temporary file renamed when complete, under a lock of the environment folder
+# (with flock, if installed), so that concurrent scripts can initialize and load the environment files.
+# Without flock, each script or subshell writes its own temporary file, named with its pid.
+#
 # @arg $1 string An environment file.
 # @arg $2 array An array of parameters.
+#
+# Without arguments, a test environment file is generated, used for unit test.
 function init_env() {
-  if ! $CALL_UTILS; then
-    ENV_FILE=$1 && [[ -z "$ENV_FILE" ]] && { die "Please provide the env file" ; exit 1; }
-    ENV_PARAMS=${2#*=} && eval "declare -A ENV_PARAMS=$ENV_PARAMS"
+  local env_file=$ENV_FILE
+  local env_folder=. env_param lock_fd
+  if [ $# -gt 0 ]; then
+    env_file=$1 && [[ -z "$env_file" ]] && { die "Please provide the env file" ; exit 1; }
+    local env_params=${2#*=} && eval "declare -A ENV_PARAMS=$env_params"
   else
     declare -A ENV_PARAMS=( [TEST_ENV_KEY]="TEST_ENV_VALUE" )
   fi
-  # Initializing the environment file
-  rm -f "$ENV_FILE"
-  for ENV_PARAM in "${!ENV_PARAMS[@]}"; do
-    echo "$ENV_PARAM=${ENV_PARAMS[$ENV_PARAM]}" >> "$ENV_FILE"
-  done
+  [[ $env_file == */* ]] && env_folder=${env_file%/*}
+  [[ ! -d $env_folder ]] && mkdir -p "$env_folder"
+  # Lock the environment folder, to serialize the initializations
+  if command -v flock > /dev/null; then
+    exec {lock_fd}> "$env_folder/.bashlibs.lock"
+    if ! flock -w "$BASHLIBS_LOCK_TIMEOUT" "$lock_fd"; then
+      exec {lock_fd}>&- ; die "Unable to lock the environment folder $env_folder" ; exit 1
+    fi
+  fi
+  # Initializing the environment file, renamed when complete so that it is never read half-written.
+  # The temporary file is named with the pid of the (sub)shell, not shared by the subshells of a script without flock
+  for env_param in "${!ENV_PARAMS[@]}"; do
+    echo "$env_param=${ENV_PARAMS[$env_param]}"
+  done > "$env_folder/.init_env.$BASHPID" && mv -f "$env_folder/.init_env.$BASHPID" "$env_file"
+  [[ -n $lock_fd ]] && exec {lock_fd}>&-
+  return 0
 }
 
 # @description Check arguments, used for unit test.
@@ -54,4 +48,13 @@ function test_check_args() { check_args "${FUNCNAME[0]}" ; echo "${FUNCNAME[0]}"
 # @description Check arguments with an environment file, used for unit test.
 function _test_check_args_with_env() { check_args "${FUNCNAME[0]}" ; cat "$ENV_FILE" ; }
 
-"$@"
+# Run the command line only when the script is executed, not when it is loaded by bashlibs.sh
+if [[ "${BASH_SOURCE[0]}" == "$0" ]]; then
+  LIBS_FOLDER=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
+  ENV_FOLDER=${BASHLIBS_ENV_FOLDER:-$( cd -- $LIBS_FOLDER/../env &> /dev/null && pwd )}
+  SCRIPT_NAME="${BASH_SOURCE[0]##*/}"
+  ENV_FILE="$ENV_FOLDER/.${BASHLIBS_ENV_NAMESPACE:+$BASHLIBS_ENV_NAMESPACE.}${SCRIPT_NAME%.*}"
+  # shellcheck source=./bashlibs.sh
+  source "$LIBS_FOLDER/bashlibs.sh"
+  "$@"
+fi
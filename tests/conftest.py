@@ -0,0 +1,77 @@
+import contextlib
+import http.server
+import inspect
+import os
+import subprocess
+import threading
+import pytest
+from pytest_shell.shell import bash as bash_shell
+from github_api import GithubHandler, github_project_name
+
+script_dir: str = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+if os.getenv('PWD') == "/app":
+    script_dir = "/app/tests"
+
+
+@contextlib.contextmanager
+def environ_update(environ):
+    """Update the environment variables, and restore them on exit."""
+    environ_before = {name: os.environ.get(name) for name in environ}
+    os.environ.update(environ)
+    try:
+        yield environ
+    finally:
+        for name, value in environ_before.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+@pytest.fixture(scope="session")
+def env_folder(tmp_path_factory):
+    """Store the environment files of the libraries in a folder of the pytest worker, to run the tests in parallel."""
+    folder = tmp_path_factory.mktemp("env")
+    with environ_update({"BASHLIBS_ENV_FOLDER": str(folder)}):
+        yield folder
+
+
+@pytest.fixture(scope="session")
+def bash_session(env_folder):
+    """Start a single bash session for the tests of the pytest worker."""
+    with bash_shell() as session:
+        yield session
+
+
+@pytest.fixture(name="bash")
+def bash_fixture(bash_session):
+    """Run each test in a subshell of the bash session, instead of starting a new bash session."""
+    with bash_session() as subshell:
+        yield subshell
+
+
+@pytest.fixture(scope="session")
+def github_stub(tmp_path_factory, env_folder):
+    """Serve the github API and the project repository locally, for the duration of the tests.
+
+    Returns the environment variables of the github endpoints."""
+    # Local remote of the project, with the v1.0.0 tag
+    remote_folder = tmp_path_factory.mktemp("github")
+    repository = remote_folder / "repository"
+    subprocess.run(["git", "init", "-q", str(repository)], check=True)
+    (repository / "README.md").write_text("# bash-libs\n")
+    for command in [["add", "README.md"], ["-c", "user.email=test@test", "-c", "user.name=test", "commit", "-q",
+                    "-m", "v1.0.0"], ["tag", "v1.0.0"]]:
+        subprocess.run(["git", "-C", str(repository)] + command, check=True)
+    subprocess.run(["git", "clone", "-q", "--bare", str(repository), str(remote_folder / github_project_name)],
+                   check=True)
+    # Local API
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), GithubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # The endpoints are only given to the tests of the github library, with the envvars of their subshell
+    environ = {"GITHUB_API_URL": f"http://127.0.0.1:{server.server_port}",
+               "GITHUB_BASE_URL": f"file://{remote_folder}"}
+    subprocess.run(["bash", f"{script_dir}/../libs/github.sh", "gh_cache_clear"], check=True,
+                   env=dict(os.environ, **environ))
+    yield environ
+    server.shutdown()
@@ -0,0 +1,144 @@
+"""A local stand-in of the github API, used by the tests and the benchmarks.
+
+Usage: python3 tests/github_api.py [port]    # Print the port, then serve the API until killed
+"""
+import hashlib
+import http.server
+import inspect
+import json
+import os
+import re
+import sys
+from urllib.parse import parse_qs, urlparse
+
+script_dir: str = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+github_data_folder: str = os.path.abspath(f"{script_dir}/data/github")
+github_project_name: str = "christopherlouet/bash-libs"
+
+
+def github_data(name: str):
+    with open(f"{github_data_folder}/{name}.json") as data_file:
+        return json.load(data_file)
+
+
+def github_asset(asset_id: int, name: str, size: int, digest: str = None):
+    """An asset of the latest release, with generated bytes and their sha256 digest (or a wrong digest)."""
+    content = bytes((index * 31 + asset_id) % 256 for index in range(size))
+    return {"id": asset_id, "name": name, "size": size, "content": content,
+            "digest": digest or f"sha256:{hashlib.sha256(content).hexdigest()}"}
+
+
+class GithubHandler(http.server.BaseHTTPRequestHandler):
+    """A local stand-in of the github API, with the responses of tests/data/github."""
+    rate_limit = github_data("rate_limit")
+    release_latest = github_data("releases_latest")
+    tags = github_data("tags")
+    assets = {asset["id"]: asset for asset in [github_asset(1, "bash-libs.tar.gz", 10000),
+                                               github_asset(2, "bash-libs-corrupt.tar.gz", 1000, "sha256:" + "0" * 64)]}
+    # The Range header of each asset request, by asset id
+    asset_requests = []
+    # The If-None-Match header and the status of each cached response
+    cached_requests = []
+    # The path of each rate limit request
+    rate_requests = []
+
+    def send_json(self, status: int, data=None, headers=None):
+        body = json.dumps(data).encode() if data is not None else b""
+        rate = self.rate_limit["rate"]
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("X-RateLimit-Limit", str(rate["limit"]))
+        self.send_header("X-RateLimit-Used", str(rate["used"]))
+        self.send_header("X-RateLimit-Remaining", str(rate["remaining"]))
+        self.send_header("X-RateLimit-Reset", str(rate["reset"]))
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_cached_json(self, data, etag: str):
+        if_none_match = self.headers.get("If-None-Match")
+        status = 304 if if_none_match == etag else 200
+        self.cached_requests.append((urlparse(self.path).path, if_none_match, status))
+        if status == 304:
+            self.send_json(304, headers={"ETag": etag})
+        else:
+            self.send_json(200, data, {"ETag": etag})
+
+    def release(self):
+        """The latest release, with the API urls of its assets on this server."""
+        assets_url = f"http://{self.headers['Host']}/repos/{github_project_name}/releases/assets"
+        return dict(self.release_latest, assets=[
+            {"id": asset["id"], "name": asset["name"], "size": asset["size"], "digest": asset["digest"],
+             "url": f"{assets_url}/{asset['id']}"} for asset in self.assets.values()])
+
+    def send_asset(self, asset):
+        """Send the bytes of an asset, or a byte range of it with the Range header."""
+        content = asset["content"]
+        range_header = self.headers.get("Range")
+        self.asset_requests.append((asset["id"], range_header))
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", range_header or "")
+        status, start, end = 200, 0, len(content) - 1
+        if match:
+            status, start = 206, int(match.group(1))
+            end = min(int(match.group(2)), end) if match.group(2) else end
+            if start > end:
+                self.send_json(416, {"message": "Range Not Satisfiable"})
+                return
+        body = content[start:end + 1]
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Accept-Ranges", "bytes")
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(content)}")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        repos_path = f"/repos/{github_project_name}"
+        if url.path == "/rate_limit":
+            self.rate_requests.append(url.path)
+            self.send_json(200, self.rate_limit)
+        elif url.path == f"{repos_path}/releases/latest":
+            self.send_cached_json(self.release(), '"release-latest"')
+        elif url.path == f"{repos_path}/releases/tags/{self.release_latest['tag_name']}":
+            self.send_cached_json(self.release(), '"release-latest"')
+        elif url.path.startswith(f"{repos_path}/releases/assets/"):
+            asset_id = url.path.rsplit("/", 1)[1]
+            asset = self.assets.get(int(asset_id)) if asset_id.isdigit() else None
+            if asset is None:
+                self.send_json(404, {"message": "Not Found"})
+            else:
+                self.send_asset(asset)
+        elif url.path == f"{repos_path}/tags":
+            per_page = int(query.get("per_page", ["30"])[0])
+            page = int(query.get("page", ["1"])[0])
+            headers = {}
+            if page * per_page < len(self.tags):
+                next_url = f"http://{self.headers['Host']}{url.path}?per_page={per_page}&page={page + 1}"
+                headers["Link"] = f'<{next_url}>; rel="next"'
+            self.send_json(200, self.tags[(page - 1) * per_page:page * per_page], headers)
+        elif url.path.startswith(f"{repos_path}/git/ref/tags/"):
+            name = url.path[len(f"{repos_path}/git/ref/tags/"):]
+            tag = next((tag for tag in self.tags if tag["name"] == name), None)
+            if tag is None:
+                self.send_json(404, {"message": "Not Found"})
+            else:
+                self.send_cached_json({"ref": f"refs/tags/{name}",
+                                       "object": {"sha": tag["commit"]["sha"], "type": "commit"}}, f'"{name}"')
+        else:
+            self.send_json(404, {"message": "Not Found"})
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", int(sys.argv[1]) if len(sys.argv) > 1 else 0),
+                                             GithubHandler)
+    print(server.server_port, flush=True)
+    server.serve_forever()
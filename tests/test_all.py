@@ -18,8 +18,8 @@ def test_docker_compose(bash):
         assert s.last_return_code == 0
 
 
-def test_github(bash):
-    with bash() as s:
+def test_github(bash, github_stub):
+    with bash(envvars=github_stub) as s:
         s.auto_return_code_error = False
         assert s.run_script(script, ["test_github"]) == "v1.0.0 exist"
         assert s.last_return_code == 0
@@ -9,9 +9,8 @@ LIBS_MENU="$LIBS_FOLDER/menu.sh"
 LIBS_MESSAGES="$LIBS_FOLDER/messages.sh"
 
 # Messages
-show_message() { bash "$LIBS_MESSAGES" "${FUNCNAME[0]}" "$@"; }
-confirm_message() { bash "$LIBS_MESSAGES" "${FUNCNAME[0]}" "$@"; }
-die() { bash "$LIBS_MESSAGES" "${FUNCNAME[0]}" "$@"; }
+# shellcheck source=../libs/messages.sh
+source "$LIBS_MESSAGES"
 
 # Docker compose
 init_docker_compose() { bash "$LIBS_DOCKER_COMPOSE" "init" "$@"; }
@@ -0,0 +1,68 @@
+import inspect
+import json
+import os
+
+script_dir: str = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+if os.getenv('PWD') == "/app":
+    script_dir = "/app/tests"
+script: str = os.path.abspath(f"{script_dir}/../libs/bashlibs.sh")
+
+
+def test_autoload_not_loaded(bash):
+    assert bash.run_script_inline([f'source {script} && echo "${{BASHLIBS_LOADED[messages]}}"']) == ''
+
+
+def test_autoload_on_first_call(bash):
+    assert bash.run_script_inline([
+        f'source {script} && show_message "loaded" && echo "${{BASHLIBS_LOADED[messages]}}"']) == 'loaded\n1'
+
+
+def test_loader_folder_exported(bash):
+    # A BASHLIBS_FOLDER variable exported by the parent shell does not skip the loader
+    with bash(envvars={'BASHLIBS_FOLDER': "/dev/null"}) as s:
+        assert s.run_script_inline([f'source {script} && show_message "loaded" && echo "$BASHLIBS_FOLDER"'
+                                    ]) == f'loaded\n{os.path.dirname(script)}'
+
+
+def test_require_not_exist(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script_inline([f'source {script} && bashlibs_require toto']) == "Library with name 'toto' not exists"
+        assert s.last_return_code == 1
+
+
+def test_check_args_empty(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script_inline([f'(source {script} && check_args)']) == "Please provide a function name"
+        assert s.last_return_code == 1
+
+
+def test_check_args_function_not_exist(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script_inline([f'(source {script} && check_args toto)']) == "Function with name 'toto' not exists"
+        assert s.last_return_code == 1
+
+
+def test_trace_off(bash):
+    assert bash.run_script_inline([f'source {script} && bashlibs_trace_start && declare -F bashlibs_trace::check_args'
+                                   ' || echo "not traced"']) == 'not traced'
+
+
+def test_trace_functions(bash, tmp_path):
+    trace_file = tmp_path / "trace.jsonl"
+    assert bash.run_script_inline([f'source {script} && BASHLIBS_TRACE={trace_file} bashlibs_trace_start'
+                                   ' && show_message "traced"']) == 'traced'
+    events = [json.loads(line) for line in trace_file.read_text().splitlines()]
+    assert [(event["event"], event["function"]) for event in events if event["function"] == "show_message"
+            ] == [("enter", "show_message"), ("exit", "show_message")]
+    assert ("enter", "log_print") in [(event["event"], event["function"]) for event in events]
+    assert events[-1]["code"] == 0 and events[-1]["duration_us"] >= 0
+
+
+def test_trace_debug_escape(bash, tmp_path):
+    trace_file = tmp_path / "trace.jsonl"
+    bash.run_script_inline([f'source {script} && BASHLIBS_TRACE={trace_file} bashlibs_trace_start'
+                            ' && bashlibs_trace "a \\"quoted\\" \\\\ message"'])
+    assert json.loads(trace_file.read_text())["message"] == 'a "quoted" \\ message'
@@ -0,0 +1,95 @@
+import inspect
+import os
+import shutil
+import subprocess
+import pytest
+
+script_dir: str = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+if os.getenv('PWD') == "/app":
+    script_dir = "/app/tests"
+bundle_script: str = os.path.abspath(f"{script_dir}/../bundle.sh")
+installer_script: str = os.path.abspath(f"{script_dir}/../installer.sh")
+config_folder: str = os.path.abspath(f"{script_dir}/../config")
+menu_path_file: str = f"{config_folder}/menu/menu.yml"
+release_name: str = "v9.9.9"
+
+
+@pytest.fixture(scope="module")
+def releases_folder(tmp_path_factory):
+    """Bundle the libraries once, in the folder of a local github release."""
+    folder = tmp_path_factory.mktemp("releases")
+    subprocess.run(["bash", bundle_script, release_name,
+                    str(folder / "christopherlouet/bash-libs/releases/download" / release_name)],
+                   check=True, stdout=subprocess.DEVNULL)
+    return folder
+
+
+@pytest.fixture
+def bundle(releases_folder):
+    return releases_folder / "christopherlouet/bash-libs/releases/download" / release_name / "bashlibs.bundle.sh"
+
+
+def test_bundle_checksum(bash, bundle):
+    assert bash.run_script_inline([f'cd {bundle.parent} && sha256sum -c bashlibs.bundle.sh.sha256'
+                                   ]) == "bashlibs.bundle.sh: OK"
+
+
+def test_bundle_version(bash, bundle):
+    assert bash.run_script_inline([f'source {bundle} && echo "$BASHLIBS_BUNDLE_VERSION"']) == release_name
+
+
+def test_bundle_display_help(bash, bundle):
+    with bash(envvars={'BASHLIBS_CONFIG_FOLDER': config_folder}) as s:
+        assert s.run_script_inline([f'source {bundle} && menu::init test menu menu.yml'
+                                    f' && menu::_display_help test1']) == "Usage: test.sh test1 [--test1|test2|test3]"
+
+
+def test_bundle_namespace(bash, bundle):
+    assert bash.run_script_inline([f'init() {{ echo "consumer init"; }} && source {bundle}'
+                                   f' && menu::display_help {menu_path_file} test6 && init'
+                                   ]) == "Usage: test.sh test6 [--test1|test2|test3] {test4} \nconsumer init"
+
+
+def test_bundle_function_not_exist(bash, bundle):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script_inline([f'source {bundle} && declare -F display_help menu_compile'
+                                    ]) == ""
+        assert s.last_return_code == 1
+
+
+def test_bundle_executed(bash, bundle):
+    with bash(envvars={'BASHLIBS_CONFIG_FOLDER': config_folder}) as s:
+        assert s.run_script(str(bundle), ['menu::display_help', menu_path_file]
+                            ) == "Usage: test.sh [test1|--test2|test3|test4] {test5|test6}"
+
+
+def test_installer(bash, releases_folder, tmp_path):
+    with bash(envvars={'GITHUB_BASE_URL': f"file://{releases_folder}"}) as s:
+        assert s.run_script(installer_script, [release_name, str(tmp_path)]
+                            ) == f"bash-libs {release_name} installed in {tmp_path}/libs/bashlibs.bundle.sh"
+        assert sorted(os.listdir(tmp_path)) == ["config", "env", "libs"]
+        assert sorted(os.listdir(tmp_path / "libs")) == ["bashlibs.bundle.sh", "bashlibs.bundle.sh.sha256"]
+
+
+def test_installer_release_not_exist(bash, releases_folder, tmp_path):
+    with bash(envvars={'GITHUB_BASE_URL': f"file://{releases_folder}"}) as s:
+        s.auto_return_code_error = False
+        assert s.run_script(installer_script, ["v0.0.0", str(tmp_path)]) == \
+            f"Unable to download bashlibs.bundle.sh from file://{releases_folder}/" \
+            f"christopherlouet/bash-libs/releases/download/v0.0.0"
+        assert s.last_return_code == 1
+        assert os.listdir(tmp_path / "libs") == []
+
+
+def test_installer_checksum_not_match(bash, bundle, tmp_path):
+    release_folder = tmp_path / "releases/christopherlouet/bash-libs/releases/download" / release_name
+    shutil.copytree(bundle.parent, release_folder)
+    with open(release_folder / "bashlibs.bundle.sh", "a") as bundle_file:
+        bundle_file.write("echo changed\n")
+    with bash(envvars={'GITHUB_BASE_URL': f"file://{tmp_path}/releases"}) as s:
+        s.auto_return_code_error = False
+        assert s.run_script(installer_script, [release_name, str(tmp_path / "install")]
+                            ) == "The checksum of bashlibs.bundle.sh does not match bashlibs.bundle.sh.sha256"
+        assert s.last_return_code == 1
+        assert os.listdir(tmp_path / "install/libs") == []
@@ -1,5 +1,6 @@
 import inspect
 import os
+import time
 import pytest
 
 script_dir: str = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
@@ -14,6 +15,70 @@ def pytest_fixture(bash):
     bash.run_script(script, ["init", "test", "docker_compose", "", "profile_test1", "test.env", "dc_test1"])
 
 
+def test_dc_capabilities(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        result = s.run_script(script, ["dc_capabilities", "1", "1"])
+        assert s.last_return_code == 0
+        assert result.startswith("version: ")
+        assert " start " in result
+        assert s.run_script(script, ["dc_capabilities", "0", "1"]) == result
+
+
+def test_dc_capabilities_env_folder_not_writable(bash, tmp_path):
+    # The env folder is under a file, not writable even by root
+    (tmp_path / "file").write_text("")
+    with bash(envvars={'BASHLIBS_ENV_FOLDER': str(tmp_path / "file/env")}) as s:
+        s.auto_return_code_error = False
+        result = s.run_script(script, ["dc_capabilities", "1", "1"])
+        assert s.last_return_code == 0
+        assert result.startswith("version: ")
+        assert len(result.splitlines()) == 2
+
+
+def test_dc_run_projects_not_exist(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ["dc_run_projects", "project_fake", "2", "ps"]
+                            ) == "Project with name 'project_fake' not exists"
+        assert s.last_return_code == 1
+
+
+def test_dc_run_projects_concurrency(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ["dc_run_projects", "project_fake", "0", "ps"]
+                            ) == "Please provide a number of projects run at the same time"
+        assert s.last_return_code == 1
+
+
+def test_dc_run_projects_without_cmd(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ["dc_run_projects", "project_fake", "2"]
+                            ) == "Please provide a docker compose command"
+        assert s.last_return_code == 1
+
+
+def test_dc_run_projects_failed(bash, tmp_path):
+    # A docker wrapper failing on the restart command
+    docker = tmp_path / "docker"
+    docker.write_text("#!/usr/bin/env bash\n"
+                      "[[ \" $* \" == *\" restart \"* ]] && echo \"restart failed\" >&2 && exit 17\n"
+                      f"exec {script_dir}/../benchmarks/stubs/docker \"$@\"\n")
+    docker.chmod(0o755)
+    with bash(envvars={'PATH': f"{tmp_path}:{os.environ['PATH']}"}) as s:
+        s.auto_return_code_error = False
+        for project in ["web", "db"]:
+            s.run_script_inline([f'DC_PROJECT={project} bash {script} init test docker_compose "" profile_test1'])
+        result = s.run_script(script, ["dc_run_projects", "web db", "2", "restart"])
+        assert s.last_return_code == 1
+        assert "web | restart failed" in result.splitlines()
+        assert "db | restart failed" in result.splitlines()
+        assert ("Projects failed: web (17) db (17)" in result.splitlines()
+                or "Projects failed: db (17) web (17)" in result.splitlines())
+
+
 def test_dc_build_docker_compose_file_empty(bash):
     with bash() as s:
         s.auto_return_code_error = False
@@ -166,6 +231,133 @@ def test_status_service_not_exist(bash):
         assert s.last_return_code == 1
 
 
+def test_status_all_file_empty(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ["dc_status_all"]) == "Please provide a docker compose file"
+        assert s.last_return_code == 1
+
+
+def test_status_all(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        result = s.run_script(script, ["dc_status_all", f"{project_folder}/docker-compose.yml", "profile_test1"])
+        assert result.splitlines()[0].split() == ["SERVICE", "STATE", "HEALTH", "EXIT", "CODE"]
+        assert s.last_return_code == 0
+
+
+def test_wait_file_empty(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ["dc_wait"]) == "Please provide a docker compose file"
+        assert s.last_return_code == 1
+
+
+def test_wait_service_empty(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ["dc_wait", f"{project_folder}/docker-compose.yml", "10"]
+                            ) == "Please provide a docker compose service name"
+        assert s.last_return_code == 1
+
+
+def test_wait_timeout_not_number(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ["dc_wait", f"{project_folder}/docker-compose.yml", "ten", "dc_test1"]
+                            ) == "Please provide a timeout in seconds"
+        assert s.last_return_code == 1
+
+
+def test_wait_service_not_exist(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ["dc_wait", f"{project_folder}/docker-compose.yml", "1", "service_fake"]
+                            ) == "Timeout waiting for services: service_fake"
+        assert s.last_return_code == 1
+
+
+@pytest.fixture
+def docker_events_closed(tmp_path):
+    """A docker wrapper without events, with the service dc_test1 running from the third state read."""
+    docker = tmp_path / "docker"
+    docker.write_text("#!/usr/bin/env bash\n"
+                      "case \" $* \" in\n"
+                      "  *\" events \"*) exit 1 ;;\n"
+                      "  *\" ps --all --format \"*)\n"
+                      f"    echo x >> {tmp_path}/ps_count\n"
+                      f"    [[ $(wc -l < {tmp_path}/ps_count) -lt 3 ]] && echo 'dc_test1 created ' && exit 0\n"
+                      "    [[ -z $DOCKER_NEVER_RUNNING ]] && echo 'dc_test1 running ' ; exit 0 ;;\n"
+                      "esac\n"
+                      f"exec {script_dir}/../benchmarks/stubs/docker \"$@\"\n")
+    docker.chmod(0o755)
+    return tmp_path
+
+
+def test_wait_events_closed(bash, docker_events_closed):
+    with bash(envvars={'PATH': f"{docker_events_closed}:{os.environ['PATH']}"}) as s:
+        result = s.run_script(script, ["dc_wait", f"{project_folder}/docker-compose.yml", "5", "dc_test1"])
+        assert result.startswith("dc_test1 is running (1.")
+
+
+def test_wait_events_closed_timeout(bash, docker_events_closed):
+    with bash(envvars={'PATH': f"{docker_events_closed}:{os.environ['PATH']}", 'DOCKER_NEVER_RUNNING': "1"}) as s:
+        s.auto_return_code_error = False
+        start = time.monotonic()
+        assert s.run_script(script, ["dc_wait", f"{project_folder}/docker-compose.yml", "2", "dc_test1"]
+                            ) == "Timeout waiting for services: dc_test1"
+        assert s.last_return_code == 1
+        assert time.monotonic() - start >= 2
+
+
+def test_config_file_empty(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ["dc_config_services"]) == "Please provide a docker compose file"
+        assert s.last_return_code == 1
+
+
+def test_config_env_file_not_exist(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ["dc_config_services", f"{project_folder}/docker-compose.yml", "profile_test1",
+                                     "--env-file", "env_fake"]) == "Environment file env_fake not exists"
+        assert s.last_return_code == 1
+
+
+def test_config_services(bash):
+    with bash() as s:
+        assert s.run_script(script, ["dc_config_services", f"{project_folder}/docker-compose.yml", "profile_test1"]
+                            ) == "dc_test1\ndc_test2"
+        assert s.run_script(script, ["dc_config_services", f"{project_folder}/docker-compose.yml", "profile_test2"]
+                            ) == "dc_test1\ndc_test3"
+        assert s.run_script(script, ["_dc_config_services"]) == "dc_test1\ndc_test2"
+
+
+def test_config_images(bash):
+    with bash() as s:
+        assert s.run_script(script, ["dc_config_images", f"{project_folder}/docker-compose.yml", "profile_test1"]
+                            ) == "alpine:3.19.0"
+        assert s.run_script(script, ["_dc_config_images", "profile_test2"]) == "alpine:3.19.0"
+
+
+def test_config_service(bash):
+    with bash() as s:
+        assert s.run_script(script, ["dc_config_service", f"{project_folder}/docker-compose.yml",
+                                     "/docker_compose-dc_test2-1", "profile_test1"]) == "dc_test2"
+        assert s.run_script(script, ["_dc_config_service", "docker_compose_dc_test1_2"]) == "dc_test1"
+
+
+def test_config_service_not_exist(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ["dc_config_service", f"{project_folder}/docker-compose.yml",
+                                     "docker_compose-dc_test3-1", "profile_test1"]
+                            ) == f"Container with name docker_compose-dc_test3-1 is not a service of " \
+                                 f"{project_folder}/docker-compose.yml"
+        assert s.last_return_code == 1
+
+
 # def test_status_service(bash):
 #     with bash() as s:
 #         s.auto_return_code_error = False
@@ -174,3 +366,60 @@ def test_status_service_not_exist(bash):
 #                             ) == "running"
 #         assert s.last_return_code == 0
 #         s.run_script(script, ["_down", 0])
+
+
+@pytest.fixture
+def docker_config_count(tmp_path):
+    """A docker wrapper counting the models resolved by docker compose config."""
+    docker = tmp_path / "docker"
+    docker.write_text("#!/usr/bin/env bash\n"
+                      f"[[ \" $* \" == *\" config \"* ]] && echo x >> {tmp_path}/config_count\n"
+                      f"exec {script_dir}/../benchmarks/stubs/docker \"$@\"\n")
+    docker.chmod(0o755)
+    return tmp_path
+
+
+def config_count(folder):
+    return len((folder / "config_count").read_text().splitlines())
+
+
+def test_config_included_files(bash, docker_config_count, tmp_path):
+    (tmp_path / "project").mkdir()
+    (tmp_path / "project/docker-compose.yml").write_text("include:\n  - path: ./other.yml\n"
+                                                         "services:\n  dc_test1:\n    extends:\n"
+                                                         "      file: \"base.yml\"\n      service: base\n")
+    (tmp_path / "project/other.yml").write_text("services:\n  dc_test2:\n    image: alpine:3.19.0\n")
+    (tmp_path / "project/base.yml").write_text("services:\n  base:\n    image: alpine:3.19.0\n")
+    args = ["dc_config_services", f"{tmp_path}/project/docker-compose.yml", "profile_test1"]
+    with bash(envvars={'PATH': f"{docker_config_count}:{os.environ['PATH']}"}) as s:
+        assert s.run_script(script, args) == "dc_test1\ndc_test2"
+        assert s.run_script(script, args) == "dc_test1\ndc_test2"
+        assert config_count(docker_config_count) == 1
+        (tmp_path / "project/other.yml").write_text("services:\n  dc_test2:\n    image: alpine:3.20.0\n")
+        assert s.run_script(script, args) == "dc_test1\ndc_test2"
+        assert config_count(docker_config_count) == 2
+        (tmp_path / "project/base.yml").write_text("services:\n  base:\n    image: alpine:3.20.0\n")
+        assert s.run_script(script, args) == "dc_test1\ndc_test2"
+        assert config_count(docker_config_count) == 3
+
+
+def test_config_remote_include(bash, docker_config_count, tmp_path):
+    (tmp_path / "project").mkdir()
+    (tmp_path / "project/docker-compose.yml").write_text("include:\n  - oci://docker.io/user/project:latest\n")
+    args = ["dc_config_services", f"{tmp_path}/project/docker-compose.yml", "profile_test1"]
+    with bash(envvars={'PATH': f"{docker_config_count}:{os.environ['PATH']}"}) as s:
+        assert s.run_script(script, args) == "dc_test1\ndc_test2"
+        assert s.run_script(script, args) == "dc_test1\ndc_test2"
+        assert config_count(docker_config_count) == 2
+
+
+def test_config_env_folder_not_writable(bash, docker_config_count, tmp_path):
+    # The env folder is under a file, not writable even by root
+    (tmp_path / "file").write_text("")
+    args = ["dc_config_services", f"{project_folder}/docker-compose.yml", "profile_test1"]
+    with bash(envvars={'BASHLIBS_ENV_FOLDER': str(tmp_path / "file/env"),
+                       'PATH': f"{docker_config_count}:{os.environ['PATH']}"}) as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, args) == "dc_test1\ndc_test2"
+        assert s.last_return_code == 0
+        assert config_count(docker_config_count) == 1
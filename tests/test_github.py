@@ -1,7 +1,14 @@
 import inspect
 import os
+import select
+import socket
+import socketserver
+import subprocess
+import threading
+import time
 import pytest
 from dotenv import load_dotenv
+from github_api import GithubHandler
 
 script_dir: str = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
 if os.getenv('PWD') == "/app":
@@ -9,6 +16,50 @@ if os.getenv('PWD') == "/app":
 script: str = os.path.abspath(f"{script_dir}/../libs/github.sh")
 
 
+class ConnectProxyHandler(socketserver.BaseRequestHandler):
+    """A proxy tunnelling the requests with CONNECT, which sends its own response headers before the API ones."""
+
+    def handle(self):
+        request = b""
+        while b"\r\n\r\n" not in request:
+            data = self.request.recv(4096)
+            if not data:
+                return
+            request += data
+        host, port = request.split()[1].decode().rsplit(":", 1)
+        with socket.create_connection((host, int(port))) as upstream:
+            self.request.sendall(b"HTTP/1.1 200 Connection established\r\nProxy-Agent: test\r\n\r\n")
+            while True:
+                readable, _, _ = select.select([self.request, upstream], [], [], 5)
+                if not readable:
+                    return
+                for sock in readable:
+                    data = sock.recv(65536)
+                    if not data:
+                        return
+                    (upstream if sock is self.request else self.request).sendall(data)
+
+
+@pytest.fixture
+def proxy(tmp_path):
+    """Send the curl requests through a CONNECT proxy, with the curlrc file of the test."""
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), ConnectProxyHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    (tmp_path / ".curlrc").write_text(f'proxy = "http://127.0.0.1:{server.server_address[1]}"\n'
+                                      'proxytunnel\nnoproxy = ""\n')
+    yield {'CURL_HOME': str(tmp_path)}
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(name="bash")
+def bash_fixture(bash_session, github_stub):
+    """Run each test in a subshell of the bash session, with the github endpoints of the stub."""
+    with bash_session(envvars=github_stub) as subshell:
+        yield subshell
+
+
 @pytest.fixture(autouse=True)
 def pytest_fixture(bash):
     load_dotenv(dotenv_path=f"{script_dir}/.env")
@@ -19,6 +70,36 @@ def pytest_fixture(bash):
         bash.run_script(script, ['init', 'christopherlouet/bash-libs', f'{script_dir}/src/github', github_api_token])
 
 
+def test_api_get_url_empty(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['gh_api_get']) == 'Please provide an API url'
+        assert s.last_return_code == 1
+
+
+def test_cache_clear(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['gh_cache_clear']) == ''
+        assert s.last_return_code == 0
+
+
+def test_manifest_check_file_empty(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['gh_manifest_check']) == 'Please provide a manifest file'
+        assert s.last_return_code == 1
+
+
+def test_manifest_check_without_projects(bash, tmp_path):
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("# project/repository v1.0.0\n\n")
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['gh_manifest_check', str(manifest)]) == 'The manifest file is empty'
+        assert s.last_return_code == 1
+
+
 def test_check_api_rate(bash):
     with bash() as s:
         s.auto_return_code_error = False
@@ -33,6 +114,48 @@ def test_check_api_rate_with_display(bash):
         assert s.last_return_code == 0
 
 
+def rate_state(env_folder, remaining: int, reset: int):
+    """Save the rate limit of the anonymous token, as gh_rate_save does."""
+    (env_folder / ".github_cache").mkdir(parents=True, exist_ok=True)
+    (env_folder / ".github_cache/rate_anonymous").write_text(
+        f"GH_RATE_LIMIT=60\nGH_RATE_USED={60 - remaining}\nGH_RATE_REMAINING={remaining}\nGH_RATE_RESET={reset}\n")
+
+
+def test_check_api_rate_state_file(bash, tmp_path):
+    GithubHandler.rate_requests.clear()
+    rate_state(tmp_path, 10, int(time.time()) + 3600)
+    with bash(envvars={'BASHLIBS_ENV_FOLDER': str(tmp_path)}) as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['gh_check_api_rate', "", 1]) == 'ok'
+        assert s.last_return_code == 0
+    # The saved rate limit is used, without requesting the API
+    assert GithubHandler.rate_requests == []
+
+
+def test_check_api_rate_wait_reset(bash, tmp_path):
+    GithubHandler.rate_requests.clear()
+    reset = int(time.time()) + 3
+    rate_state(tmp_path, 0, reset)
+    with bash(envvars={'BASHLIBS_ENV_FOLDER': str(tmp_path), 'GITHUB_RATE_MAX_WAIT': "10"}) as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['gh_check_api_rate', "", 1]).startswith("API rate limit exceeded, waiting ")
+        assert s.last_return_code == 0
+    # The check returns after the reset
+    assert time.time() > reset
+    assert GithubHandler.rate_requests == []
+
+
+def test_check_api_rate_reset_too_late(bash, tmp_path):
+    rate_state(tmp_path, 0, int(time.time()) + 3600)
+    start = time.monotonic()
+    with bash(envvars={'BASHLIBS_ENV_FOLDER': str(tmp_path), 'GITHUB_RATE_MAX_WAIT': "10"}) as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['gh_check_api_rate', "", 1]) == 'API rate limit exceeded'
+        assert s.last_return_code == 1
+    # The check fails without waiting for the reset
+    assert time.monotonic() - start < 10
+
+
 def test_release_latest(bash):
     with bash() as s:
         s.auto_return_code_error = False
@@ -40,6 +163,29 @@ def test_release_latest(bash):
         assert s.last_return_code == 0
 
 
+def test_release_latest_not_modified(bash):
+    GithubHandler.cached_requests.clear()
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['_gh_release_latest', 1]) == 'v1.0.0'
+        assert s.run_script(script, ['_gh_release_latest', 1]) == 'v1.0.0'
+        assert s.last_return_code == 0
+    # The second request is conditional, and served from the cache with a 304
+    assert GithubHandler.cached_requests[-1] == ("/repos/christopherlouet/bash-libs/releases/latest",
+                                                 '"release-latest"', 304)
+
+
+def test_release_latest_behind_proxy(bash, proxy):
+    GithubHandler.cached_requests.clear()
+    with bash(envvars=proxy) as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['gh_cache_clear']) == ''
+        assert s.run_script(script, ['_gh_release_latest', 1]) == 'v1.0.0'
+        assert s.run_script(script, ['_gh_release_latest', 1]) == 'v1.0.0'
+        assert s.last_return_code == 0
+    assert [request[1:] for request in GithubHandler.cached_requests] == [(None, 200), ('"release-latest"', 304)]
+
+
 def test_release_latest_with_display(bash):
     with bash() as s:
         s.auto_return_code_error = False
@@ -47,6 +193,36 @@ def test_release_latest_with_display(bash):
         assert s.last_return_code == 0
 
 
+def test_manifest_check(bash, tmp_path):
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("christopherlouet/bash-libs v1.0.0\n")
+    with bash() as s:
+        s.auto_return_code_error = False
+        result = s.run_script(script, ['_gh_manifest_check', str(manifest)])
+        assert result.splitlines()[1].split() == ['christopherlouet/bash-libs', 'v1.0.0', 'v1.0.0', 'ok']
+        assert s.last_return_code == 0
+
+
+def test_manifest_check_not_modified(bash, env_folder, tmp_path):
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("christopherlouet/bash-libs v1.0.0\n")
+    path = "/repos/christopherlouet/bash-libs/releases/latest"
+    GithubHandler.cached_requests.clear()
+    with bash() as s:
+        assert s.run_script(script, ['gh_cache_clear']) == ''
+        for _ in range(2):
+            result = s.run_script(script, ['_gh_manifest_check', str(manifest)])
+            assert result.splitlines()[1].split() == ['christopherlouet/bash-libs', 'v1.0.0', 'v1.0.0', 'ok']
+        # The cache is shared with gh_api_get
+        assert s.run_script(script, ['_gh_release_latest', 1]) == 'v1.0.0'
+    assert GithubHandler.cached_requests == [(path, None, 200), (path, '"release-latest"', 304),
+                                             (path, '"release-latest"', 304)]
+    # The rate limit headers of the responses are saved
+    rate_files = list((env_folder / ".github_cache").glob("rate_*"))
+    assert len(rate_files) == 1
+    assert f"GH_RATE_REMAINING={GithubHandler.rate_limit['rate']['remaining']}" in rate_files[0].read_text()
+
+
 def test_release_verify_parameter_not_exist(bash):
     with bash() as s:
         s.auto_return_code_error = False
@@ -68,6 +244,13 @@ def test_release_verify(bash):
         assert s.last_return_code == 0
 
 
+def test_release_verify_after_first_page(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['_gh_release_verify', "v0.1.0"]) == 'v0.1.0 exist'
+        assert s.last_return_code == 0
+
+
 def test_release_verify_not_exist(bash):
     with bash() as s:
         s.auto_return_code_error = False
@@ -75,6 +258,74 @@ def test_release_verify_not_exist(bash):
         assert s.last_return_code == 1
 
 
+def test_release_assets_parameter_empty(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['gh_release_assets']) == 'Please provide a github project name'
+        assert s.last_return_code == 1
+
+
+def test_release_download_target_empty(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['_gh_release_download', 'v1.0.0']) == 'Please provide a directory target'
+        assert s.last_return_code == 1
+
+
+@pytest.fixture
+def assets_cache(tmp_path):
+    """Cache the assets in a folder of the test, and log the requests of the assets."""
+    GithubHandler.asset_requests.clear()
+    return {'GITHUB_ASSETS_CACHE': str(tmp_path / "assets"), 'GITHUB_DOWNLOAD_PART_SIZE': "4096"}
+
+
+def test_release_download(bash, assets_cache, tmp_path):
+    with bash(envvars=assets_cache) as s:
+        assert s.run_script(script, ['_gh_release_download', 'v1.0.0', f"{tmp_path}/target", "bash-libs.tar.gz"]
+                            ) == "Download the asset bash-libs.tar.gz"
+        assert s.last_return_code == 0
+    assert (tmp_path / "target/bash-libs.tar.gz").read_bytes() == GithubHandler.assets[1]["content"]
+    # The asset is downloaded in 3 byte ranges, in parallel
+    assert sorted(GithubHandler.asset_requests) == [(1, "bytes=0-3333"), (1, "bytes=3334-6667"),
+                                                    (1, "bytes=6668-9999")]
+
+
+def test_release_download_resume(bash, assets_cache, tmp_path):
+    partial_folder = tmp_path / "assets/partial/1"
+    partial_folder.mkdir(parents=True)
+    (partial_folder / "0").write_bytes(GithubHandler.assets[1]["content"][:1000])
+    with bash(envvars=assets_cache) as s:
+        assert s.run_script(script, ['_gh_release_download', 'v1.0.0', f"{tmp_path}/target", "bash-libs.tar.gz"]
+                            ) == "Download the asset bash-libs.tar.gz"
+    assert (tmp_path / "target/bash-libs.tar.gz").read_bytes() == GithubHandler.assets[1]["content"]
+    assert sorted(GithubHandler.asset_requests) == [(1, "bytes=1000-3333"), (1, "bytes=3334-6667"),
+                                                    (1, "bytes=6668-9999")]
+    assert not partial_folder.exists()
+
+
+def test_release_download_checksum_not_valid(bash, assets_cache, tmp_path):
+    with bash(envvars=assets_cache) as s:
+        s.auto_return_code_error = False
+        result = s.run_script(script, ['_gh_release_download', 'v1.0.0', f"{tmp_path}/target", "*-corrupt.tar.gz"])
+        assert sorted(result.splitlines()) == ["Checksum of the asset 2 is not valid",
+                                               "Download the asset bash-libs-corrupt.tar.gz"]
+        assert s.last_return_code == 1
+    assert os.listdir(tmp_path / "target") == []
+    assert os.listdir(tmp_path / "assets/sha256") == []
+
+
+def test_release_download_cached(bash, assets_cache, tmp_path):
+    with bash(envvars=assets_cache) as s:
+        s.run_script(script, ['_gh_release_download', 'v1.0.0', f"{tmp_path}/target1", "bash-libs.tar.gz", 0])
+        asset_requests = len(GithubHandler.asset_requests)
+        assert s.run_script(script, ['_gh_release_download', 'v1.0.0', f"{tmp_path}/target2", "bash-libs.tar.gz"]
+                            ) == "Download the asset bash-libs.tar.gz"
+        assert s.last_return_code == 0
+    # The asset is served from the cache, without a request
+    assert len(GithubHandler.asset_requests) == asset_requests == 3
+    assert (tmp_path / "target2/bash-libs.tar.gz").read_bytes() == GithubHandler.assets[1]["content"]
+
+
 def test_release_choice(bash):
     with bash() as s:
         s.auto_return_code_error = False
@@ -94,3 +345,70 @@ def test_release_choice_no_answer(bash):
         s.auto_return_code_error = False
         s.run_script(script, ['_gh_release_choice', 'no_answer'])
         assert s.last_return_code == 1
+
+
+def test_clone_update(bash, tmp_path):
+    repository = tmp_path / "repository"
+    repository.mkdir()
+    for command in [["init", "-q"], ["config", "user.email", "test@test"], ["config", "user.name", "test"]]:
+        subprocess.run(["git", "-C", str(repository)] + command, check=True)
+    for tag in ["v1.0.0", "v1.0.1"]:
+        (repository / "version").write_text(tag)
+        subprocess.run(["git", "-C", str(repository), "add", "version"], check=True)
+        subprocess.run(["git", "-C", str(repository), "commit", "-q", "-m", tag], check=True)
+        subprocess.run(["git", "-C", str(repository), "tag", tag], check=True)
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['gh_clone', f"file://{repository}", f"{tmp_path}/target", "v1.0.0"]
+                            ) == f"Clone the github repository file://{repository} (v1.0.0)"
+        assert (tmp_path / "target" / "version").read_text() == "v1.0.0"
+        assert s.run_script(script, ['gh_clone', f"file://{repository}", f"{tmp_path}/target", "v1.0.1"]
+                            ) == f"Update the github repository file://{repository} (v1.0.1)"
+        assert (tmp_path / "target" / "version").read_text() == "v1.0.1"
+        assert s.last_return_code == 0
+
+
+def test_clone(bash, github_stub, tmp_path):
+    with bash() as s:
+        s.auto_return_code_error = False
+        repository = f"{github_stub['GITHUB_BASE_URL']}/christopherlouet/bash-libs"
+        assert s.run_script(script, ['gh_clone', repository, f"{tmp_path}/target", "v1.0.0"]
+                            ) == f"Clone the github repository {repository} (v1.0.0)"
+        assert (tmp_path / "target" / "README.md").exists()
+        assert s.last_return_code == 0
+
+
+@pytest.fixture
+def clone_repository(tmp_path):
+    """A repository with a tag, and the docs and src folders."""
+    repository = tmp_path / "repository"
+    for path in ["docs/index.md", "src/main.sh"]:
+        (repository / path).parent.mkdir(parents=True, exist_ok=True)
+        (repository / path).write_text(path)
+    (repository / "version").write_text("v1.0.0")
+    for command in [["init", "-q"], ["add", "."], ["-c", "user.email=test@test", "-c", "user.name=test", "commit",
+                    "-q", "-m", "v1.0.0"], ["tag", "v1.0.0"]]:
+        subprocess.run(["git", "-C", str(repository)] + command, check=True)
+    return f"file://{repository}"
+
+
+def test_clone_mirror(bash, clone_repository, tmp_path):
+    with bash(envvars={'GITHUB_CLONE_MIRROR': str(tmp_path / "mirror")}) as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['gh_clone', clone_repository, f"{tmp_path}/target", "v1.0.0", "0"]) == ""
+        assert s.last_return_code == 0
+    assert len(os.listdir(tmp_path / "mirror")) == 1
+    assert (tmp_path / "target/version").read_text() == "v1.0.0"
+    # The checkout does not depend on the objects of the mirror
+    assert not (tmp_path / "target/.git/objects/info/alternates").exists()
+    subprocess.run(["rm", "-rf", str(tmp_path / "mirror")], check=True)
+    subprocess.run(["git", "-C", str(tmp_path / "target"), "fsck"], check=True, stdout=subprocess.DEVNULL)
+
+
+def test_clone_sparse(bash, clone_repository, tmp_path):
+    with bash(envvars={'GITHUB_CLONE_SPARSE': "docs"}) as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['gh_clone', clone_repository, f"{tmp_path}/target", "v1.0.0", "0"]) == ""
+        assert s.last_return_code == 0
+    assert sorted(os.listdir(tmp_path / "target")) == [".git", "docs", "version"]
+    assert (tmp_path / "target/docs/index.md").exists()
@@ -0,0 +1,64 @@
+import inspect
+import os
+
+script_dir: str = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+if os.getenv('PWD') == "/app":
+    script_dir = "/app/tests"
+script: str = os.path.abspath(f"{script_dir}/../libs/log.sh")
+
+
+def test_log_message(bash):
+    assert bash.run_script(script, ['log_message', 'info', 'msg']) == 'msg'
+
+
+def test_log_message_filtered(bash):
+    with bash(envvars={'LOG_LEVEL': 'warn'}) as s:
+        assert s.run_script(script, ['log_message', 'info', 'msg']) == ''
+
+
+def test_log_message_invalid_level(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['log_message', 'toto', 'msg']) == 'Invalid log level toto'
+        assert s.last_return_code == 1
+
+
+def test_log_message_plain_text(bash):
+    with bash(envvars={'LOG_COLOR': 'auto'}) as s:
+        assert s.run_script_inline([f'bash {script} log_message error msg | od -c | head -1 | tr -s " "'
+                                    ]) == '0000000 m s g \\n'
+
+
+def test_log_message_colored(bash):
+    # The messages are colorized by default, even if the output is not a terminal
+    with bash() as s:
+        assert s.run_script_inline([f'bash {script} log_message error msg | od -c | head -1 | tr -s " "'
+                                    ]) == '0000000 033 [ 0 ; 3 1 m m s g 033 [ 0 m \\n'
+
+
+def test_log_stream_auto(bash):
+    with bash(envvars={'LOG_LEVEL': 'warn'}) as s:
+        assert s.run_script_inline([f'printf "a\\nWARNING b\\ndebug c\\nerror d" | bash {script} log_stream auto "[x] "'
+                                    ]) == '[x] WARNING b\n[x] error d'
+
+
+def test_log_stream_filtered(bash):
+    with bash(envvars={'LOG_LEVEL': 'error'}) as s:
+        assert s.run_script_inline([f'seq 1 100000 | bash {script} log_stream info']) == ''
+
+
+def test_log_stream_invalid_level(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script_inline([f'echo a | bash {script} log_stream toto']) == 'Invalid log level toto'
+        assert s.last_return_code == 1
+
+
+def test_log_stream_file_rotation(bash, tmp_path):
+    log_file = tmp_path / "app.log"
+    with bash(envvars={'LOG_FILE': str(log_file), 'LOG_FILE_MAX_SIZE': '100', 'LOG_FILE_BACKUPS': '2',
+                       'LOG_BUFFER_LINES': '10'}) as s:
+        assert s.run_script_inline([f'seq 1 40 | bash {script} log_stream info > /dev/null']) == ''
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["app.log", "app.log.1", "app.log.2"]
+    assert log_file.read_text().splitlines()[-1] == "[info] 40"
+    assert (tmp_path / "app.log.1").read_text().splitlines()[0] == "[info] 21"
@@ -15,6 +15,77 @@ def pytest_fixture(bash):
     bash.run_script(script, ["init", "test", "menu", 'menu.yml'])
 
 
+def test_menu_compile_file_empty(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['menu_compile']) == "Please provide a menu configuration file"
+        assert s.last_return_code == 1
+
+
+def test_menu_compile(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['menu_compile', f"{menu_path_file}"]) == ""
+        assert s.last_return_code == 0
+
+
+def test_menu_compile_env_folder_missing(bash, tmp_path):
+    with bash(envvars={'BASHLIBS_ENV_FOLDER': str(tmp_path / "env")}) as s:
+        assert s.run_script(script, ['display_help', f"{menu_path_file}", "test1"]
+                            ) == "Usage: test.sh test1 [--test1|test2|test3]"
+        assert any(name.startswith(".menu_index") for name in os.listdir(tmp_path / "env"))
+
+
+def test_menu_compile_env_folder_not_writable(bash):
+    with bash(envvars={'BASHLIBS_ENV_FOLDER': "/dev/null/env"}) as s:
+        assert s.run_script(script, ['display_help', f"{menu_path_file}", "test1"]
+                            ) == "Usage: test.sh test1 [--test1|test2|test3]"
+
+
+def test_menu_compile_env_folder_not_writable_compiled_once(bash, tmp_path):
+    # The env folder is under a file, not writable even by root
+    (tmp_path / "file").write_text("")
+    trace_file = tmp_path / "trace.jsonl"
+    with bash(envvars={'BASHLIBS_ENV_FOLDER': str(tmp_path / "file/env"), 'BASHLIBS_TRACE': str(trace_file)}) as s:
+        assert s.run_script(script, ['display_help', f"{menu_path_file}", "test1"]
+                            ) == "Usage: test.sh test1 [--test1|test2|test3]"
+    assert trace_file.read_text().count(f'"message":"compile {menu_path_file}"') == 1
+
+
+def test_menu_compile_subshells(bash, tmp_path):
+    with bash(envvars={'BASHLIBS_ENV_FOLDER': str(tmp_path)}) as s:
+        assert s.run_script_inline([f'( source {script} && for index in {{1..10}}; do'
+                                    f' ( menu_compile {menu_path_file} && echo "$MENU_INDEX_NAME" ) & done ; wait )'
+                                    ]) == "\n".join(["test.sh"] * 10)
+        assert [name for name in os.listdir(tmp_path) if name.startswith(".menu_index")] == \
+            [".menu_index" + menu_path_file.replace("/", "_").replace(".", "_")]
+
+
+def test_display_help_env_folder_not_writable_option_not_exist(bash):
+    with bash(envvars={'BASHLIBS_ENV_FOLDER': "/dev/null/env"}) as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['display_help', f"{menu_path_file}", "toto"]
+                            ) == "Option toto does not exist\nUsage: test.sh [test1|--test2|test3|test4] {test5|test6}"
+        assert s.last_return_code == 1
+
+
+def test_menu_compile_yq(bash, tmp_path):
+    with bash(envvars={'BASHLIBS_ENV_FOLDER': str(tmp_path), 'MENU_PARSER': "yq"}) as s:
+        assert s.run_script(script, ['display_help', f"{menu_path_file}", "test1"]
+                            ) == "Usage: test.sh test1 [--test1|test2|test3]"
+
+
+def test_menu_compile_unsupported_by_awk(bash, tmp_path):
+    # The flow collections are not supported by the awk parser, the file is converted with yq
+    (tmp_path / "block.yml").write_text("name: flow.sh\nopts:\n  start:\n    help: Start\n  stop:\n"
+                                        "    optional: true\n")
+    (tmp_path / "flow.yml").write_text("name: flow.sh\nopts: {start: {help: Start}, stop: {optional: true}}\n")
+    with bash(envvars={'BASHLIBS_ENV_FOLDER': str(tmp_path)}) as s:
+        usage = s.run_script(script, ['display_help', f"{tmp_path}/block.yml"])
+        assert usage.startswith("Usage: flow.sh ")
+        assert s.run_script(script, ['display_help', f"{tmp_path}/flow.yml"]) == usage
+
+
 def test_check_menu_entries_file_empty(bash):
     with bash() as s:
         s.auto_return_code_error = False
@@ -163,6 +234,25 @@ def test_display_help_with_opts_test2(bash):
         assert s.last_return_code == 0
 
 
+def test_display_help_prefix_accepted_by_menu_parse(bash, tmp_path):
+    (tmp_path / "deploy.yml").write_text("name: d.sh\nopts:\n  deploy:\n    opts:\n      force:\n"
+                                         "        optional: true\n        prefix: true\n      dry:\n"
+                                         "        optional: true\n")
+    with bash(envvars={'BASHLIBS_ENV_FOLDER': str(tmp_path / "env")}) as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['display_help', f"{tmp_path}/deploy.yml", "deploy"]
+                            ) == "Usage: d.sh deploy {--force|dry}"
+        for opt in ["--force", "dry"]:
+            assert s.run_script(script, ['menu_parse', f"{tmp_path}/deploy.yml", "deploy", opt]) == ""
+            assert s.last_return_code == 0
+        assert s.run_script(script, ['menu_parse', f"{tmp_path}/deploy.yml", "deploy", "force"]
+                            ) == "Option force does not exist\nUsage: d.sh deploy {--force|dry}"
+        assert s.last_return_code == 1
+        assert s.run_script(script, ['display_help', f"{menu_path_file}", "test2"]) == "Usage: test.sh --test2 {test1}"
+        assert s.run_script(script, ['menu_parse', f"{menu_path_file}", "--test2", "test1"]) == ""
+        assert s.last_return_code == 0
+
+
 def test_display_help_with_env_file(bash):
     with bash() as s:
         s.auto_return_code_error = False
@@ -182,3 +272,107 @@ def test_display_help_with_env_file_and_opts_test2(bash):
         s.auto_return_code_error = False
         assert s.run_script(script, ['_display_help', "test6"]) == "Usage: test.sh test6 [--test1|test2|test3] {test4}"
         assert s.last_return_code == 0
+
+
+def test_build_completion_file_empty(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['build_completion']) == "Please provide a menu configuration file"
+        assert s.last_return_code == 1
+
+
+def test_build_completion_script_empty(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['build_completion', f"{menu_path_file}"]) == "Please provide a completion script path"
+        assert s.last_return_code == 1
+
+
+def test_build_completion(bash, tmp_path):
+    completion_file: str = f"{tmp_path}/test.sh.bash"
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['build_completion', f"{menu_path_file}", completion_file]) == ""
+        assert s.last_return_code == 0
+        assert s.run_script_inline([f'source {completion_file} && COMP_WORDS=(test.sh test6 "") COMP_CWORD=2 '
+                                    '&& _test_sh_menu_complete && echo "${COMPREPLY[*]}"']) == "--test1 test2 test3 test4"
+
+
+def test_build_completion_subshells(bash, tmp_path):
+    completion_file: str = f"{tmp_path}/test.sh.bash"
+    with bash(envvars={'BASHLIBS_ENV_FOLDER': str(tmp_path / "env")}) as s:
+        assert s.run_script_inline([f'( source {script} && for index in {{1..10}}; do'
+                                    f' build_completion {menu_path_file} {completion_file} & done ; wait )']) == ""
+        assert sorted(os.listdir(tmp_path)) == ["env", "test.sh.bash"]
+        assert s.run_script_inline([f'tail -n 1 {completion_file}']) == \
+            "complete -o nosort -F _test_sh_menu_complete 'test.sh'"
+
+
+def test_build_completion_optional_prefix(bash, tmp_path):
+    (tmp_path / "deploy.yml").write_text("name: d.sh\nopts:\n  deploy:\n    opts:\n      force:\n"
+                                         "        optional: true\n        prefix: true\n")
+    completion_file: str = f"{tmp_path}/d.sh.bash"
+    with bash(envvars={'BASHLIBS_ENV_FOLDER': str(tmp_path / "env")}) as s:
+        assert s.run_script(script, ['build_completion', f"{tmp_path}/deploy.yml", completion_file]) == ""
+        assert s.run_script_inline([f'source {completion_file} && COMP_WORDS=(d.sh deploy "") COMP_CWORD=2 '
+                                    '&& _d_sh_menu_complete && echo "${COMPREPLY[*]}"']) == "--force"
+        assert s.run_script_inline([f'source {script} && menu_parse {tmp_path}/deploy.yml deploy "${{COMPREPLY[0]}}"'
+                                    ' && echo "$menu_path"']) == ".deploy.force"
+
+
+def test_build_completion_command_changed(bash, tmp_path):
+    completion_file: str = f"{tmp_path}/test.sh.bash"
+    with bash() as s:
+        assert s.run_script(script, ['build_completion', f"{menu_path_file}", completion_file]) == ""
+        assert s.run_script(script, ['build_completion', f"{menu_path_file}", completion_file, "other.sh"]) == ""
+        assert s.run_script_inline([f'tail -n 1 {completion_file}']) == \
+            "complete -o nosort -F _other_sh_menu_complete 'other.sh'"
+        assert s.run_script(script, ['build_completion', f"{menu_path_file}", completion_file]) == ""
+        assert s.run_script_inline([f'tail -n 1 {completion_file}']) == \
+            "complete -o nosort -F _test_sh_menu_complete 'test.sh'"
+
+
+def test_menu_parse_file_empty(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['menu_parse']) == "Please provide a menu configuration file"
+        assert s.last_return_code == 1
+
+
+def test_menu_parse(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['menu_parse', f"{menu_path_file}", "test1", "--test1", "arg"]) == ""
+        assert s.last_return_code == 0
+
+
+def test_menu_parse_prefix_without_dashes(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['menu_parse', f"{menu_path_file}", "test1", "test1"]
+                            ) == "Option test1 does not exist\nUsage: test.sh test1 [--test1|test2|test3] \ntoto2"
+        assert s.last_return_code == 1
+
+
+def test_menu_parse_missing_option(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['menu_parse', f"{menu_path_file}"]
+                            ) == "Missing option\nUsage: test.sh [test1|--test2|test3|test4] {test5|test6} \ntoto"
+        assert s.last_return_code == 1
+
+
+def test_menu_dispatch(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script_inline([f'source {script} && menu_test1_test1() {{ echo "test1 test1 $*"; }}'
+                                    f' && menu_dispatch {menu_path_file} menu test1 --test1 "a b" c']) == "test1 test1 a b c"
+        assert s.last_return_code == 0
+
+
+def test_menu_dispatch_handler_not_exist(bash):
+    with bash() as s:
+        s.auto_return_code_error = False
+        assert s.run_script_inline([f'(source {script} && menu_dispatch {menu_path_file} "" test5)'
+                                    ]) == "Function with name 'test_test5' not exists"
+        assert s.last_return_code == 1
@@ -83,3 +83,7 @@ def test_confirm_message_answer_n(bash):
 def test_confirm_message_answer_not_empty(bash):
     assert bash.run_script(script, [
         'confirm_message', 'confirm_message_answer_not_empty', 'not_empty', 'n']) == ''
+
+
+def test_source_without_dispatch(bash):
+    assert bash.run_script_inline([f'source {script} show_message not_dispatched && show_message sourced']) == 'sourced'
@@ -1,5 +1,6 @@
 import inspect
 import os
+import shutil
 import pytest
 
 script_dir: str = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
@@ -8,6 +9,11 @@ if os.getenv('PWD') == "/app":
 script: str = os.path.abspath(f"{script_dir}/../libs/utils.sh")
 
 
+@pytest.fixture(autouse=True)
+def pytest_fixture(bash):
+    bash.run_script(script, ["init_env"])
+
+
 def test_check_function_params_empty(bash):
     with (bash() as s):
         s.auto_return_code_error = False
@@ -36,3 +42,28 @@ def test_check_function_params_with_env(bash):
         s.auto_return_code_error = False
         assert s.run_script(script, ['_test_check_args_with_env']) == 'TEST_ENV_KEY=TEST_ENV_VALUE'
         assert s.last_return_code == 0
+
+
+def test_init_env_folder_namespace(bash, tmp_path):
+    with (bash(envvars={'BASHLIBS_ENV_FOLDER': str(tmp_path), 'BASHLIBS_ENV_NAMESPACE': 'job1'}) as s):
+        s.auto_return_code_error = False
+        assert s.run_script(script, ['init_env']) == ''
+        assert s.last_return_code == 0
+        assert (tmp_path / ".job1.utils").read_text() == "TEST_ENV_KEY=TEST_ENV_VALUE\n"
+        assert sorted(path.name for path in tmp_path.iterdir()) == [".bashlibs.lock", ".job1.utils"]
+
+
+def test_init_env_subshells_without_flock(bash, tmp_path):
+    bin_folder = tmp_path / "bin"
+    bin_folder.mkdir()
+    for command in ["mkdir", "mv"]:
+        os.symlink(shutil.which(command), bin_folder / command)
+    with (bash() as s):
+        s.auto_return_code_error = False
+        assert s.run_script_inline([
+            f'( source {script_dir}/../libs/bashlibs.sh && bashlibs_require utils && PATH={bin_folder}'
+            f' && for index in {{1..20}}; do ( declare -A params=( [TEST_ENV_KEY]="$index" )'
+            f' && init_env {tmp_path}/env/.utils "$(declare -p params)" ) & done ; wait )']) == ''
+        assert s.last_return_code == 0
+        assert (tmp_path / "env/.utils").read_text() in [f"TEST_ENV_KEY={index}\n" for index in range(1, 21)]
+        assert os.listdir(tmp_path / "env") == [".utils"]